@@ -0,0 +1 @@
+# app/api/__init__.py
\ No newline at end of file
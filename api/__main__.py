@@ -0,0 +1,13 @@
+# app/api/__main__.py
+"""REST API サーバ起動: python -m api"""
+import uvicorn
+
+from config import API_CONFIG
+
+
+def main():
+    uvicorn.run("api.app:app", host=API_CONFIG.host, port=API_CONFIG.port, workers=API_CONFIG.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# app/api/app.py
+"""生産計画 REST API - Streamlit を介さずに計画サービスを提供する"""
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from datetime import date
+from typing import List, Optional
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, PlainTextResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from domain.exceptions import PlanningError, NoDataError, InvalidInputError
+from services.service_container import get_service_container
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+class PlanRequest(BaseModel):
+    start_date: date
+    end_date: date
+
+
+class LoadingItemRequest(BaseModel):
+    product_id: int
+    container_id: int
+    quantity: int
+    weight_per_unit: float
+
+
+class LoadingPlanRequest(BaseModel):
+    items: List[LoadingItemRequest]
+
+
+class LoadingValidationRequest(BaseModel):
+    truck_id: int
+    items: List[LoadingItemRequest]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """サービス群はプロセスで1回だけ生成し、コネクションプールを共有する"""
+    container = get_service_container()
+    app.state.production_service = container.production_service
+    app.state.transport_service = container.transport_service
+    app.state.product_service = container.product_service
+    app.state.metrics = container.metrics
+    yield
+    container.close()
+
+
+app = FastAPI(title="生産計画管理 API", version="1.0.0", lifespan=lifespan)
+
+
+@app.exception_handler(NoDataError)
+async def no_data_handler(request: Request, exc: NoDataError):
+    """計算対象のデータなし"""
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+@app.exception_handler(InvalidInputError)
+async def invalid_input_handler(request: Request, exc: InvalidInputError):
+    """入力値が不正"""
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+@app.exception_handler(PlanningError)
+async def planning_error_handler(request: Request, exc: PlanningError):
+    """計画処理の失敗（メッセージをそのまま返す）"""
+    return JSONResponse(status_code=500, content={"detail": str(exc)})
+
+
+# -----------------------------
+# レスポンス変換
+# -----------------------------
+def _frame_response(df: Optional[pd.DataFrame], request: Request) -> Response:
+    """DataFrame を JSON または Arrow (Accept ヘッダ指定時) で返す"""
+    df = df if df is not None else pd.DataFrame()
+    if ARROW_MEDIA_TYPE in request.headers.get("accept", ""):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(content=sink.getvalue().to_pybytes(), media_type=ARROW_MEDIA_TYPE)
+    return Response(
+        content=df.to_json(orient="records", date_format="iso", force_ascii=False),
+        media_type="application/json",
+    )
+
+
+def _orm_to_dict(obj) -> dict:
+    """ORM オブジェクトを列名ベースの辞書に変換"""
+    return {column.name: getattr(obj, column.name) for column in obj.__table__.columns}
+
+
+def _loading_plan_to_dict(plan_result: dict) -> dict:
+    """積載計画結果を JSON 化可能な辞書に変換"""
+    return {
+        "total_trips": plan_result["total_trips"],
+        "efficiency": plan_result["efficiency"],
+        "plans": [{
+            "truck": _orm_to_dict(plan.truck),
+            "loaded_items": [vars(item) for item in plan.loaded_items],
+            "total_volume": plan.total_volume,
+            "total_weight": plan.total_weight,
+            "volume_utilization": plan.volume_utilization,
+            "weight_utilization": plan.weight_utilization,
+        } for plan in plan_result["plans"]],
+        "remaining_items": [vars(item) for item in plan_result["remaining_items"]],
+        "dock_schedule": [vars(a) for a in plan_result.get("dock_schedule", {}).get("assignments", [])],
+    }
+
+
+def _job_result_response(kind: str, result, request: Request):
+    """ジョブ種別に応じて結果を変換（未知の種別は汎用の JSON 変換）"""
+    if kind == "production_plan":
+        return _frame_response(pd.DataFrame([asdict(plan) for plan in result or []]), request)
+    if kind == "delivery_plan" and result:
+        return _loading_plan_to_dict(result)
+    return jsonable_encoder(result)
+
+
+# -----------------------------
+# エンドポイント
+# -----------------------------
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """計測値（Prometheus テキスト形式）"""
+    return PlainTextResponse(
+        request.app.state.metrics.to_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/products")
+async def get_products(request: Request):
+    """製品マスタ"""
+    df = await run_in_threadpool(request.app.state.product_service.get_products)
+    return _frame_response(df, request)
+
+
+@app.get("/products/constraints")
+async def get_product_constraints(request: Request):
+    """製品制約"""
+    df = await run_in_threadpool(request.app.state.production_service.product_repo.get_product_constraints)
+    return _frame_response(df, request)
+
+
+@app.get("/containers")
+async def get_containers(request: Request):
+    """容器マスタ"""
+    containers = await run_in_threadpool(request.app.state.transport_service.get_containers)
+    return _frame_response(pd.DataFrame([_orm_to_dict(c) for c in containers]), request)
+
+
+@app.get("/trucks")
+async def get_trucks(request: Request):
+    """トラックマスタ"""
+    df = await run_in_threadpool(request.app.state.transport_service.get_trucks)
+    return _frame_response(df, request)
+
+
+@app.post("/production-plans")
+async def calculate_production_plan(body: PlanRequest, request: Request):
+    """生産計画計算（同期）"""
+    plans = await run_in_threadpool(
+        request.app.state.production_service.calculate_production_plan, body.start_date, body.end_date
+    )
+    return _frame_response(pd.DataFrame([asdict(plan) for plan in plans]), request)
+
+
+@app.post("/production-plans/jobs", status_code=202)
+async def submit_production_plan(body: PlanRequest, request: Request):
+    """生産計画計算（バックグラウンドジョブ）"""
+    job_id = await run_in_threadpool(
+        request.app.state.production_service.submit_production_plan, body.start_date, body.end_date, "api"
+    )
+    return {"job_id": job_id}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """ジョブ状態"""
+    job = await run_in_threadpool(request.app.state.production_service.jobs.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="ジョブが見つかりません")
+    return job
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, request: Request):
+    """ジョブの結果（生産計画は表形式、配送計画は積載計画と同じ形式）"""
+    jobs = request.app.state.production_service.jobs
+    job = await run_in_threadpool(jobs.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="ジョブが見つかりません")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"ジョブは完了していません ({job['status']})")
+    result = await run_in_threadpool(jobs.get_result, job_id)
+    return _job_result_response(job["kind"], result, request)
+
+
+@app.post("/loading/plans")
+async def calculate_loading_plan(body: LoadingPlanRequest, request: Request):
+    """積載計画計算"""
+    items = [item.model_dump() for item in body.items]
+    plan_result = await run_in_threadpool(request.app.state.transport_service.calculate_delivery_plan, items)
+    return _loading_plan_to_dict(plan_result)
+
+
+@app.post("/loading/validate")
+async def validate_loading(body: LoadingValidationRequest, request: Request):
+    """積載可否チェック"""
+    items = [item.model_dump() for item in body.items]
+    is_valid, errors = await run_in_threadpool(
+        request.app.state.transport_service.validate_loading, items, body.truck_id
+    )
+    return {"valid": is_valid, "errors": errors}
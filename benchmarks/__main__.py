@@ -0,0 +1,8 @@
+# app/benchmarks/__main__.py
+"""ベンチマーク: python -m benchmarks --help"""
+import sys
+
+from benchmarks.runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
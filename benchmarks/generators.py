@@ -0,0 +1,132 @@
+# app/benchmarks/generators.py
+"""合成データ生成 - products.csv / production_instructions_detail.csv と同じ列構成で任意規模のデータを作る"""
+from dataclasses import dataclass
+from datetime import date, time
+
+import numpy as np
+import pandas as pd
+
+# 実データに見られる箱種・検査区分・容器寸法(mm)
+BOX_TYPES = ['W1', 'W2', 'SP', 'T1', 'T2']
+INSPECTION_CATEGORIES = ['N', 'NS', 'FS', 'F']
+CONTAINER_SIZES = [
+    (800, 600, 600), (1100, 1100, 900), (600, 400, 300), (1200, 1000, 800), (400, 300, 250),
+]
+
+
+@dataclass
+class BenchmarkScale:
+    """データ規模"""
+    products: int
+    days: int
+    trucks: int
+    containers: int
+
+
+SCALES = {
+    "small": BenchmarkScale(products=50, days=60, trucks=5, containers=5),
+    "medium": BenchmarkScale(products=500, days=250, trucks=20, containers=20),
+    "large": BenchmarkScale(products=3000, days=500, trucks=50, containers=40),
+}
+
+
+def generate_containers(n: int, seed: int = 0) -> pd.DataFrame:
+    """容器マスタ（container_capacity）"""
+    rng = np.random.default_rng(seed)
+    sizes = np.array(CONTAINER_SIZES)[np.arange(n) % len(CONTAINER_SIZES)]
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "name": [f"容器{i}" for i in range(1, n + 1)],
+        "width": sizes[:, 0],
+        "depth": sizes[:, 1],
+        "height": sizes[:, 2],
+        "max_weight": rng.integers(50, 500, n),
+        "can_mix": rng.random(n) < 0.7,
+    })
+
+
+def generate_products(n: int, containers_df: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """製品マスタ（products.csv の主要列 + 使用容器）"""
+    rng = np.random.default_rng(seed)
+    container_idx = rng.integers(0, len(containers_df), n)
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "factory": rng.choice([21, 22, 23], n),
+        "product_code": [f"V{53100000 + i:09d}" for i in range(n)],
+        "product_name": [f"部品{i:05d}" for i in range(n)],
+        "box_type": rng.choice(BOX_TYPES, n),
+        "capacity": rng.choice([1, 2, 3, 4, 6, 8, 10, 12, 20], n),
+        "inspection_category": rng.choice(INSPECTION_CATEGORIES, n, p=[0.6, 0.2, 0.1, 0.1]),
+        "lead_time": rng.integers(0, 4, n),
+        "fixed_point_days": rng.choice([0, 1, 2, 5], n),
+        "used_container_id": containers_df["id"].to_numpy()[container_idx],
+        "container_width": containers_df["width"].to_numpy()[container_idx],
+        "container_depth": containers_df["depth"].to_numpy()[container_idx],
+        "container_height": containers_df["height"].to_numpy()[container_idx],
+        "stackable": rng.random(n) < 0.8,
+    })
+
+
+def generate_instructions(products_df: pd.DataFrame, days: int,
+                          start_date: date = date(2025, 8, 1), seed: int = 0) -> pd.DataFrame:
+    """生産指示（production_instructions_detail.csv 相当）- 稼働日×製品、入り数の倍数"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start_date, periods=days)
+    n_products = len(products_df)
+
+    # 製品ごとの平均需要（対数正規）に日次の揺らぎを掛け、入り数単位に切り上げ
+    base = rng.lognormal(mean=3.5, sigma=0.8, size=n_products)
+    noise = rng.lognormal(mean=0.0, sigma=0.3, size=(days, n_products))
+    capacity = products_df["capacity"].to_numpy()
+    quantity = np.ceil(base * noise / capacity) * capacity
+
+    product_idx = np.tile(np.arange(n_products), days)
+    date_idx = np.repeat(np.arange(days), n_products)
+    instruction_dates = dates[date_idx]
+    return pd.DataFrame({
+        "id": np.arange(1, days * n_products + 1),
+        "product_id": products_df["id"].to_numpy()[product_idx],
+        "record_type": "V3",
+        "start_month": instruction_dates.strftime("%y%m"),
+        "instruction_date": instruction_dates.date,
+        "instruction_quantity": quantity.ravel().astype(int),
+        "inspection_category": products_df["inspection_category"].to_numpy()[product_idx],
+        "month_type": "first",
+        "day_number": date_idx + 1,
+        "product_code": products_df["product_code"].to_numpy()[product_idx],
+        "product_name": products_df["product_name"].to_numpy()[product_idx],
+    })
+
+
+def generate_trucks(n: int, seed: int = 0) -> pd.DataFrame:
+    """トラックマスタ（truck_master）- 4t/10t 相当の荷台寸法"""
+    rng = np.random.default_rng(seed)
+    large = rng.random(n) < 0.4
+    departure_hours = 6 + np.arange(n) % 12
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "name": [f"{i}便" for i in range(1, n + 1)],
+        "width": np.where(large, 2400, 2100),
+        "depth": np.where(large, 9600, 6200),
+        "height": np.where(large, 2500, 2100),
+        "max_weight": np.where(large, 10000, 4000),
+        "departure_time": [time(int(h), 0) for h in departure_hours],
+        "arrival_time": [time(int(min(h + 4, 23)), 0) for h in departure_hours],
+        "default_use": np.arange(n) < max(1, n // 3),
+        "arrival_day_offset": 0,
+    })
+
+
+def generate_constraints(products_df: pd.DataFrame, share: float = 0.3, seed: int = 0) -> pd.DataFrame:
+    """製品制約（production_constraints）- share の割合の製品に設定"""
+    rng = np.random.default_rng(seed)
+    selected = products_df[rng.random(len(products_df)) < share]
+    n = len(selected)
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "product_id": selected["id"].to_numpy(),
+        "daily_capacity": rng.integers(50, 500, n),
+        "smoothing_level": rng.uniform(0.5, 1.0, n).round(2),
+        "volume_per_unit": rng.uniform(0.01, 0.2, n).round(3),
+        "is_transport_constrained": rng.random(n) < 0.3,
+    })
@@ -0,0 +1,293 @@
+# app/benchmarks/runner.py
+"""ベンチマーク実行: python -m benchmarks
+
+合成データで計算機・バリデータ・モデル変換・リポジトリ読み込みを計測し、
+結果を JSON 履歴に追記する。直前の同規模の結果より閾値以上遅くなった項目を回帰として表示する。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.generators import (
+    SCALES, generate_containers, generate_products, generate_instructions, generate_trucks, generate_constraints,
+)
+
+DEFAULT_HISTORY = os.path.join("output", "benchmarks", "history.json")
+
+
+def build_dataset(scale_name: str, seed: int = 0) -> dict:
+    """規模に応じた合成データ一式"""
+    scale = SCALES[scale_name]
+    containers_df = generate_containers(scale.containers, seed)
+    products_df = generate_products(scale.products, containers_df, seed)
+    return {
+        "containers": containers_df,
+        "products": products_df,
+        "instructions": generate_instructions(products_df, scale.days, seed=seed),
+        "trucks": generate_trucks(scale.trucks, seed),
+        "constraints": generate_constraints(products_df, seed=seed),
+    }
+
+
+# -----------------------------
+# ベンチマーク定義（データ → 計測対象の引数なし関数）
+# -----------------------------
+def _production_calculator(data: dict) -> Callable:
+    from domain.calculators.production_calculator import ProductionCalculator
+    from domain.models.production import ProductionInstruction
+
+    instructions = [ProductionInstruction.from_dict(row) for row in data["instructions"].to_dict("records")]
+    constraints = [SimpleNamespace(**row) for row in data["constraints"].to_dict("records")]
+    calculator = ProductionCalculator()
+    return lambda: calculator.calculate_production_plan(instructions, constraints)
+
+
+def _inventory_projector(data: dict) -> Callable:
+    from domain.calculators.inventory_projector import ProjectionInput, InventoryProjector
+
+    projection = ProjectionInput.from_frames(data["instructions"], data["products"], initial_cover_days=2)
+    projector = InventoryProjector()
+    return lambda: projector.project(projection)
+
+
+def _working_calendar(data: dict) -> Callable:
+    import pandas as pd
+    from domain.calculators.working_calendar import WorkingCalendar
+
+    dates = data["instructions"]["instruction_date"]
+    lead_time = data["instructions"]["product_id"].to_numpy() % 5
+    calendar = WorkingCalendar(dates.min() - pd.Timedelta(days=30), dates.max() + pd.Timedelta(days=30))
+    return lambda: calendar.shift(dates, -lead_time)
+
+
+def _loading_inputs(data: dict):
+    from domain.models.transport import Container, Truck, LoadingItem
+
+    containers = [Container(**row) for row in data["containers"].to_dict("records")]
+    trucks = [Truck(**row) for row in data["trucks"].to_dict("records")]
+    # 初日の生産指示を積載アイテムにする（容器数 = 数量 / 入り数）
+    first_day = data["instructions"][data["instructions"]["instruction_date"] == data["instructions"]["instruction_date"].min()]
+    day = first_day.merge(data["products"][["id", "capacity", "used_container_id"]], left_on="product_id", right_on="id")
+    items = [
+        LoadingItem(int(r.product_id), int(r.used_container_id), int(-(-r.instruction_quantity // r.capacity)), 10.0)
+        for r in day.itertuples()
+    ]
+    return items, containers, trucks
+
+
+def _transport_planner(data: dict) -> Callable:
+    from domain.calculators.transport_planner import TransportPlanner
+
+    items, containers, trucks = _loading_inputs(data)
+    planner = TransportPlanner()
+    return lambda: planner.calculate_loading_plan(items, containers, trucks)
+
+
+def _stacked_transport_planner(data: dict) -> Callable:
+    from domain.calculators.transport_planner import TransportPlanner
+
+    items, containers, trucks = _loading_inputs(data)
+    products = data["products"]
+    stackable = dict(zip(products["id"].astype(int), products["stackable"].astype(bool)))
+    planner = TransportPlanner()
+    return lambda: planner.calculate_stacked_loading_plan(items, containers, trucks, stackable)
+
+
+def _dock_scheduler(data: dict) -> Callable:
+    from domain.calculators.transport_planner import TransportPlanner
+    from domain.calculators.dock_scheduler import DockScheduler, jobs_from_plans
+
+    items, containers, trucks = _loading_inputs(data)
+    jobs = jobs_from_plans(TransportPlanner().calculate_loading_plan(items, containers, trucks)["plans"])
+    scheduler = DockScheduler()
+    return lambda: scheduler.schedule(jobs, ["1", "2", "3"])
+
+
+def _jit_sequencer(data: dict) -> Callable:
+    import pandas as pd
+    from domain.calculators.jit_sequencer import SequencingInput, JITSequencer
+
+    items, _, trucks = _loading_inputs(data)
+    # アイテムを便に順に割り振り、便の出発時刻を期限にする
+    departures = [t.departure_time.hour * 60 + t.departure_time.minute for t in trucks]
+    demand = pd.DataFrame({
+        "product_id": [item.product_id for item in items],
+        "truck_name": [trucks[i % len(trucks)].name for i in range(len(items))],
+        "containers": [item.quantity for item in items],
+        "due_minute": [departures[i % len(trucks)] for i in range(len(items))],
+    })
+    sequencing = SequencingInput.from_frames(demand, data["products"])
+    sequencer = JITSequencer()
+    return lambda: sequencer.sequence(sequencing)
+
+
+def _loading_validator(data: dict) -> Callable:
+    from domain.validators.loading_validator import LoadingValidator
+
+    items, containers, trucks = _loading_inputs(data)
+    validator = LoadingValidator()
+    return lambda: [validator.validate_loading(items, containers, truck) for truck in trucks]
+
+
+def _model_conversion(data: dict) -> Callable:
+    from domain.models.production import ProductionInstruction
+
+    df = data["instructions"]
+    # サービス層と同じ iterrows + from_dict による変換
+    return lambda: [ProductionInstruction.from_dict(row.to_dict()) for _, row in df.iterrows()]
+
+
+def _repository_setup(data: dict):
+    """インメモリ SQLite にスキーマを作成し合成データを一括投入"""
+    from config import DatabaseConfig
+    from repository.database_manager import DatabaseManager
+    from repository.seed import bulk_load
+
+    db = DatabaseManager(DatabaseConfig(backend="sqlite", sqlite_path=":memory:"))
+    db.create_schema()
+    bulk_load(db, "container_capacity", data["containers"])
+    bulk_load(db, "truck_master", data["trucks"])
+    bulk_load(db, "products", data["products"])
+    bulk_load(db, "production_instructions_detail", data["instructions"])
+    bulk_load(db, "production_constraints", data["constraints"])
+    return db
+
+
+def _repository_instructions(data: dict) -> Callable:
+    from repository.production_repository import ProductionRepository
+
+    repo = ProductionRepository(_repository_setup(data))
+    return lambda: repo.get_production_instructions()
+
+
+def _repository_products(data: dict) -> Callable:
+    from repository.product_repository import ProductRepository
+
+    repo = ProductRepository(_repository_setup(data))
+    return lambda: (repo.get_all_products(), repo.get_product_constraints())
+
+
+def _repository_masters(data: dict) -> Callable:
+    from repository.transport_repository import TransportRepository
+
+    repo = TransportRepository(_repository_setup(data))
+    return lambda: (repo.get_containers(), repo.get_trucks())
+
+
+BENCHMARKS: List[Tuple[str, Callable[[dict], Callable]]] = [
+    ("production_calculator.calculate_production_plan", _production_calculator),
+    ("inventory_projector.project", _inventory_projector),
+    ("working_calendar.shift", _working_calendar),
+    ("transport_planner.calculate_loading_plan", _transport_planner),
+    ("transport_planner.calculate_stacked_loading_plan", _stacked_transport_planner),
+    ("dock_scheduler.schedule", _dock_scheduler),
+    ("jit_sequencer.sequence", _jit_sequencer),
+    ("loading_validator.validate_loading", _loading_validator),
+    ("model_conversion.production_instruction", _model_conversion),
+    ("repository.production_instructions", _repository_instructions),
+    ("repository.products_constraints", _repository_products),
+    ("repository.containers_trucks", _repository_masters),
+]
+
+
+def run_benchmarks(data: dict, repeat: int = 5, only: str = None) -> Dict[str, dict]:
+    """各ベンチマークを repeat 回実行（準備時間は含めない）"""
+    results = {}
+    for name, setup in BENCHMARKS:
+        if only and only not in name:
+            continue
+        func = setup(data)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        results[name] = {
+            "min_s": min(timings),
+            "median_s": statistics.median(timings),
+            "mean_s": statistics.fmean(timings),
+            "repeat": repeat,
+        }
+        print(f"{name:55s} min {min(timings) * 1000:10.2f}ms  median {statistics.median(timings) * 1000:10.2f}ms")
+    return results
+
+
+def load_history(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_regressions(history: list, scale: str, results: Dict[str, dict], threshold: float) -> List[str]:
+    """直前の同規模実行と比べて median が threshold 以上悪化した項目"""
+    previous = next((run for run in reversed(history) if run["scale"] == scale), None)
+    if previous is None:
+        return []
+    messages = []
+    for name, result in results.items():
+        before = previous["results"].get(name)
+        if not before or before["median_s"] <= 0:
+            continue
+        ratio = result["median_s"] / before["median_s"]
+        if ratio >= 1 + threshold:
+            messages.append(f"{name}: {before['median_s'] * 1000:.2f}ms → {result['median_s'] * 1000:.2f}ms (x{ratio:.2f})")
+    return messages
+
+
+def append_history(path: str, history: list, scale: str, results: Dict[str, dict]):
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    history.append({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scale": scale,
+        "results": results,
+    })
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="計画ロジック・リポジトリのベンチマーク")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="データ規模")
+    parser.add_argument("--repeat", type=int, default=5, help="繰り返し回数")
+    parser.add_argument("--only", default=None, help="名前に含まれる文字列で対象を絞り込み")
+    parser.add_argument("--seed", type=int, default=0, help="データ生成の乱数シード")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="結果履歴 JSON のパス")
+    parser.add_argument("--threshold", type=float, default=0.2, help="回帰とみなす悪化率")
+    parser.add_argument("--fail-on-regression", action="store_true", help="回帰検出時に終了コード 1")
+    args = parser.parse_args(argv)
+
+    scale = SCALES[args.scale]
+    print(f"規模 {args.scale}: 製品 {scale.products} / 日数 {scale.days} / トラック {scale.trucks} / 容器 {scale.containers}")
+    data = build_dataset(args.scale, args.seed)
+    results = run_benchmarks(data, args.repeat, args.only)
+
+    history = load_history(args.history)
+    regressions = find_regressions(history, args.scale, results, args.threshold)
+    append_history(args.history, history, args.scale, results)
+    print(f"履歴: {args.history}")
+
+    for message in regressions:
+        print(f"  [回帰] {message}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
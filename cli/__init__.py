@@ -0,0 +1 @@
+# app/cli/__init__.py
\ No newline at end of file
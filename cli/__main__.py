@@ -0,0 +1,8 @@
+# app/cli/__main__.py
+"""バッチ計画 CLI: python -m cli --help"""
+import sys
+
+from cli.batch_planner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
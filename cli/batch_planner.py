@@ -0,0 +1,164 @@
+# app/cli/batch_planner.py
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+from typing import List, Tuple, Optional
+
+import pandas as pd
+
+from domain.exceptions import PlanningError
+from domain.models.production import ProductionPlan
+from services.service_container import get_service_container
+
+
+# ワーカープロセスごとに1回だけ生成するサービス群
+_worker_services: Optional[dict] = None
+
+
+def _init_worker():
+    global _worker_services
+    container = get_service_container()
+    _worker_services = {
+        "production": container.production_service,
+        "transport": container.transport_service,
+        "product": container.product_service,
+    }
+
+
+def plan_chunk(period: Tuple[date, date]) -> List[ProductionPlan]:
+    """1期間分の平均化計画（ロットサイジング前）を作成"""
+    start_date, end_date = period
+    # チャンク自体がワーカープロセスで並列に動くため、チャンク内は分割せずに順に計算する
+    return _worker_services["production"].calculate_production_plan(
+        start_date, end_date, lot_sizing=False, max_workers=1
+    )
+
+
+def load_chunk(plan_df: pd.DataFrame) -> pd.DataFrame:
+    """1期間分の日別積載計画を作成（積載は出荷日ごとに独立）"""
+    if plan_df.empty:
+        return pd.DataFrame()
+    return _worker_services["transport"].calculate_loading_plans(plan_df, max_workers=1)
+
+
+def split_plan(plan_df: pd.DataFrame, periods: List[Tuple[date, date]]) -> List[pd.DataFrame]:
+    """計画を期間ごとに分割（行の順序は保つ）"""
+    if plan_df.empty:
+        return [plan_df for _ in periods]
+    dates = pd.to_datetime(plan_df['date']).dt.date
+    return [plan_df[(dates >= start) & (dates <= end)].reset_index(drop=True) for start, end in periods]
+
+
+def split_periods(start_date: date, end_date: date, chunk_days: int) -> List[Tuple[date, date]]:
+    """期間を重複しないチャンクに分割（両端含む）"""
+    periods = []
+    current = start_date
+    while current <= end_date:
+        chunk_end = min(current + timedelta(days=chunk_days - 1), end_date)
+        periods.append((current, chunk_end))
+        current = chunk_end + timedelta(days=1)
+    return periods
+
+
+class BatchPlanner:
+    """夜間バッチ用 生産計画・積載計画の一括作成
+
+    1. 平均化計画をチャンク（期間）ごとにワーカープロセスで並列計算
+    2. ロットサイジングは全期間を1回で計算（過不足の繰り越し・リードタイム前倒しがチャンク境界をまたぐため）
+    3. ロットサイジング後の計画をチャンクに分け、日別積載計画を並列計算
+    結果は一括計算（calculate_production_plan + calculate_loading_plans）と同じになる。
+    """
+
+    def __init__(self, output_dir: str, workers: Optional[int] = None, chunk_days: int = 7):
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_days = chunk_days
+
+    def run(self, start_date: date, end_date: date, write_excel: bool = True) -> dict:
+        """計画実行 - スナップショット CSV と Excel を出力"""
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        snapshot_dir = os.path.join(self.output_dir, "snapshots")
+        os.makedirs(snapshot_dir, exist_ok=True)
+        plan_path = os.path.join(snapshot_dir, f"production_plan_{stamp}.csv")
+        loading_path = os.path.join(snapshot_dir, f"loading_plan_{stamp}.csv")
+
+        periods = split_periods(start_date, end_date, self.chunk_days)
+        workers = min(self.workers, len(periods))
+        plan_frames, loading_frames = [], []
+
+        # チャンク単位で並列計算し、完了順ではなく期間順に逐次書き出す
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            smoothed = [plan for plans in executor.map(plan_chunk, periods) for plan in plans]
+            plans = get_service_container().production_service.apply_lot_sizing(smoothed)
+            chunk_frames = split_plan(pd.DataFrame([asdict(plan) for plan in plans]), periods)
+            for (chunk_start, chunk_end), plan_df, loading_df in zip(
+                    periods, chunk_frames, executor.map(load_chunk, chunk_frames)):
+                self._append_csv(plan_df, plan_path)
+                self._append_csv(loading_df, loading_path)
+                plan_frames.append(plan_df)
+                loading_frames.append(loading_df)
+                print(f"{chunk_start}〜{chunk_end}: 生産計画 {len(plan_df)}行 / 積載 {len(loading_df)}行")
+
+        plan_df = pd.concat(plan_frames, ignore_index=True) if plan_frames else pd.DataFrame()
+        loading_df = pd.concat(loading_frames, ignore_index=True) if loading_frames else pd.DataFrame()
+
+        excel_path = None
+        if write_excel:
+            excel_path = os.path.join(self.output_dir, f"plan_{start_date:%Y%m%d}_{end_date:%Y%m%d}.xlsx")
+            self._write_excel(plan_df, loading_df, excel_path)
+
+        return {
+            "production_rows": len(plan_df),
+            "loading_rows": len(loading_df),
+            "snapshots": [plan_path, loading_path],
+            "excel": excel_path,
+        }
+
+    def _append_csv(self, df: pd.DataFrame, path: str):
+        if df.empty:
+            return
+        df.to_csv(path, mode='a', header=not os.path.exists(path), index=False, encoding='utf-8-sig')
+
+    def _write_excel(self, plan_df: pd.DataFrame, loading_df: pd.DataFrame, path: str):
+        with pd.ExcelWriter(path) as writer:
+            plan_df.to_excel(writer, sheet_name="生産計画", index=False)
+            if not plan_df.empty:
+                daily = plan_df.groupby('date')[['demand_quantity', 'planned_quantity']].sum().reset_index()
+                daily.to_excel(writer, sheet_name="日次サマリー", index=False)
+            loading_df.to_excel(writer, sheet_name="積載計画", index=False)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="生産計画・積載計画バッチ")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(), help="開始日 (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="終了日 (既定: 開始日から3か月)")
+    parser.add_argument("--output-dir", default="output", help="出力ディレクトリ")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数 (既定: CPUコア数)")
+    parser.add_argument("--chunk-days", type=int, default=7, help="1チャンクあたりの日数")
+    parser.add_argument("--no-excel", action="store_true", help="Excel 出力を省略")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    end_date = args.end or args.start + timedelta(days=91)
+    if end_date < args.start:
+        print("終了日は開始日以降を指定してください")
+        return 2
+
+    started = time.perf_counter()
+    try:
+        result = BatchPlanner(args.output_dir, args.workers, args.chunk_days).run(
+            args.start, end_date, write_excel=not args.no_excel
+        )
+    except PlanningError as e:
+        print(f"計画作成エラー: {e}")
+        return 1
+    print(f"完了: 生産計画 {result['production_rows']}行 / 積載 {result['loading_rows']}行 "
+          f"({time.perf_counter() - started:.1f}秒)")
+    for path in result["snapshots"] + ([result["excel"]] if result["excel"] else []):
+        print(f"  出力: {path}")
+    return 0
@@ -0,0 +1,77 @@
+# app/cli/import_budget.py
+"""import 時間・依存の予算チェック: python -m cli.import_budget
+
+各モジュールを新しいプロセスで import し、所要時間と読み込まれた重いモジュールを検査する。
+予算超過または禁止モジュールの読み込みがあれば終了コード 1 を返す。
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+# (モジュール, 予算 ms, 読み込み禁止モジュール)
+BUDGETS = [
+    ("domain.models.production", 100, ["streamlit", "pandas", "sqlalchemy", "repository"]),
+    # 一括計算（calculate_planned_quantities）で numpy を読み込む分を含む
+    ("domain.calculators.production_calculator", 200, ["streamlit", "pandas", "sqlalchemy", "repository"]),
+    ("domain.models.transport", 600, ["streamlit", "pandas", "plotly", "repository"]),
+    ("domain.calculators.transport_planner", 600, ["streamlit", "pandas", "plotly", "repository"]),
+    ("domain.validators.loading_validator", 600, ["streamlit", "pandas", "plotly", "repository"]),
+    ("services.production_service", 1500, ["streamlit", "plotly"]),
+    ("services.transport_service", 1500, ["streamlit", "plotly"]),
+    ("cli.batch_planner", 1500, ["streamlit", "plotly"]),
+]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+loaded = sorted({{name.split('.')[0] for name in sys.modules}})
+print(json.dumps({{"elapsed_ms": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure(module: str) -> dict:
+    """新しいインタプリタで import 時間と読み込みモジュールを計測"""
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def check(budgets=BUDGETS, factor: float = 1.0) -> list:
+    """予算チェック - 違反メッセージのリストを返す"""
+    violations = []
+    for module, budget_ms, forbidden in budgets:
+        try:
+            result = measure(module)
+        except subprocess.CalledProcessError as e:
+            violations.append(f"{module}: import 失敗 {e.stderr.strip().splitlines()[-1] if e.stderr else ''}")
+            continue
+        heavy = [name for name in forbidden if name in result["loaded"]]
+        status = "OK"
+        if heavy:
+            status = "NG"
+            violations.append(f"{module}: 禁止モジュールを読み込み {heavy}")
+        if result["elapsed_ms"] > budget_ms * factor:
+            status = "NG"
+            violations.append(f"{module}: {result['elapsed_ms']:.0f}ms > 予算 {budget_ms * factor:.0f}ms")
+        print(f"[{status}] {module}: {result['elapsed_ms']:.0f}ms (予算 {budget_ms * factor:.0f}ms)")
+    return violations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m cli.import_budget", description="import 時間予算チェック")
+    parser.add_argument("--factor", type=float, default=1.0, help="予算倍率（低速な環境向け）")
+    args = parser.parse_args(argv)
+
+    violations = check(factor=args.factor)
+    for message in violations:
+        print(f"  - {message}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
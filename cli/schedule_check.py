@@ -0,0 +1,84 @@
+# app/cli/schedule_check.py
+"""既定設定の積込・生産順序チェック: python -m cli.schedule_check
+
+合成データ（benchmarks.generators）の1日分を DOCK_CONFIG・SEQUENCING_CONFIG の既定値で
+積載 → ドック割り当て → 生産順序まで計算し、遅れる便・生産単位や稼働時間を超える生産があれば終了コード 1 を返す。
+能力ではなく時刻設定（始業・稼働時間・積込開始）の整合を見るため、日産能力は default_daily_capacity を使う。
+"""
+import argparse
+import sys
+
+from benchmarks.generators import SCALES
+from benchmarks.runner import build_dataset, _loading_inputs
+from config import DOCK_CONFIG, SEQUENCING_CONFIG
+from domain.calculators.dock_scheduler import DockScheduler, jobs_from_plans, time_to_minutes, format_minutes
+from domain.calculators.jit_sequencer import SequencingInput, JITSequencer
+from domain.calculators.transport_planner import TransportPlanner
+from services.transport_service import TransportService
+
+
+def check(scale: str = "small", seed: int = 0) -> list:
+    """既定設定で1日分を計画 - 違反メッセージのリストを返す"""
+    data = build_dataset(scale, seed)
+    items, containers, trucks = _loading_inputs(data)
+    products = data["products"]
+    stackable = dict(zip(products["id"].astype(int), products["stackable"].astype(bool)))
+    plan_result = TransportPlanner().calculate_stacked_loading_plan(items, containers, trucks, stackable)
+
+    docks = [f"ドック{i}" for i in range(1, DOCK_CONFIG.dock_count + 1)]
+    scheduler = DockScheduler(
+        setup_minutes=DOCK_CONFIG.setup_minutes,
+        minutes_per_container=DOCK_CONFIG.minutes_per_container,
+        max_early_minutes=DOCK_CONFIG.max_early_minutes,
+        day_start=time_to_minutes(DOCK_CONFIG.day_start),
+    )
+    plan_result["dock_schedule"] = scheduler.schedule(jobs_from_plans(plan_result["plans"]), docks)
+
+    violations = [f"ドック: {message}" for message in plan_result["dock_schedule"].get("conflicts", [])]
+    for assignment in plan_result["dock_schedule"].get("assignments", []):
+        if assignment.delay_minutes > 0:
+            violations.append(f"ドック: {assignment.truck_name} の積込完了が出発に {assignment.delay_minutes:.0f}分遅れ")
+
+    shift_start = time_to_minutes(SEQUENCING_CONFIG.shift_start)
+    shift_end = shift_start + SEQUENCING_CONFIG.shift_minutes
+    demand_df = TransportService._sequencing_demand(plan_result)
+    sequencing = SequencingInput.from_frames(
+        demand_df, products, shift_minutes=SEQUENCING_CONFIG.shift_minutes,
+        default_daily_capacity=SEQUENCING_CONFIG.default_daily_capacity
+    )
+    sequence = JITSequencer().sequence(sequencing, shift_start, shift_end)["sequence"]
+    if sequence.empty:
+        return violations
+
+    late = sequence[sequence["late_minutes"] > 0]
+    overtime = sequence[sequence["overtime_minutes"] > 0]
+    for row in late.itertuples():
+        violations.append(f"生産順序: ライン{row.line} 製品{row.product_id}（{row.truck_name}）が期限 "
+                          f"{format_minutes(row.due_minute)} に {row.late_minutes:.0f}分遅れ")
+    for row in overtime.itertuples():
+        violations.append(f"生産順序: ライン{row.line} 製品{row.product_id}（{row.truck_name}）が稼働時間外 "
+                          f"{format_minutes(row.start_minute)}〜{format_minutes(row.end_minute)}")
+
+    by_day = sequence.groupby("production_day").agg(jobs=("product_id", "size"), containers=("containers", "sum"))
+    for day, row in by_day.iterrows():
+        label = "前稼働日" if day < 0 else "出荷日"
+        print(f"{label}: 生産単位 {int(row['jobs'])} / 箱数 {row['containers']:.0f}")
+    print(f"便 {len(plan_result['plans'])} / 積込遅れ {plan_result['dock_schedule']['delayed']} / "
+          f"生産遅れ {len(late)} / 稼働時間外 {len(overtime)}")
+    return violations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m cli.schedule_check", description="既定設定の積込・生産順序チェック")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="データ規模")
+    parser.add_argument("--seed", type=int, default=0, help="データ生成の乱数シード")
+    args = parser.parse_args(argv)
+
+    violations = check(args.scale, args.seed)
+    for message in violations:
+        print(f"  - {message}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,14 +6,23 @@ from typing import Dict, Any
 @dataclass
 class DatabaseConfig:
     """データベース接続設定"""
-    host: str = 'localhost'
-    user: str = 'root'
-    password: str = 'daisoseisanka1470-3#'
-    database: str = 'kubota_db'
+    # 接続先: mysql（本番） / sqlite（開発・テスト・ベンチマーク）
+    backend: str = os.environ.get('APP_DB_BACKEND', 'mysql')
+    # sqlite のファイルパス（":memory:" でインメモリ）
+    sqlite_path: str = os.environ.get('APP_SQLITE_PATH', 'app.sqlite3')
+    host: str = os.environ.get('APP_DB_HOST', 'localhost')
+    user: str = os.environ.get('APP_DB_USER', 'root')
+    password: str = os.environ.get('APP_DB_PASSWORD', 'daisoseisanka1470-3#')
+    database: str = os.environ.get('APP_DB_NAME', 'kubota_db')
     charset: str = 'utf8mb4'
-    port: int = 3306
+    port: int = int(os.environ.get('APP_DB_PORT', '3306'))
     autocommit: bool = True
     connect_timeout: int = 10
+    # コネクションプール設定（API など複数リクエストの同時処理向け）
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_recycle: int = 3600
+    pool_pre_ping: bool = True
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -34,6 +43,95 @@ class AppConfig:
     page_icon: str = "🏭"
     layout: str = "wide"
 
+@dataclass
+class ApiConfig:
+    """REST API 設定"""
+    host: str = os.environ.get('APP_API_HOST', '127.0.0.1')
+    port: int = int(os.environ.get('APP_API_PORT', '8000'))
+    workers: int = int(os.environ.get('APP_API_WORKERS', '1'))
+
+@dataclass
+class JobConfig:
+    """バックグラウンドジョブ設定"""
+    db_path: str = os.environ.get('APP_JOB_DB_PATH', 'jobs.sqlite3')
+    max_workers: int = int(os.environ.get('APP_JOB_WORKERS', '4'))
+    retention_days: int = 7
+    # 実行中ジョブの生存通知間隔と、通知が途絶えたジョブを失敗扱いにするまでの秒数
+    heartbeat_seconds: float = float(os.environ.get('APP_JOB_HEARTBEAT_SECONDS', '10'))
+    stale_seconds: float = float(os.environ.get('APP_JOB_STALE_SECONDS', '60'))
+
+@dataclass
+class InstrumentationConfig:
+    """計測設定"""
+    enabled: bool = os.environ.get('APP_INSTRUMENTATION', '1') != '0'
+    slow_query_ms: float = float(os.environ.get('APP_SLOW_QUERY_MS', '500'))
+    slow_query_keep: int = 50
+
+@dataclass
+class ProfilingConfig:
+    """ページプロファイル設定"""
+    output_dir: str = os.environ.get('APP_PROFILE_DIR', 'profiles')
+    top_n: int = 25
+
+@dataclass
+class RoutingConfig:
+    """配送ルート設定"""
+    # 拠点間の距離・所要時間表 CSV（from_location, to_location, distance_km, travel_minutes）
+    matrix_path: str = os.environ.get('APP_ROUTE_MATRIX', 'delivery_matrix.csv')
+    # 出発拠点（工場）の拠点コード
+    depot: str = os.environ.get('APP_ROUTE_DEPOT', 'DEPOT')
+    # 1納入先あたりの荷降ろし時間（分）
+    service_minutes: float = float(os.environ.get('APP_ROUTE_SERVICE_MINUTES', '20'))
+    # ルート改善に使う計算時間の上限（秒）
+    time_budget_s: float = float(os.environ.get('APP_ROUTE_TIME_BUDGET', '2'))
+
+@dataclass
+class DockConfig:
+    """積込ドック設定"""
+    # 積込ドック数
+    dock_count: int = int(os.environ.get('APP_DOCK_COUNT', '3'))
+    # 1便あたりの段取り時間（分）と容器1箱あたりの積込時間（分）
+    setup_minutes: float = float(os.environ.get('APP_DOCK_SETUP_MINUTES', '10'))
+    minutes_per_container: float = float(os.environ.get('APP_DOCK_MINUTES_PER_CONTAINER', '1'))
+    # 積込完了から出発まで待機できる上限（分）
+    max_early_minutes: float = float(os.environ.get('APP_DOCK_MAX_EARLY_MINUTES', '120'))
+    # 出発時刻未設定の便を積み込み始める時刻
+    day_start: str = os.environ.get('APP_DOCK_DAY_START', '06:00')
+
+@dataclass
+class SequencingConfig:
+    """生産順序計画設定"""
+    # 始業時刻と1日の稼働時間（分）- 日産能力をこの時間で割って加工速度にする
+    shift_start: str = os.environ.get('APP_SHIFT_START', '08:00')
+    shift_minutes: float = float(os.environ.get('APP_SHIFT_MINUTES', '480'))
+    # 日産能力未登録の製品に使う値
+    default_daily_capacity: float = float(os.environ.get('APP_DEFAULT_DAILY_CAPACITY', '1000'))
+
+@dataclass
+class PlanningConfig:
+    """分割並列計画設定"""
+    # 工場別・出荷日別の分割計画に使うワーカープロセス数（1 はプロセスを使わず順に計算）
+    workers: int = int(os.environ.get('APP_PLAN_WORKERS', '1'))
+    # 工場に加えて分割に使う製品マスタの列（例: item_group、空なら工場のみ）
+    shard_group_column: str = os.environ.get('APP_PLAN_SHARD_GROUP', '')
+
+@dataclass
+class CalendarConfig:
+    """稼働日カレンダー設定"""
+    # 休日・出勤日 CSV（factory, date, end_date, is_working, note）- factory 空欄は全工場共通
+    holidays_path: str = os.environ.get('APP_HOLIDAY_CALENDAR', 'factory_holidays.csv')
+    # 曜日ごとの稼働（月〜日、1 = 稼働）
+    weekmask: str = os.environ.get('APP_WORK_WEEKMASK', '1111100')
+
 # 設定インスタンス
 DB_CONFIG = DatabaseConfig()
-APP_CONFIG = AppConfig()
\ No newline at end of file
+APP_CONFIG = AppConfig()
+API_CONFIG = ApiConfig()
+JOB_CONFIG = JobConfig()
+INSTRUMENTATION_CONFIG = InstrumentationConfig()
+PROFILING_CONFIG = ProfilingConfig()
+ROUTING_CONFIG = RoutingConfig()
+DOCK_CONFIG = DockConfig()
+SEQUENCING_CONFIG = SequencingConfig()
+PLANNING_CONFIG = PlanningConfig()
+CALENDAR_CONFIG = CalendarConfig()
\ No newline at end of file
@@ -0,0 +1,96 @@
+# app/domain/calculators/container_demand.py
+"""容器需要予測 - 生産計画・出荷計画から容器種別×日の必要箱数と流通中の箱数を集計する
+
+- 充填: 製品別の計画量を入り数で切り上げた箱数（used_container_id の容器）
+- 出荷: 積載計画の箱数（なければ生産日に全数出荷とみなす）
+- 返却: 出荷から return_days 日後に空箱として戻る
+- 流通数: 累積充填数 − 累積返却数（工場内の実箱 + 輸送・納入先にある箱）
+"""
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class ContainerDemandInput:
+    """容器需要計算の入力（容器×日の NumPy 配列）"""
+    container_ids: np.ndarray      # (容器数,) 昇順
+    dates: pd.DatetimeIndex        # (日数,) 暦日
+    filled: np.ndarray             # (容器数, 日数) 充填箱数
+    shipped: np.ndarray            # (容器数, 日数) 出荷箱数
+    return_days: int = 3
+
+    @classmethod
+    def from_frames(cls, plan_df: pd.DataFrame, products_df: pd.DataFrame,
+                    shipping_df: Optional[pd.DataFrame] = None, return_days: int = 3) -> 'ContainerDemandInput':
+        """生産計画（date, product_id, planned_quantity）・製品マスタ・積載計画（date, container_id, quantity）から作成"""
+        merged = plan_df.merge(
+            products_df[['id', 'capacity', 'used_container_id']].drop_duplicates('id'),
+            left_on='product_id', right_on='id', how='inner'
+        )
+        merged['planned_quantity'] = pd.to_numeric(merged['planned_quantity'], errors='coerce').fillna(0)
+        merged = merged[merged['used_container_id'].notna() & (merged['planned_quantity'] > 0)]
+        capacity = np.maximum(pd.to_numeric(merged['capacity'], errors='coerce').fillna(1).to_numpy(dtype=float), 1)
+        boxes = np.ceil(merged['planned_quantity'].to_numpy(dtype=float) / capacity)
+        fill_dates = pd.to_datetime(merged['date']).dt.normalize()
+        fill_containers = merged['used_container_id'].to_numpy(dtype=np.int64)
+
+        has_shipping = shipping_df is not None and not shipping_df.empty
+        if has_shipping:
+            shipping_df = shipping_df.dropna(subset=['date', 'container_id'])
+            ship_dates = pd.to_datetime(shipping_df['date']).dt.normalize()
+            ship_containers = shipping_df['container_id'].to_numpy(dtype=np.int64)
+            ship_boxes = pd.to_numeric(shipping_df['quantity'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        else:
+            ship_dates, ship_containers, ship_boxes = fill_dates, fill_containers, boxes
+
+        container_ids = np.union1d(fill_containers, ship_containers)
+        all_dates = pd.concat([fill_dates, ship_dates])
+        dates = (pd.date_range(all_dates.min(), all_dates.max(), freq='D')
+                 if len(all_dates) else pd.DatetimeIndex([]))
+
+        def grid(containers: np.ndarray, day_dates: pd.Series, values: np.ndarray) -> np.ndarray:
+            result = np.zeros((len(container_ids), len(dates)))
+            np.add.at(result, (np.searchsorted(container_ids, containers), dates.get_indexer(day_dates)), values)
+            return result
+
+        return cls(
+            container_ids=container_ids,
+            dates=dates,
+            filled=grid(fill_containers, fill_dates, boxes),
+            shipped=grid(ship_containers, ship_dates, ship_boxes),
+            return_days=max(int(return_days), 0),
+        )
+
+
+class ContainerDemandCalculator:
+    """容器需要計算機"""
+
+    def calculate(self, data: ContainerDemandInput) -> Dict[str, Any]:
+        """容器×日の充填・出荷・返却・流通箱数（行形式）と容器別サマリーを返す"""
+        n_days = len(data.dates)
+        returned = np.zeros_like(data.shipped)
+        if data.return_days < n_days:
+            returned[:, data.return_days:] = data.shipped[:, :n_days - data.return_days]
+        in_circulation = np.cumsum(data.filled, axis=1) - np.cumsum(returned, axis=1)
+
+        daily = pd.DataFrame({
+            "container_id": np.repeat(data.container_ids, n_days),
+            "date": np.tile(data.dates.date, len(data.container_ids)),
+            "filled": data.filled.ravel(),
+            "shipped": data.shipped.ravel(),
+            "returned": returned.ravel(),
+            "in_circulation": in_circulation.ravel(),
+        })
+        has_days = n_days > 0
+        peak_day = in_circulation.argmax(axis=1) if has_days else np.zeros(len(data.container_ids), dtype=int)
+        summary = pd.DataFrame({
+            "container_id": data.container_ids,
+            "total_filled": data.filled.sum(axis=1),
+            "peak_daily_filled": data.filled.max(axis=1) if has_days else 0.0,
+            "avg_daily_filled": data.filled.mean(axis=1) if has_days else 0.0,
+            "peak_in_circulation": in_circulation.max(axis=1) if has_days else 0.0,
+            "peak_date": data.dates[peak_day].date if has_days else None,
+        })
+        return {"daily": daily, "summary": summary, "return_days": data.return_days}
@@ -0,0 +1,176 @@
+# app/domain/calculators/demand_simulator.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List
+import numpy as np
+import pandas as pd
+
+from .production_calculator import ProductionCalculator
+from .scenario_runner import align_product_constraints
+
+# 対象とする予測月（列名, 表示ラベル）
+FORECAST_MONTHS = [('total_next_month', '翌月'), ('total_next_next_month', '翌々月')]
+PERCENTILES = [50, 90, 95, 99]
+
+# 1バッチあたりの要素数上限（シナリオ×製品×日）
+_BATCH_ELEMENTS = 4_000_000
+
+
+@dataclass
+class SimulationInput:
+    """需要変動シミュレーション入力（読み取り専用）"""
+    product_ids: np.ndarray        # (製品数,)
+    forecast: np.ndarray           # (製品数, 月数) 月次予測量
+    daily_capacity: np.ndarray     # (製品数,) 制約なしは NaN
+    smoothing_level: np.ndarray    # (製品数,)
+    volume_per_unit: np.ndarray    # (製品数,) m³
+    truck_volume: float            # 1便あたり積載体積 (m³)
+    working_days: int = 20         # 1か月の稼働日数
+    monthly_cv: float = 0.15       # 月次予測量の変動係数
+    daily_cv: float = 0.25         # 日別配分の変動係数
+
+    @classmethod
+    def from_frames(cls, forecasts_df: pd.DataFrame, constraints_df: pd.DataFrame,
+                    truck_volume: float, **params) -> 'SimulationInput':
+        """月次予測・製品制約 DataFrame から入力を作成"""
+        forecasts_df = forecasts_df.dropna(subset=['product_id']).sort_values('product_id')
+        forecasts_df = forecasts_df.drop_duplicates('product_id', keep='last')
+        product_ids = forecasts_df['product_id'].to_numpy(dtype=np.int64)
+        forecast = np.column_stack([
+            pd.to_numeric(forecasts_df[col], errors='coerce').fillna(0).to_numpy(dtype=float)
+            for col, _ in FORECAST_MONTHS
+        ])
+        daily_capacity, smoothing_level, volume_per_unit = align_product_constraints(product_ids, constraints_df)
+        return cls(product_ids=product_ids, forecast=forecast, daily_capacity=daily_capacity,
+                   smoothing_level=smoothing_level, volume_per_unit=volume_per_unit,
+                   truck_volume=float(truck_volume or 0.0), **params)
+
+
+def _lognormal_factors(rng: np.random.Generator, cv: float, shape) -> np.ndarray:
+    """平均1・変動係数 cv の対数正規乱数"""
+    if cv <= 0:
+        return np.ones(shape, dtype=np.float32)
+    sigma = np.sqrt(np.log1p(cv ** 2))
+    return rng.lognormal(-sigma ** 2 / 2, sigma, size=shape).astype(np.float32)
+
+
+def simulate_batch(data: SimulationInput, n_scenarios: int, seed) -> Dict[str, np.ndarray]:
+    """シナリオ1バッチ分の需要サンプリングと計画・積載評価"""
+    rng = np.random.default_rng(seed)
+    n_products, n_months = data.forecast.shape
+    days = data.working_days
+
+    monthly = data.forecast[None, :, :] * _lognormal_factors(rng, data.monthly_cv, (n_scenarios, n_products, n_months))
+
+    capacity_need = np.zeros((n_scenarios, n_products, n_months), dtype=np.float32)
+    backlog = np.zeros((n_scenarios, n_months), dtype=np.float32)
+    trips = np.zeros((n_scenarios, n_months), dtype=np.float32)
+    peak_trips = np.zeros((n_scenarios, n_months), dtype=np.float32)
+
+    for m in range(n_months):
+        # 月次量を稼働日に配分（配分比の合計は1）
+        shares = _lognormal_factors(rng, data.daily_cv, (n_scenarios, n_products, days))
+        shares /= shares.sum(axis=2, keepdims=True)
+        daily = monthly[:, :, m, None] * shares
+
+        planned = ProductionCalculator.calculate_planned_quantities(
+            daily, data.smoothing_level[None, :, None], data.daily_capacity[None, :, None]
+        )
+        capacity_need[:, :, m] = daily.max(axis=2)
+        backlog[:, m] = np.maximum(daily - planned, 0).sum(axis=(1, 2))
+
+        daily_volume = np.einsum('spd,p->sd', planned, data.volume_per_unit)
+        if data.truck_volume > 0:
+            daily_trips = np.ceil(daily_volume / data.truck_volume)
+            trips[:, m] = daily_trips.sum(axis=1)
+            peak_trips[:, m] = daily_trips.max(axis=1)
+
+    return {
+        "monthly_demand": monthly.astype(np.float32),
+        "capacity_need": capacity_need,
+        "backlog": backlog,
+        "trips": trips,
+        "peak_trips": peak_trips,
+    }
+
+
+# ワーカープロセス側で共有する入力（initializer で1回だけ受け取る）
+_WORKER_INPUT: Optional[SimulationInput] = None
+
+
+def _init_worker(data: SimulationInput):
+    global _WORKER_INPUT
+    _WORKER_INPUT = data
+
+
+def _simulate_in_worker(task) -> Dict[str, np.ndarray]:
+    n_scenarios, seed = task
+    return simulate_batch(_WORKER_INPUT, n_scenarios, seed)
+
+
+class DemandSimulator:
+    """需要変動モンテカルロシミュレーション"""
+
+    def simulate(self, data: SimulationInput, n_scenarios: int = 10000,
+                 seed: Optional[int] = None, max_workers: Optional[int] = 1) -> Dict[str, Any]:
+        """シナリオを一括サンプリングし、能力・便数のパーセンタイルを返す"""
+        if len(data.product_ids) == 0 or n_scenarios <= 0:
+            return {"products": pd.DataFrame(), "transport": pd.DataFrame(), "n_scenarios": 0}
+
+        tasks = self._make_tasks(data, n_scenarios, seed)
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        if workers <= 1:
+            batches = [simulate_batch(data, n, s) for n, s in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(data,)) as executor:
+                batches = list(executor.map(_simulate_in_worker, tasks))
+
+        merged = {key: np.concatenate([b[key] for b in batches]) for key in batches[0]}
+        return {
+            "products": self._product_percentiles(data, merged),
+            "transport": self._transport_percentiles(merged),
+            "n_scenarios": n_scenarios,
+        }
+
+    def _make_tasks(self, data: SimulationInput, n_scenarios: int, seed) -> List[tuple]:
+        """メモリ上限に収まるバッチに分割（乱数系列はバッチごとに独立）"""
+        per_scenario = max(len(data.product_ids) * data.working_days, 1)
+        batch_size = max(1, min(n_scenarios, _BATCH_ELEMENTS // per_scenario))
+        sizes = [batch_size] * (n_scenarios // batch_size)
+        if n_scenarios % batch_size:
+            sizes.append(n_scenarios % batch_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        return list(zip(sizes, seeds))
+
+    def _product_percentiles(self, data: SimulationInput, merged) -> pd.DataFrame:
+        """製品×月別の需要量・必要日次能力パーセンタイル"""
+        demand_q = np.percentile(merged["monthly_demand"], PERCENTILES, axis=0)   # (q, 製品, 月)
+        need_q = np.percentile(merged["capacity_need"], PERCENTILES, axis=0)
+        frames = []
+        for m, (col, label) in enumerate(FORECAST_MONTHS):
+            frame = pd.DataFrame({
+                "product_id": data.product_ids,
+                "month": label,
+                "forecast": data.forecast[:, m],
+                "daily_capacity": data.daily_capacity,
+            })
+            for i, q in enumerate(PERCENTILES):
+                frame[f"demand_p{q}"] = demand_q[i, :, m]
+            for i, q in enumerate(PERCENTILES):
+                frame[f"capacity_need_p{q}"] = need_q[i, :, m]
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+    def _transport_percentiles(self, merged) -> pd.DataFrame:
+        """月別の必要便数・未充足量パーセンタイル"""
+        rows = []
+        for m, (col, label) in enumerate(FORECAST_MONTHS):
+            row = {"month": label}
+            for key, name in [("trips", "trips"), ("peak_trips", "peak_daily_trips"), ("backlog", "backlog")]:
+                values = np.percentile(merged[key][:, m], PERCENTILES)
+                for q, v in zip(PERCENTILES, values):
+                    row[f"{name}_p{q}"] = float(v)
+            rows.append(row)
+        return pd.DataFrame(rows)
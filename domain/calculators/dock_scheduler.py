@@ -0,0 +1,178 @@
+# app/domain/calculators/dock_scheduler.py
+"""積込ドック・出発枠スケジューリング
+
+1. 便ごとの積込時間 = 段取り時間 + 箱数 × 1箱あたりの積込時間
+2. 出発時刻の早い便から順に、出発時刻ちょうどに積込が終わる枠を各ドックで探す
+   （重なる積込があればその開始より前にずらす。待機上限 max_early_minutes まで）
+3. 最も出発に近い枠（待機が短い枠）のドックに割り当てる
+4. どのドックにも枠がない便は、予定出発以降で最も早く積み終わるドックに割り当てて遅延を記録する
+5. 出発時刻未設定の便は day_start 以降で最も早く空くドックに割り当てる
+
+ドックごとの積込を区間木で持ち、重なり検索を O(log n) で行う。
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .interval_tree import IntervalTree
+from ..models.transport import DockAssignment, TransportPlan
+
+
+@dataclass
+class LoadingJob:
+    """1便の積込"""
+    truck_id: int
+    truck_name: str
+    containers: int
+    departure_minute: Optional[float] = None   # 出荷日 0:00 からの分（未設定は None）
+
+
+def time_to_minutes(value) -> Optional[float]:
+    """time / 'HH:MM[:SS]' → 0:00 からの分"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        parts = [int(p) for p in value.split(':')]
+        return parts[0] * 60 + (parts[1] if len(parts) > 1 else 0)
+    return value.hour * 60 + value.minute
+
+
+def format_minutes(minutes: Optional[float]) -> str:
+    """0:00 からの分 → 'HH:MM'（前日・翌日・n日前・n日後は接頭辞付き）"""
+    if minutes is None:
+        return "-"
+    day, rest = divmod(int(round(minutes)), 1440)
+    text = f"{rest // 60:02d}:{rest % 60:02d}"
+    if day == -1:
+        return f"前日 {text}"
+    if day == 1:
+        return f"翌日 {text}"
+    if day < 0:
+        return f"{-day}日前 {text}"
+    if day > 0:
+        return f"{day}日後 {text}"
+    return text
+
+
+def jobs_from_plans(plans: List[TransportPlan]) -> List[LoadingJob]:
+    """積載計画（便ごと）から積込を作成 - 箱数は積載アイテムの数量合計"""
+    return [LoadingJob(
+        truck_id=plan.truck.id,
+        truck_name=plan.truck.name,
+        containers=int(sum(item.quantity or 0 for item in plan.loaded_items)),
+        departure_minute=time_to_minutes(plan.truck.departure_time),
+    ) for plan in plans if plan is not None]
+
+
+class DockScheduler:
+    """積込ドックスケジューラ"""
+
+    def __init__(self, setup_minutes: float = 10.0, minutes_per_container: float = 1.0,
+                 max_early_minutes: float = 120.0, day_start: float = 360.0):
+        self.setup_minutes = setup_minutes
+        self.minutes_per_container = minutes_per_container
+        self.max_early_minutes = max_early_minutes
+        self.day_start = day_start
+
+    def loading_minutes(self, containers: int) -> float:
+        """積込時間（分）"""
+        return self.setup_minutes + self.minutes_per_container * max(int(containers), 0)
+
+    def schedule(self, jobs: List[LoadingJob], docks: List[str]) -> Dict:
+        """全便のドック割り当て - assignments は積込開始順"""
+        started = time.perf_counter()
+        if not docks:
+            return {"assignments": [], "conflicts": ["積込ドックがありません"], "delayed": 0,
+                    "elapsed_s": time.perf_counter() - started}
+
+        trees = {dock: IntervalTree() for dock in docks}
+        assignments = []
+        timed = sorted((j for j in jobs if j.departure_minute is not None),
+                       key=lambda j: (j.departure_minute, -j.containers))
+        untimed = sorted((j for j in jobs if j.departure_minute is None), key=lambda j: -j.containers)
+
+        for job in timed:
+            duration = self.loading_minutes(job.containers)
+            latest = job.departure_minute - duration
+            earliest = latest - self.max_early_minutes
+            candidates = [(self._latest_fit(trees[dock], latest, duration, earliest), i)
+                          for i, dock in enumerate(docks)]
+            fits = [(start, i) for start, i in candidates if start is not None]
+            if fits:
+                # 出発に最も近い（待機の短い）枠、同じなら番号の小さいドック
+                start, i = max(fits, key=lambda c: (c[0], -c[1]))
+            else:
+                start, i = min((self._earliest_fit(trees[dock], latest, duration), i)
+                               for i, dock in enumerate(docks))
+            assignments.append(self._assign(trees, docks[i], job, start, duration))
+
+        for job in untimed:
+            duration = self.loading_minutes(job.containers)
+            start, i = min((self._earliest_fit(trees[dock], self.day_start, duration), i)
+                           for i, dock in enumerate(docks))
+            assignments.append(self._assign(trees, docks[i], job, start, duration))
+
+        assignments.sort(key=lambda a: (a.start_minute, a.dock))
+        return {
+            "assignments": assignments,
+            "conflicts": self.find_conflicts(assignments),
+            "delayed": sum(1 for a in assignments if a.delay_minutes > 0),
+            "elapsed_s": time.perf_counter() - started,
+        }
+
+    @staticmethod
+    def find_conflicts(assignments: List[DockAssignment]) -> List[str]:
+        """同じドックでの積込の重なりと出発遅れを列挙（手修正したスケジュールのチェックにも使う）"""
+        conflicts = []
+        trees: Dict[str, IntervalTree] = {}
+        for a in sorted(assignments, key=lambda a: a.start_minute):
+            tree = trees.setdefault(a.dock, IntervalTree())
+            for _, end, other in tree.overlaps(a.start_minute, a.end_minute):
+                overlap_end = format_minutes(min(a.end_minute, end))
+                conflicts.append(f"{a.dock}: {other.truck_name} と {a.truck_name} の積込が重なっています "
+                                 f"({format_minutes(a.start_minute)}〜{overlap_end})")
+            tree.add(a.start_minute, a.end_minute, a)
+            if a.departure_minute is not None and a.end_minute > a.departure_minute + 1e-9:
+                conflicts.append(f"{a.truck_name}: 積込完了 {format_minutes(a.end_minute)} が"
+                                 f"予定出発 {format_minutes(a.departure_minute)} に間に合いません")
+        return conflicts
+
+    @staticmethod
+    def _latest_fit(tree: IntervalTree, latest: float, duration: float, earliest: float) -> Optional[float]:
+        """latest 以前で earliest 以降の、重なりのない最も遅い開始時刻"""
+        start = latest
+        while start >= earliest - 1e-9:
+            overlaps = tree.overlaps(start, start + duration)
+            if not overlaps:
+                return start
+            # 重なる積込のうち最も早く始まるものの直前まで戻す
+            start = min(o[0] for o in overlaps) - duration
+        return None
+
+    @staticmethod
+    def _earliest_fit(tree: IntervalTree, earliest: float, duration: float) -> float:
+        """earliest 以降で重なりのない最も早い開始時刻"""
+        start = earliest
+        while True:
+            overlaps = tree.overlaps(start, start + duration)
+            if not overlaps:
+                return start
+            start = max(o[1] for o in overlaps)
+
+    @staticmethod
+    def _assign(trees: Dict[str, IntervalTree], dock: str, job: LoadingJob,
+                start: float, duration: float) -> DockAssignment:
+        end = start + duration
+        trees[dock].add(start, end, job)
+        delay = 0.0 if job.departure_minute is None else max(end - job.departure_minute, 0.0)
+        return DockAssignment(
+            truck_id=job.truck_id,
+            truck_name=job.truck_name,
+            dock=dock,
+            containers=job.containers,
+            start_minute=start,
+            end_minute=end,
+            departure_minute=job.departure_minute,
+            delay_minutes=delay if not math.isclose(delay, 0.0, abs_tol=1e-9) else 0.0,
+        )
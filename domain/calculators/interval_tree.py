@@ -0,0 +1,104 @@
+# app/domain/calculators/interval_tree.py
+"""区間木 - 半開区間 [start, end) の挿入・重なり検索
+
+開始位置をキーとするトリープに部分木内の最大終了位置を持たせ、重ならない部分木を枝刈りする。
+挿入・検索とも期待 O(log n + 重なり件数)。
+"""
+import random
+from typing import Any, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("start", "end", "value", "priority", "max_end", "left", "right")
+
+    def __init__(self, start: float, end: float, value: Any, priority: float):
+        self.start = start
+        self.end = end
+        self.value = value
+        self.priority = priority
+        self.max_end = end
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+
+    def update(self):
+        self.max_end = max(self.end,
+                           self.left.max_end if self.left else self.end,
+                           self.right.max_end if self.right else self.end)
+
+
+class IntervalTree:
+    """区間木"""
+
+    def __init__(self, seed: Optional[int] = 0):
+        self._root: Optional[_Node] = None
+        self._size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, start: float, end: float, value: Any = None):
+        """区間 [start, end) を追加"""
+        node = _Node(start, end, value, self._random.random())
+        self._root = self._insert(self._root, node)
+        self._size += 1
+
+    def overlaps(self, start: float, end: float) -> List[Tuple[float, float, Any]]:
+        """[start, end) と重なる区間（開始位置順）"""
+        found = []
+        self._search(self._root, start, end, found)
+        return found
+
+    def items(self) -> List[Tuple[float, float, Any]]:
+        """全区間（開始位置順）"""
+        found = []
+        self._walk(self._root, found)
+        return found
+
+    def _insert(self, root: Optional[_Node], node: _Node) -> _Node:
+        if root is None:
+            return node
+        if node.start < root.start:
+            root.left = self._insert(root.left, node)
+            if root.left.priority > root.priority:
+                root = self._rotate_right(root)
+        else:
+            root.right = self._insert(root.right, node)
+            if root.right.priority > root.priority:
+                root = self._rotate_left(root)
+        root.update()
+        return root
+
+    @staticmethod
+    def _rotate_right(node: _Node) -> _Node:
+        pivot = node.left
+        node.left, pivot.right = pivot.right, node
+        node.update()
+        pivot.update()
+        return pivot
+
+    @staticmethod
+    def _rotate_left(node: _Node) -> _Node:
+        pivot = node.right
+        node.right, pivot.left = pivot.left, node
+        node.update()
+        pivot.update()
+        return pivot
+
+    def _search(self, node: Optional[_Node], start: float, end: float, found: list):
+        # 部分木の終了位置がすべて start 以前なら重ならない
+        if node is None or node.max_end <= start:
+            return
+        self._search(node.left, start, end, found)
+        if node.start < end and start < node.end:
+            found.append((node.start, node.end, node.value))
+        # 右部分木の開始位置はすべて node.start 以上
+        if node.start < end:
+            self._search(node.right, start, end, found)
+
+    def _walk(self, node: Optional[_Node], found: list):
+        if node is None:
+            return
+        self._walk(node.left, found)
+        found.append((node.start, node.end, node.value))
+        self._walk(node.right, found)
@@ -0,0 +1,165 @@
+# app/domain/calculators/inventory_projector.py
+"""時系列在庫推移（MRP） - 製品×日の2次元配列で全製品の在庫・補充・欠品を一括計算する
+
+- 需要: 生産指示の数量を総所要量とする
+- 補充: fixed_point_days 日ごとの定点日にまとめて入庫（0 以下は毎日）、入り数の倍数に切り上げ
+- 手配: 入庫日から lead_time 日前に手配。計画開始日より前に手配が必要な入庫は最短の入庫日へ後ろ倒しする
+- 稼働日カレンダーを渡すと日の軸を稼働日のみにし、リードタイム・定点間隔も稼働日で数える
+"""
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+import numpy as np
+import pandas as pd
+
+
+def offset_by_lead_time(quantities: np.ndarray, lead_time: np.ndarray) -> np.ndarray:
+    """製品×日の数量を製品別リードタイム分前倒し（期間開始より前は初日にまとめる）"""
+    shifted = np.zeros_like(quantities)
+    rows, cols = np.nonzero(quantities)
+    np.add.at(shifted, (rows, np.maximum(cols - lead_time[rows], 0)), quantities[rows, cols])
+    return shifted
+
+
+@dataclass
+class ProjectionInput:
+    """在庫推移計算の入力（NumPy配列）"""
+    product_ids: np.ndarray        # (製品数,) 昇順
+    dates: pd.DatetimeIndex        # (日数,) 計画期間の暦日（カレンダー指定時は稼働日）
+    demand: np.ndarray             # (製品数, 日数) 総所要量
+    initial_on_hand: np.ndarray    # (製品数,) 期首在庫
+    lead_time: np.ndarray          # (製品数,) 日
+    order_cycle: np.ndarray        # (製品数,) 定点間隔（日、1 = 毎日）
+    lot_size: np.ndarray           # (製品数,) 入り数
+
+    @classmethod
+    def from_frames(cls, instructions_df: pd.DataFrame, products_df: pd.DataFrame,
+                    start_date=None, end_date=None, initial_on_hand=None,
+                    initial_cover_days: float = 0.0, calendar=None) -> 'ProjectionInput':
+        """生産指示・製品マスタ DataFrame から入力を作成
+
+        initial_on_hand は product_id → 数量の dict / Series。未指定の製品は
+        平均日次需要 × initial_cover_days を期首在庫とする。
+        calendar（WorkingCalendar）指定時、非稼働日の指示は直前の稼働日の所要量とする。
+        """
+        instructions_df = instructions_df.dropna(subset=['product_id', 'instruction_date', 'instruction_quantity'])
+        instruction_dates = pd.to_datetime(instructions_df['instruction_date']).dt.normalize()
+        start = pd.Timestamp(start_date) if start_date is not None else instruction_dates.min()
+        end = pd.Timestamp(end_date) if end_date is not None else instruction_dates.max()
+        has_period = pd.notna(start) and pd.notna(end)
+        if calendar is not None and has_period:
+            dates = calendar.between(start, end)
+        else:
+            dates = pd.date_range(start, end, freq='D') if has_period else pd.DatetimeIndex([])
+
+        product_ids = np.union1d(
+            products_df['id'].dropna().to_numpy(dtype=np.int64) if not products_df.empty else np.zeros(0, np.int64),
+            instructions_df['product_id'].to_numpy(dtype=np.int64),
+        )
+        n_products, n_days = len(product_ids), len(dates)
+
+        # 指示行を (製品, 日) に集計
+        demand = np.zeros((n_products, n_days))
+        if not n_days:
+            day_index = np.zeros(0, np.int64)
+        elif calendar is not None:
+            # 期間初日が休日でも期間内の指示は初日に含める
+            day_index = calendar.to_index(instruction_dates) - calendar.to_index(dates[:1])[0]
+            day_index = np.where(instruction_dates.to_numpy() >= start, np.maximum(day_index, 0), -1)
+        else:
+            day_index = (instruction_dates - start).dt.days.to_numpy()
+        in_range = (day_index >= 0) & (day_index < n_days)
+        rows = np.searchsorted(product_ids, instructions_df['product_id'].to_numpy(dtype=np.int64)[in_range])
+        np.add.at(demand, (rows, day_index[in_range]),
+                  instructions_df['instruction_quantity'].to_numpy(dtype=float)[in_range])
+
+        master = (products_df.drop_duplicates('id', keep='last').set_index('id')
+                  .reindex(product_ids) if not products_df.empty else pd.DataFrame(index=product_ids))
+
+        def column(name: str, default: float) -> np.ndarray:
+            if name not in master.columns:
+                return np.full(n_products, default)
+            return pd.to_numeric(master[name], errors='coerce').fillna(default).to_numpy(dtype=float)
+
+        on_hand = demand.mean(axis=1) * initial_cover_days if n_days else np.zeros(n_products)
+        if initial_on_hand is not None:
+            given = pd.Series(initial_on_hand, dtype=float).reindex(product_ids)
+            on_hand = np.where(given.notna(), given.to_numpy(), on_hand)
+
+        return cls(
+            product_ids=product_ids,
+            dates=dates,
+            demand=demand,
+            initial_on_hand=on_hand,
+            lead_time=np.maximum(column('lead_time', 0), 0).astype(np.int64),
+            order_cycle=np.maximum(column('fixed_point_days', 0), 1).astype(np.int64),
+            lot_size=np.maximum(column('capacity', 1), 1),
+        )
+
+
+class InventoryProjector:
+    """時系列在庫推移計算機"""
+
+    def project(self, data: ProjectionInput) -> Dict[str, Any]:
+        """製品×日の在庫・入庫・手配量と、製品別の欠品サマリーを返す"""
+        n_products, n_days = data.demand.shape
+        day = np.arange(n_days)
+
+        cumulative_demand = np.cumsum(data.demand, axis=1)
+
+        # 定点区間の末日までの累積所要量をまかなう累積入庫量（入り数の倍数に切り上げ）
+        bucket_end = np.minimum((day[None, :] // data.order_cycle[:, None] + 1) * data.order_cycle[:, None],
+                                n_days) - 1
+        covered = np.take_along_axis(cumulative_demand, bucket_end, axis=1) if n_days else cumulative_demand
+        shortfall = np.maximum(covered - data.initial_on_hand[:, None], 0)
+        cumulative_receipts = np.ceil(shortfall / data.lot_size[:, None]) * data.lot_size[:, None]
+
+        # リードタイム内には入庫できない（それまでの所要量は最短入庫日にまとめる）
+        cumulative_receipts[day[None, :] < data.lead_time[:, None]] = 0
+
+        receipts = np.diff(cumulative_receipts, axis=1, prepend=0)
+        on_hand = data.initial_on_hand[:, None] + cumulative_receipts - cumulative_demand
+        releases = offset_by_lead_time(receipts, data.lead_time)
+
+        return {
+            "product_ids": data.product_ids,
+            "dates": data.dates,
+            "demand": data.demand,
+            "receipts": receipts,
+            "releases": releases,
+            "on_hand": on_hand,
+            "summary": self._shortage_summary(data, on_hand, receipts),
+        }
+
+    @staticmethod
+    def _shortage_summary(data: ProjectionInput, on_hand: np.ndarray, receipts: np.ndarray) -> pd.DataFrame:
+        """製品別の欠品日数・最大欠品量・初回欠品日"""
+        short = on_hand < 0
+        has_shortage = short.any(axis=1)
+        first = np.argmax(short, axis=1)
+        first_dates = (pd.Series(data.dates[first], dtype='datetime64[ns]')
+                       if len(data.dates) else pd.Series(pd.NaT, index=range(len(first))))
+        return pd.DataFrame({
+            "product_id": data.product_ids,
+            "total_demand": data.demand.sum(axis=1),
+            "initial_on_hand": data.initial_on_hand,
+            "total_receipts": receipts.sum(axis=1),
+            "ending_on_hand": on_hand[:, -1] if on_hand.shape[1] else data.initial_on_hand,
+            "min_on_hand": on_hand.min(axis=1) if on_hand.shape[1] else data.initial_on_hand,
+            "shortage_days": short.sum(axis=1),
+            "max_shortage": np.maximum(-on_hand, 0).max(axis=1) if on_hand.shape[1] else 0.0,
+            "first_shortage_date": first_dates.where(has_shortage).dt.date.to_numpy(),
+            "lead_time": data.lead_time,
+            "order_cycle": data.order_cycle,
+            "lot_size": data.lot_size,
+        })
+
+    @staticmethod
+    def to_frame(result: Dict[str, Any], field: str = "on_hand",
+                 product_ids: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """指定製品の日別推移（行: 日付, 列: 製品ID）"""
+        values = result[field]
+        columns = result["product_ids"]
+        if product_ids is not None:
+            rows = np.searchsorted(columns, np.asarray(product_ids, dtype=np.int64))
+            values, columns = values[rows], columns[rows]
+        return pd.DataFrame(values.T, index=result["dates"], columns=columns)
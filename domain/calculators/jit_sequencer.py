@@ -0,0 +1,154 @@
+# app/domain/calculators/jit_sequencer.py
+"""JIT 生産順序計画 - 1日の生産を積込便の時刻から逆算して並べる
+
+- 生産単位: 製品×便の箱数（便に載らなかった分は終業時刻が期限）
+- 期限: 便の積込開始時刻（ドック割り当てがなければ出発時刻）
+- ライン（工場）ごとに期限の早い順に並べ、期限に間に合う範囲でできるだけ遅く作る
+  （完成から積込までの仮置き＝仕掛り置き場を最小にする）
+- 期限が始業以前（積込が始業前の便）の分は前稼働日のシフトで作り、その終業までに完成させる
+  （前稼働日の時刻は出荷日 0:00 からの負の分で表す）
+- 同じシフトで作る他の出荷日の分（前稼働日の当日出荷分・翌稼働日の始業前分）は booked として渡すと
+  ラインの時間を先に押さえ、結果には含めない
+
+ライン×生産日ごとの累積加工時間 P を使い、完成時刻 = min(後続の 期限 − P) + P を
+逆順の累積最小で一括計算する。始業より前に始まる分は始業から詰めて後ろへずらし、遅れとして記録する。
+生産日のシフトの終業を過ぎて完成する分は、期限に間に合っても稼働時間外（overtime_minutes）として記録する。
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class SequencingInput:
+    """順序計画の入力（生産単位ごとの NumPy 配列）"""
+    lines: np.ndarray          # (件数,) ライン（工場コード）
+    product_ids: np.ndarray    # (件数,)
+    truck_names: np.ndarray    # (件数,)
+    containers: np.ndarray     # (件数,) 箱数
+    minutes: np.ndarray        # (件数,) 加工時間（分）
+    due: np.ndarray            # (件数,) 期限（出荷日 0:00 からの分）
+    production_day: Optional[np.ndarray] = None  # (件数,) 生産日 -1（前稼働日）/ 0、None は期限から決める
+    booked: Optional[np.ndarray] = None          # (件数,) 他の出荷日の分（ラインの時間を押さえるだけ）
+
+    @classmethod
+    def from_frames(cls, demand_df: pd.DataFrame, products_df: pd.DataFrame,
+                    capacities_df: pd.DataFrame = None, shift_minutes: float = 480.0,
+                    default_daily_capacity: float = 1000.0) -> 'SequencingInput':
+        """生産単位（product_id, truck_name, containers, due_minute）・製品マスタ・日産能力から作成
+
+        1箱の加工時間 = 稼働時間 × 入り数 ÷ 日産能力（daily_capacity、未設定は default_daily_capacity）
+        demand_df に production_day・booked 列があればそのまま使う。
+        """
+        master = products_df[['id', 'capacity']].copy()
+        master['factory'] = products_df['factory'] if 'factory' in products_df.columns else None
+        merged = demand_df.merge(master.drop_duplicates('id'), left_on='product_id', right_on='id', how='left')
+        if capacities_df is not None and not capacities_df.empty:
+            merged = merged.merge(capacities_df[['product_id', 'daily_capacity']].drop_duplicates('product_id'),
+                                  on='product_id', how='left')
+        else:
+            merged['daily_capacity'] = np.nan
+
+        capacity = np.maximum(pd.to_numeric(merged['capacity'], errors='coerce').fillna(1).to_numpy(dtype=float), 1)
+        daily = pd.to_numeric(merged['daily_capacity'], errors='coerce').to_numpy(dtype=float)
+        daily = np.where(np.isfinite(daily) & (daily > 0), daily, default_daily_capacity)
+        containers = pd.to_numeric(merged['containers'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        return cls(
+            lines=merged['factory'].fillna('').astype(str).to_numpy(),
+            product_ids=merged['product_id'].to_numpy(dtype=np.int64),
+            truck_names=merged['truck_name'].fillna('').astype(str).to_numpy(),
+            containers=containers,
+            minutes=containers * shift_minutes * capacity / daily,
+            due=merged['due_minute'].to_numpy(dtype=float),
+            production_day=merged['production_day'].to_numpy(dtype=np.int64) if 'production_day' in merged else None,
+            booked=merged['booked'].fillna(False).to_numpy(dtype=bool) if 'booked' in merged else None,
+        )
+
+
+class JITSequencer:
+    """JIT 生産順序計画"""
+
+    def sequence(self, data: SequencingInput, shift_start: float = 480.0, shift_end: Optional[float] = None,
+                 previous_shift_offset: float = 1440.0) -> Dict[str, Any]:
+        """ライン別の生産順序（開始・完成時刻）とライン別サマリーを返す
+
+        shift_end を指定すると、期限が始業以前の分は previous_shift_offset 分前（前稼働日）の
+        シフトで作る（production_day = -1）。未指定なら全量を当日のシフトで作り、稼働時間外は数えない。
+        data.production_day があればそれに従う。booked の行は同じライン×生産日の時間を占めるが、
+        順序・サマリーからは除く。
+        """
+        df = pd.DataFrame({
+            "line": data.lines,
+            "product_id": data.product_ids,
+            "truck_name": data.truck_names,
+            "containers": data.containers,
+            "minutes": data.minutes,
+            "due_minute": data.due,
+            "booked": False if data.booked is None else data.booked,
+        })
+        # 同じ期限の中では1分あたりの箱数が多いものを後にする（仮置きの箱×分が最小）
+        df = df[df["containers"] > 0].assign(rate=lambda d: d["containers"] / np.maximum(d["minutes"], 1e-9))
+        if data.production_day is not None:
+            df["production_day"] = data.production_day[df.index]
+        else:
+            previous = df["due_minute"] <= shift_start if shift_end is not None else False
+            df["production_day"] = np.where(previous, -1, 0)
+        df = df.sort_values(["line", "production_day", "due_minute", "rate", "product_id"],
+                            kind="stable", ignore_index=True)
+        if df.empty:
+            return {"sequence": df, "summary": pd.DataFrame()}
+
+        # 前稼働日分はそのシフトの時刻に置き換え、どの生産日も終業までに完成させる
+        offset = np.where(df["production_day"] < 0, previous_shift_offset, 0.0)
+        target = df["due_minute"]
+        if shift_end is not None:
+            target = np.minimum(target, shift_end - offset)
+        shifts = [df["line"], df["production_day"]]
+        cumulative = df.groupby(shifts, sort=False)["minutes"].cumsum()
+        # 完成時刻 = 後続すべての (期限 − 累積加工時間) の最小 + 累積加工時間
+        slack = (target - cumulative)[::-1].groupby([s[::-1] for s in shifts], sort=False).cummin()[::-1]
+        end = np.maximum(slack + cumulative, shift_start - offset + cumulative)
+        df["end_minute"] = end
+        df["start_minute"] = end - df["minutes"]
+        df["wait_minutes"] = np.maximum(df["due_minute"] - end, 0.0)
+        df["late_minutes"] = np.maximum(end - df["due_minute"], 0.0)
+        # 生産日のシフトの終業（前稼働日は shift_end − previous_shift_offset）を過ぎた分
+        df["overtime_minutes"] = 0.0 if shift_end is None else np.maximum(end - (shift_end - offset), 0.0)
+        df = df[~df["booked"]].reset_index(drop=True)
+        if df.empty:
+            return {"sequence": df, "summary": pd.DataFrame()}
+        df["order"] = df.groupby("line", sort=False).cumcount() + 1
+
+        summary = df.assign(staging=df["containers"] * df["wait_minutes"],
+                            late=df["late_minutes"] > 0,
+                            overtime=df["overtime_minutes"] > 0).groupby("line", sort=True).agg(
+            jobs=("product_id", "size"),
+            containers=("containers", "sum"),
+            first_start=("start_minute", "min"),
+            last_end=("end_minute", "max"),
+            staging_container_minutes=("staging", "sum"),
+            late_jobs=("late", "sum"),
+            overtime_jobs=("overtime", "sum"),
+            max_overtime_minutes=("overtime_minutes", "max"),
+        ).reset_index()
+        summary = summary.merge(self._peak_staged(df), on="line", how="left")
+
+        columns = ["line", "order", "production_day", "product_id", "truck_name", "containers", "start_minute",
+                   "end_minute", "due_minute", "wait_minutes", "late_minutes", "overtime_minutes"]
+        return {"sequence": df[columns], "summary": summary}
+
+    @staticmethod
+    def _peak_staged(df: pd.DataFrame) -> pd.DataFrame:
+        """ライン別の仮置き箱数の最大（完成で +箱数、積込開始で −箱数、同時刻は搬出を先に数える）"""
+        staged = df[df["wait_minutes"] > 0]
+        events = pd.DataFrame({
+            "line": np.concatenate([staged["line"].to_numpy(), staged["line"].to_numpy()]),
+            "time": np.concatenate([staged["end_minute"].to_numpy(), staged["due_minute"].to_numpy()]),
+            "delta": np.concatenate([staged["containers"].to_numpy(), -staged["containers"].to_numpy()]),
+        }).sort_values(["line", "time", "delta"], kind="stable")
+        events["level"] = events.groupby("line")["delta"].cumsum()
+        peak = events.groupby("line")["level"].max().rename("peak_staged_containers").reset_index()
+        all_lines = pd.DataFrame({"line": df["line"].unique()})
+        return all_lines.merge(peak, on="line", how="left").fillna({"peak_staged_containers": 0.0})
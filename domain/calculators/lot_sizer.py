@@ -0,0 +1,122 @@
+# app/domain/calculators/lot_sizer.py
+"""ロットサイジング - 平均化後の計画量を容器（入り数）単位に丸め、最小・最大ロットを守る
+
+製品×日の2次元配列で、日ごとに全製品を一括処理する（製品方向にベクトル化）。
+- 正味所要量 = 当日の計画量 − 前日までの過剰生産分（不足分は繰り越し）
+- ロット = 正味所要量を入り数の倍数に切り上げ、最小ロット以上・最大ロット以下に収める
+- 製造リードタイム（lead_time_days）分、計画日を前倒しする
+  期間開始より前に着手すべきロットは初日にまとまるため、最大ロットを超える分は期間内に生産できない量
+  （前倒し不足 past_due）として初日の計画から除く
+- 稼働日カレンダーを渡すと計画日を稼働日に揃え（休日の計画は直前の稼働日）、前倒しも稼働日で数える
+"""
+from dataclasses import dataclass
+from typing import Dict, Any
+import numpy as np
+import pandas as pd
+
+from .inventory_projector import offset_by_lead_time
+
+# 浮動小数の丸め誤差で入り数が1つ余分に切り上がらないための許容値
+_EPSILON = 1e-9
+
+
+@dataclass
+class LotSizingInput:
+    """ロットサイジングの入力（NumPy配列）"""
+    product_ids: np.ndarray        # (製品数,) 昇順
+    dates: pd.DatetimeIndex        # (日数,) 計画日（カレンダー指定時は期間内の全稼働日）
+    requirements: np.ndarray       # (製品数, 日数) 平均化後の計画量
+    lot_multiple: np.ndarray       # (製品数,) 入り数
+    min_lot: np.ndarray            # (製品数,) 入り数の倍数に切り上げ済み
+    max_lot: np.ndarray            # (製品数,) 入り数の倍数に切り捨て済み（上限なしは inf）
+    lead_time: np.ndarray          # (製品数,) 計画日数
+
+    @classmethod
+    def from_frames(cls, plan_df: pd.DataFrame, products_df: pd.DataFrame,
+                    lot_constraints_df: pd.DataFrame, calendar=None) -> 'LotSizingInput':
+        """計画（date, product_id, planned_quantity）・製品マスタ・ロット制約から入力を作成"""
+        plan_df = plan_df.dropna(subset=['product_id', 'date'])
+        plan_dates = pd.to_datetime(plan_df['date']).dt.normalize()
+        if calendar is not None and len(plan_dates):
+            plan_index = calendar.to_index(plan_dates)
+            first, last = max(int(plan_index.min()), 0), int(plan_index.max())
+            dates = pd.DatetimeIndex(calendar.to_date(np.arange(first, last + 1)).astype('datetime64[ns]'))
+            columns = np.maximum(plan_index - first, 0)
+        else:
+            dates = pd.DatetimeIndex(np.unique(plan_dates.to_numpy()))
+            columns = dates.get_indexer(plan_dates)
+        product_ids, rows = np.unique(plan_df['product_id'].to_numpy(dtype=np.int64), return_inverse=True)
+        n_products = len(product_ids)
+
+        requirements = np.zeros((n_products, len(dates)))
+        np.add.at(requirements, (rows, columns),
+                  pd.to_numeric(plan_df['planned_quantity'], errors='coerce').fillna(0).to_numpy(dtype=float))
+
+        def aligned(df: pd.DataFrame, key: str, name: str, default: float) -> np.ndarray:
+            if df is None or df.empty or name not in df.columns:
+                return np.full(n_products, default)
+            series = df.drop_duplicates(key, keep='last').set_index(key)[name]
+            return pd.to_numeric(series, errors='coerce').reindex(product_ids).fillna(default).to_numpy(dtype=float)
+
+        multiple = np.maximum(aligned(products_df, 'id', 'capacity', 1), 1)
+        min_lot = np.ceil(aligned(lot_constraints_df, 'product_id', 'min_lot_size', 0) / multiple - _EPSILON) * multiple
+        max_lot = np.floor(aligned(lot_constraints_df, 'product_id', 'max_lot_size', np.inf) / multiple) * multiple
+        # 最大ロットが1箱未満・最小ロット未満の場合は最小ロット（1箱以上）を優先
+        max_lot = np.maximum(max_lot, np.maximum(min_lot, multiple))
+
+        return cls(
+            product_ids=product_ids,
+            dates=dates,
+            requirements=requirements,
+            lot_multiple=multiple,
+            min_lot=min_lot,
+            max_lot=max_lot,
+            lead_time=np.maximum(aligned(lot_constraints_df, 'product_id', 'lead_time_days', 0), 0).astype(np.int64),
+        )
+
+
+class LotSizer:
+    """ロットサイジング計算機"""
+
+    def size(self, data: LotSizingInput) -> Dict[str, Any]:
+        """製品×日のロット量（リードタイム前倒し後）と過剰在庫・未充足量・前倒し不足を返す"""
+        n_products, n_days = data.requirements.shape
+        lots = np.zeros((n_products, n_days))
+        surplus = np.zeros((n_products, n_days))
+        backlog = np.zeros((n_products, n_days))
+
+        # 累積の生産量 − 所要量（正なら過剰在庫、負なら未充足の繰り越し）
+        position = np.zeros(n_products)
+        for day in range(n_days):
+            need = np.maximum(data.requirements[:, day] - position, 0)
+            lot = np.ceil(need / data.lot_multiple - _EPSILON) * data.lot_multiple
+            lot = np.where(lot > 0, np.clip(lot, data.min_lot, data.max_lot), 0)
+            position += lot - data.requirements[:, day]
+            lots[:, day] = lot
+            surplus[:, day] = np.maximum(position, 0)
+            backlog[:, day] = np.maximum(-position, 0)
+
+        lots = offset_by_lead_time(lots, data.lead_time)
+        past_due = np.zeros(n_products)
+        if n_days:
+            past_due = np.maximum(lots[:, 0] - data.max_lot, 0)
+            lots[:, 0] -= past_due
+
+        return {
+            "product_ids": data.product_ids,
+            "dates": data.dates,
+            "lots": lots,
+            "surplus": surplus,
+            "backlog": backlog,
+            "past_due": past_due,
+        }
+
+    @staticmethod
+    def to_frame(result: Dict[str, Any]) -> pd.DataFrame:
+        """ロットのある (product_id, date, lot_quantity) 行"""
+        rows, cols = np.nonzero(result["lots"])
+        return pd.DataFrame({
+            "product_id": result["product_ids"][rows],
+            "date": result["dates"][cols].date,
+            "lot_quantity": result["lots"][rows, cols],
+        })
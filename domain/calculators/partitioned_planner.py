@@ -0,0 +1,109 @@
+# app/domain/calculators/partitioned_planner.py
+"""工場別の分割計画 - 計画を独立した単位に分け、ワーカープロセスで並列計算して決定的に結合する
+
+- 生産計画: 製品の生産工場（modified_factory、未設定は factory）ごと、指定があれば製品グループ別にも分割
+  結果は元の生産指示の順に並べ直すため、分割数・ワーカー数に関わらず一括計算と同じ結果になる
+- 積載計画: 出荷日ごとに分割（トラックは日ごとに全車両を使える）、結果は出荷日順
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+from .production_calculator import ProductionCalculator
+from .transport_planner import TransportPlanner
+from ..models.production import ProductionInstruction, ProductionPlan
+from ..models.transport import Container, Truck, LoadingItem
+
+
+def production_shards(products_df: pd.DataFrame, group_column: Optional[str] = None) -> Dict[int, Tuple]:
+    """製品ID → 分割キー（生産工場[, 製品グループ]）"""
+    if products_df is None or products_df.empty:
+        return {}
+    factory = pd.Series('', index=products_df.index)
+    for column in ('factory', 'modified_factory'):
+        if column in products_df.columns:
+            values = products_df[column].astype('string').str.strip()
+            factory = factory.mask(values.notna() & (values != ''), values)
+    keys = [factory.fillna('').astype(str)]
+    if group_column and group_column in products_df.columns:
+        keys.append(products_df[group_column].fillna('').astype(str))
+    return dict(zip(products_df['id'].astype(int), zip(*keys)))
+
+
+def plan_production_shard(instructions: List[ProductionInstruction], constraints: List) -> List[ProductionPlan]:
+    """1分割分の生産計画（分割内の製品の制約だけに絞って計算）"""
+    product_ids = {i.product_id for i in instructions}
+    shard_constraints = [c for c in constraints if c.product_id in product_ids]
+    return ProductionCalculator().calculate_production_plan(instructions, shard_constraints)
+
+
+def plan_loading_day(items: List[LoadingItem], containers: List[Container], trucks: List[Truck],
+                     stackable: Dict[int, bool]) -> Dict[str, Any]:
+    """1出荷日分の段積み積載計画"""
+    return TransportPlanner().calculate_stacked_loading_plan(items, containers, trucks, stackable)
+
+
+# ワーカープロセス側で共有する入力（initializer で1回だけ受け取る）
+_WORKER_INPUT: tuple = ()
+
+
+def _init_worker(*shared):
+    global _WORKER_INPUT
+    _WORKER_INPUT = shared
+
+
+def _production_in_worker(instructions: List[ProductionInstruction]) -> List[ProductionPlan]:
+    return plan_production_shard(instructions, *_WORKER_INPUT)
+
+
+def _loading_in_worker(items: List[LoadingItem]) -> Dict[str, Any]:
+    return plan_loading_day(items, *_WORKER_INPUT)
+
+
+def _run(function, worker_function, tasks: List, shared: tuple, max_workers: Optional[int]) -> List:
+    """タスクを順に実行（ワーカー2以上ならプロセス並列）- 結果はタスクの順"""
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return [function(task, *shared) for task in tasks]
+    # 共通の入力は各ワーカーへ1回だけ転送し、タスクには分割分のみを渡す
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=shared) as executor:
+        return list(executor.map(worker_function, tasks))
+
+
+class PartitionedPlanner:
+    """工場別・出荷日別の分割並列計画"""
+
+    def plan_production(self, instructions: List[ProductionInstruction], constraints: List,
+                        shard_of: Dict[int, Hashable], max_workers: Optional[int] = None) -> List[ProductionPlan]:
+        """分割キーごとに生産計画を並列計算し、元の指示順に結合"""
+        positions: Dict[Hashable, List[int]] = {}
+        for i, instruction in enumerate(instructions):
+            positions.setdefault(shard_of.get(instruction.product_id, ('',)), []).append(i)
+        # 大きい分割から投入して待ち時間を減らす（結合順は位置で決まるので結果に影響しない）
+        keys = sorted(positions, key=lambda k: (-len(positions[k]), str(k)))
+        tasks = [[instructions[i] for i in positions[key]] for key in keys]
+        results = _run(plan_production_shard, _production_in_worker, tasks, (constraints,), max_workers)
+
+        plans: List[Optional[ProductionPlan]] = [None] * len(instructions)
+        for key, shard_plans in zip(keys, results):
+            for i, plan in zip(positions[key], shard_plans):
+                plans[i] = plan
+        return [plan for plan in plans if plan is not None]
+
+    def plan_loading(self, day_items: Dict[Any, List[LoadingItem]], containers: List[Container],
+                     trucks: List[Truck], stackable: Optional[Dict[int, bool]] = None,
+                     max_workers: Optional[int] = None) -> Dict[Any, Dict[str, Any]]:
+        """出荷日ごとの段積み積載計画を並列計算 - 出荷日順の {出荷日 (date): 計画結果}
+
+        出荷日は文字列・Timestamp・date のいずれでもよく、date に揃えてから同じ日の分をまとめる。
+        """
+        by_day: Dict[Any, List[LoadingItem]] = {}
+        for day, items in day_items.items():
+            if items:
+                by_day.setdefault(pd.Timestamp(day).date(), []).extend(items)
+        days = sorted(by_day)
+        results = _run(plan_loading_day, _loading_in_worker, [by_day[day] for day in days],
+                       (containers, trucks, stackable or {}), max_workers)
+        return dict(zip(days, results))
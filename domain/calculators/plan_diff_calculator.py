@@ -0,0 +1,114 @@
+# app/domain/calculators/plan_diff_calculator.py
+from typing import List, Dict, Any, Sequence
+import numpy as np
+import pandas as pd
+
+# 計画種別ごとの結合キーと比較対象の数量列
+PRODUCTION_PLAN_KEYS = ['date', 'product_id']
+PRODUCTION_PLAN_VALUES = ['demand_quantity', 'planned_quantity']
+LOADING_PLAN_KEYS = ['truck_id', 'date', 'product_id']
+LOADING_PLAN_VALUES = ['quantity']
+CONSTRAINT_KEYS = ['product_id']
+CONSTRAINT_VALUES = ['daily_capacity', 'smoothing_level', 'volume_per_unit', 'is_transport_constrained']
+
+
+class PlanDiffCalculator:
+    """計画差分計算機 - 2つの計画スナップショットをキー結合で比較"""
+
+    def diff_production_plans(self, old_df: pd.DataFrame, new_df: pd.DataFrame) -> Dict[str, Any]:
+        """生産計画差分 (date, product_id)"""
+        return self.diff(old_df, new_df, PRODUCTION_PLAN_KEYS, PRODUCTION_PLAN_VALUES)
+
+    def diff_loading_plans(self, old_df: pd.DataFrame, new_df: pd.DataFrame) -> Dict[str, Any]:
+        """積載計画差分 (truck_id, date, product_id)"""
+        return self.diff(old_df, new_df, LOADING_PLAN_KEYS, LOADING_PLAN_VALUES)
+
+    def diff_constraints(self, old_df: pd.DataFrame, new_df: pd.DataFrame) -> Dict[str, Any]:
+        """製品制約差分 (product_id)"""
+        return self.diff(old_df, new_df, CONSTRAINT_KEYS, CONSTRAINT_VALUES)
+
+    def diff(self,
+             old_df: pd.DataFrame,
+             new_df: pd.DataFrame,
+             keys: Sequence[str],
+             value_columns: Sequence[str]) -> Dict[str, Any]:
+        """汎用差分計算 - 追加・削除・変更行と数量差分を返す"""
+        keys = list(keys)
+        value_columns = [c for c in value_columns if c in old_df.columns or c in new_df.columns]
+
+        old = self._normalize(old_df, keys, value_columns)
+        new = self._normalize(new_df, keys, value_columns)
+
+        merged = old.merge(new, on=keys, how='outer', suffixes=('_old', '_new'), indicator=True)
+
+        # 数量差分（片側にしかない行は 0 として扱う）
+        changed_mask = np.zeros(len(merged), dtype=bool)
+        for col in value_columns:
+            old_values = merged[f'{col}_old'].fillna(0).to_numpy(dtype=float)
+            new_values = merged[f'{col}_new'].fillna(0).to_numpy(dtype=float)
+            delta = new_values - old_values
+            merged[f'{col}_delta'] = delta
+            changed_mask |= ~np.isclose(delta, 0.0)
+
+        side = merged['_merge'].to_numpy()
+        added = merged[side == 'right_only']
+        removed = merged[side == 'left_only']
+        changed = merged[(side == 'both') & changed_mask]
+
+        added = self._single_side(added, keys, '_new')
+        removed = self._single_side(removed, keys, '_old')
+        changed = changed.drop(columns='_merge').reset_index(drop=True)
+
+        return {
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+            "summary": self._summarize(merged, added, removed, changed, value_columns),
+        }
+
+    def _normalize(self, df: pd.DataFrame, keys: List[str], value_columns: List[str]) -> pd.DataFrame:
+        """キー型を揃え、キー重複を集約"""
+        if df is None or df.empty:
+            return pd.DataFrame(columns=keys + value_columns)
+
+        missing = [k for k in keys if k not in df.columns]
+        if missing:
+            raise ValueError(f"差分キー列がありません: {missing}")
+
+        df = df.copy()
+        for key in keys:
+            if 'date' in key:
+                df[key] = pd.to_datetime(df[key]).dt.normalize()
+        for col in value_columns:
+            if col not in df.columns:
+                df[col] = 0
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+        # キーが一意なら集約は不要（通常の計画はこちら）
+        if not df.duplicated(keys).any():
+            return df
+
+        # 数量列は合計、その他の属性列は先頭値で集約
+        agg = {col: 'sum' for col in value_columns}
+        agg.update({col: 'first' for col in df.columns if col not in keys and col not in agg})
+        return df.groupby(keys, sort=False, dropna=False).agg(agg).reset_index()
+
+    def _single_side(self, df: pd.DataFrame, keys: List[str], suffix: str) -> pd.DataFrame:
+        """片側のみの行から該当側の列だけを取り出す"""
+        columns = keys + [c for c in df.columns if c.endswith(suffix) or c.endswith('_delta')]
+        result = df[columns].copy()
+        result.columns = [c[:-len(suffix)] if c.endswith(suffix) else c for c in columns]
+        return result.reset_index(drop=True)
+
+    def _summarize(self, merged, added, removed, changed, value_columns) -> Dict[str, Any]:
+        """差分サマリー"""
+        summary = {
+            "old_rows": int((merged['_merge'] != 'right_only').sum()),
+            "new_rows": int((merged['_merge'] != 'left_only').sum()),
+            "added_rows": len(added),
+            "removed_rows": len(removed),
+            "changed_rows": len(changed),
+        }
+        for col in value_columns:
+            summary[f"{col}_delta"] = float(merged[f'{col}_delta'].sum())
+        return summary
@@ -1,14 +1,19 @@
 # app/domain/calculators/production_calculator.py
-from typing import List
+from typing import List, TYPE_CHECKING
+
+import numpy as np
+
 from ..models.production import ProductionInstruction, ProductionPlan
-from ..models.product import ProductConstraint
+
+if TYPE_CHECKING:
+    from ..models.product import ProductConstraint
 
 class ProductionCalculator:
     """生産計画計算機"""
     
     def calculate_production_plan(self, 
                                 instructions: List[ProductionInstruction],
-                                constraints: List[ProductConstraint]) -> List[ProductionPlan]:
+                                constraints: List['ProductConstraint']) -> List[ProductionPlan]:
         """生産計画計算"""
         
         plans = []
@@ -48,4 +53,18 @@ class ProductionCalculator:
     def _calculate_smoothed_production(self, demand: float, smoothing_level: float, daily_capacity: float) -> float:
         """平均化生産量計算"""
         smoothed = demand * smoothing_level
-        return min(smoothed, daily_capacity)
\ No newline at end of file
+        return min(smoothed, daily_capacity)
+    
+    @staticmethod
+    def calculate_planned_quantities(demand, smoothing_level, daily_capacity):
+        """平均化生産量の一括計算（NumPy配列版）
+
+        daily_capacity が NaN の行は制約なしとして需要量をそのまま計画量とする。
+        smoothing_level が NaN の行は平均化なし（1.0）とし、日次能力の上限だけを適用する。
+        """
+        demand = np.asarray(demand, dtype=float)
+        daily_capacity = np.asarray(daily_capacity, dtype=float)
+        smoothing_level = np.asarray(smoothing_level, dtype=float)
+        smoothing_level = np.where(np.isnan(smoothing_level), 1.0, smoothing_level)
+        smoothed = np.minimum(demand * smoothing_level, daily_capacity)
+        return np.where(np.isnan(daily_capacity), demand, smoothed)
@@ -0,0 +1,270 @@
+# app/domain/calculators/route_planner.py
+"""複数納入先の配送ルート計画（容量・時間枠付き配送計画問題）
+
+1. 納入先（delivery_location）ごとに積載アイテムをまとめ、最大トラックの体積・重量を超える分は別の訪問に分ける
+2. Clarke-Wright 節約法で訪問を連結（体積・重量と、最も長い便の時間枠を満たす範囲）
+3. 計算時間の上限まで各ルートを 2-opt で改善（走行距離を短縮、時間枠は維持）
+4. 体積の大きいルートから順に、収まる最小のトラックへ割り当て（出発から到着期限までに最終納入先へ着けること）
+5. トラックごとに最後の納入先の荷を奥から積む積載計画を作成
+"""
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .transport_planner import TransportPlanner
+from ..models.transport import Container, Truck, LoadingItem, DeliveryRoute
+
+
+@dataclass
+class Visit:
+    """1回の納入（納入先と荷）"""
+    location: str
+    items: List[LoadingItem] = field(default_factory=list)
+    volume: float = 0.0      # m³
+    weight: float = 0.0
+
+
+def truck_volume(truck: Truck) -> float:
+    """荷台体積 (m³)"""
+    return (truck.width * truck.depth * truck.height) / 1000000000
+
+
+def truck_window_minutes(truck: Truck, arrival_days: Optional[float] = None) -> float:
+    """出発時刻から到着時刻までの分数 - 時刻未設定は制限なし
+
+    arrival_days は出発日から到着日までの暦日数（稼働日カレンダーで換算済みの値）。
+    未指定なら arrival_day_offset をそのまま暦日数とする。
+    """
+    if truck.departure_time is None or truck.arrival_time is None:
+        return math.inf
+    departure = truck.departure_time.hour * 60 + truck.departure_time.minute
+    arrival = truck.arrival_time.hour * 60 + truck.arrival_time.minute
+    days = (truck.arrival_day_offset or 0) if arrival_days is None else arrival_days
+    minutes = arrival - departure + days * 1440
+    # 日付をまたぐ便で offset 未設定の場合は翌日着とみなす
+    return minutes if minutes > 0 else minutes + 1440
+
+
+def build_visits(items: List[LoadingItem], item_locations: Dict[int, str], containers: List[Container],
+                 max_volume: float, max_weight: float) -> Tuple[List[Visit], List[LoadingItem]]:
+    """納入先別の訪問に分割 - (訪問一覧, 納入先・容器不明のアイテム)"""
+    container_volumes = {c.id: (c.width * c.depth * c.height) / 1000000000 for c in containers}
+    by_location: Dict[str, List[LoadingItem]] = {}
+    unrouted = []
+    for item in items:
+        location = item_locations.get(item.product_id)
+        if not location or item.container_id not in container_volumes or not item.quantity:
+            unrouted.append(item)
+            continue
+        by_location.setdefault(location, []).append(item)
+
+    visits = []
+    for location, location_items in by_location.items():
+        current = Visit(location)
+        visits.append(current)
+        for item in location_items:
+            unit_volume = container_volumes[item.container_id]
+            unit_weight = item.weight_per_unit or 0.0
+            remaining = int(item.quantity)
+            while remaining > 0:
+                fit_volume = (max_volume - current.volume) / unit_volume if unit_volume > 0 else remaining
+                fit_weight = (max_weight - current.weight) / unit_weight if unit_weight > 0 else remaining
+                take = min(remaining, int(min(fit_volume, fit_weight)))
+                if take <= 0:
+                    if not current.items:
+                        # 1箱でも最大トラックを超える場合は単独の訪問にする（割り当て不可として残る）
+                        take = 1
+                    else:
+                        current = Visit(location)
+                        visits.append(current)
+                        continue
+                current.items.append(LoadingItem(item.product_id, item.container_id, take, item.weight_per_unit))
+                current.volume += unit_volume * take
+                current.weight += unit_weight * take
+                remaining -= take
+    return visits, unrouted
+
+
+class RoutePlanner:
+    """配送ルート計画"""
+
+    def __init__(self, transport_planner: Optional[TransportPlanner] = None):
+        self.transport_planner = transport_planner or TransportPlanner()
+
+    def plan_routes(self,
+                    items: List[LoadingItem],
+                    item_locations: Dict[int, str],
+                    containers: List[Container],
+                    trucks: List[Truck],
+                    location_index: Dict[str, int],
+                    distance: np.ndarray,
+                    minutes: np.ndarray,
+                    depot: str,
+                    service_minutes: float = 20.0,
+                    stackable: Optional[Dict[int, bool]] = None,
+                    time_budget_s: float = 2.0,
+                    arrival_days: Optional[Dict[int, float]] = None) -> Dict:
+        """全車両の複数納入先ルートと積載計画（arrival_days はトラックID → 到着までの暦日数）"""
+        started = time.perf_counter()
+        arrival_days = arrival_days or {}
+        windows = {t.id: truck_window_minutes(t, arrival_days.get(t.id)) for t in trucks}
+        if not trucks or depot not in location_index:
+            return {"routes": [], "unassigned": [], "unrouted_items": list(items), "remaining_items": [],
+                    "total_trips": 0, "total_distance_km": 0.0}
+
+        max_volume = max(truck_volume(t) for t in trucks)
+        max_weight = max(float(t.max_weight or 0) for t in trucks)
+        max_window = max(windows.values())
+
+        item_locations = {pid: loc for pid, loc in item_locations.items() if loc in location_index}
+        visits, unrouted = build_visits(items, item_locations, containers, max_volume, max_weight)
+
+        nodes = np.array([location_index[depot]] + [location_index[v.location] for v in visits], dtype=np.int64)
+        grid = np.ix_(nodes, nodes)
+        dist, travel = distance[grid], minutes[grid]
+        volume = np.array([0.0] + [v.volume for v in visits])
+        weight = np.array([0.0] + [v.weight for v in visits])
+
+        routes = self._savings_routes(dist, travel, volume, weight, service_minutes,
+                                      max_volume, max_weight, max_window)
+        deadline = started + time_budget_s
+        routes = [self._two_opt(route, dist, travel, service_minutes, max_window, deadline) for route in routes]
+        assignments, unassigned_routes = self._assign_trucks(routes, travel, volume, weight, service_minutes,
+                                                             trucks, windows)
+
+        result_routes = []
+        remaining_items = []
+        for truck, route in assignments:
+            stops, stop_items = [], []
+            for node in route:
+                visit = visits[node - 1]
+                # 同じ納入先が続く訪問は1回の荷降ろしにまとめる
+                if stops and stops[-1] == visit.location:
+                    stop_items[-1].extend(visit.items)
+                else:
+                    stops.append(visit.location)
+                    stop_items.append(list(visit.items))
+            plan, left = self.transport_planner.plan_route_loading(truck, stop_items, containers, stackable)
+            remaining_items.extend(left)
+            arrivals = self._arrival_times(route, travel, service_minutes)
+            result_routes.append(DeliveryRoute(
+                truck=truck,
+                stops=stops,
+                arrival_minutes=[arrivals[i] for i in range(len(route))
+                                 if i == 0 or visits[route[i] - 1].location != visits[route[i - 1] - 1].location],
+                distance_km=self._route_distance(route, dist),
+                duration_minutes=arrivals[-1],
+                load_volume=float(volume[route].sum()),
+                load_weight=float(weight[route].sum()),
+                plan=plan,
+            ))
+
+        return {
+            "routes": result_routes,
+            "unassigned": [visits[node - 1] for route in unassigned_routes for node in route],
+            "unrouted_items": unrouted,
+            "remaining_items": remaining_items,
+            "total_trips": len(result_routes),
+            "total_distance_km": float(sum(r.distance_km for r in result_routes)),
+            "elapsed_s": time.perf_counter() - started,
+        }
+
+    # -----------------------------
+    # ルート評価
+    # -----------------------------
+    @staticmethod
+    def _arrival_times(route: List[int], travel: np.ndarray, service_minutes: float) -> List[float]:
+        """出発からの各訪問への到着時刻（分）"""
+        arrivals = []
+        elapsed, previous = 0.0, 0
+        for node in route:
+            if arrivals:
+                elapsed += service_minutes
+            elapsed += travel[previous, node]
+            arrivals.append(float(elapsed))
+            previous = node
+        return arrivals
+
+    def _duration(self, route: List[int], travel: np.ndarray, service_minutes: float) -> float:
+        """出発から最終訪問への到着まで（分）"""
+        return self._arrival_times(route, travel, service_minutes)[-1] if route else 0.0
+
+    @staticmethod
+    def _route_distance(route: List[int], dist: np.ndarray) -> float:
+        """拠点発着の走行距離 (km)"""
+        path = [0] + list(route) + [0]
+        return float(dist[path[:-1], path[1:]].sum())
+
+    # -----------------------------
+    # 構築・改善
+    # -----------------------------
+    def _savings_routes(self, dist, travel, volume, weight, service_minutes,
+                        max_volume, max_weight, max_window) -> List[List[int]]:
+        """Clarke-Wright 節約法（並列版）"""
+        n = len(volume) - 1
+        routes: Dict[int, List[int]] = {i: [i] for i in range(1, n + 1)}
+        route_of = {i: i for i in range(1, n + 1)}
+        if n < 2:
+            return list(routes.values())
+
+        # i の後に j を続けたときの節約距離 s(i, j) = d(i, 0) + d(0, j) - d(i, j)
+        savings = dist[1:, :1] + dist[:1, 1:] - dist[1:, 1:]
+        np.fill_diagonal(savings, -np.inf)
+        savings[~np.isfinite(savings)] = -np.inf
+        flat = np.argsort(savings, axis=None)[::-1]
+        for k in flat:
+            i, j = divmod(int(k), n)
+            if savings[i, j] <= 0:
+                break
+            i, j = i + 1, j + 1
+            ri, rj = route_of[i], route_of[j]
+            if ri == rj or routes[ri][-1] != i or routes[rj][0] != j:
+                continue
+            merged = routes[ri] + routes[rj]
+            if volume[merged].sum() > max_volume or weight[merged].sum() > max_weight:
+                continue
+            if self._duration(merged, travel, service_minutes) > max_window:
+                continue
+            routes[ri] = merged
+            for node in routes.pop(rj):
+                route_of[node] = ri
+        return list(routes.values())
+
+    def _two_opt(self, route: List[int], dist, travel, service_minutes, max_window, deadline) -> List[int]:
+        """区間反転による改善（時間枠を満たす範囲で走行距離を短縮、計算時間の上限まで）"""
+        best = list(route)
+        best_distance = self._route_distance(best, dist)
+        improved = len(best) > 2
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for i in range(len(best) - 1):
+                for j in range(i + 1, len(best)):
+                    candidate = best[:i] + best[i:j + 1][::-1] + best[j + 1:]
+                    candidate_distance = self._route_distance(candidate, dist)
+                    if (candidate_distance < best_distance - 1e-9
+                            and self._duration(candidate, travel, service_minutes) <= max_window):
+                        best, best_distance, improved = candidate, candidate_distance, True
+                if time.perf_counter() >= deadline:
+                    break
+        return best
+
+    def _assign_trucks(self, routes, travel, volume, weight, service_minutes, trucks, windows):
+        """ルートを収まる最小のトラックに割り当て - (割り当て一覧, 割り当てられなかったルート)"""
+        available = sorted(trucks, key=lambda t: (truck_volume(t), not t.default_use,
+                                                 t.departure_time or '23:59:59'))
+        assignments, unassigned = [], []
+        for route in sorted(routes, key=lambda r: volume[r].sum(), reverse=True):
+            route_volume, route_weight = volume[route].sum(), weight[route].sum()
+            duration = self._duration(route, travel, service_minutes)
+            truck = next((t for t in available
+                          if route_volume <= truck_volume(t) and route_weight <= (t.max_weight or 0)
+                          and duration <= windows[t.id]), None)
+            if truck is None:
+                unassigned.append(route)
+                continue
+            available.remove(truck)
+            assignments.append((truck, route))
+        return assignments, unassigned
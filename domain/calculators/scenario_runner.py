@@ -0,0 +1,152 @@
+# app/domain/calculators/scenario_runner.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+import numpy as np
+import pandas as pd
+
+from .production_calculator import ProductionCalculator
+from ..models.scenario import PlanScenario
+
+
+def align_product_constraints(product_ids: np.ndarray, constraints_df: pd.DataFrame):
+    """製品ID配列（昇順）に製品制約を揃える - (日次能力, 平均化レベル, 単位体積)
+
+    制約のない製品の日次能力・平均化レベルは NaN、単位体積は 0 とする。
+    """
+    n_products = len(product_ids)
+    daily_capacity = np.full(n_products, np.nan)
+    smoothing_level = np.full(n_products, np.nan)
+    volume_per_unit = np.zeros(n_products)
+    if n_products and constraints_df is not None and not constraints_df.empty:
+        constraints_df = constraints_df.drop_duplicates('product_id', keep='last')
+        constraint_ids = constraints_df['product_id'].to_numpy(dtype=np.int64)
+        pos = np.clip(np.searchsorted(product_ids, constraint_ids), 0, n_products - 1)
+        matched = product_ids[pos] == constraint_ids
+        daily_capacity[pos[matched]] = constraints_df['daily_capacity'].to_numpy(dtype=float)[matched]
+        smoothing_level[pos[matched]] = constraints_df['smoothing_level'].to_numpy(dtype=float)[matched]
+        volume_per_unit[pos[matched]] = constraints_df['volume_per_unit'].to_numpy(dtype=float)[matched]
+    return daily_capacity, smoothing_level, volume_per_unit
+
+
+@dataclass
+class ScenarioInput:
+    """シナリオ計算用の読み取り専用入力（NumPy配列）"""
+    product_ids: np.ndarray        # (製品数,)
+    product_index: np.ndarray      # 指示行 → 製品インデックス
+    day_index: np.ndarray          # 指示行 → 日インデックス
+    demand: np.ndarray             # 指示行の需要量
+    daily_capacity: np.ndarray     # 製品別日次生産能力（制約なしは NaN）
+    smoothing_level: np.ndarray    # 製品別平均化レベル（制約なしは NaN）
+    volume_per_unit: np.ndarray    # 製品別単位体積 (m³)
+    truck_volume: float            # 1便あたり積載体積 (m³)
+    n_days: int
+
+    @classmethod
+    def from_frames(cls, instructions_df: pd.DataFrame, constraints_df: pd.DataFrame,
+                    truck_volume: float) -> 'ScenarioInput':
+        """生産指示・製品制約 DataFrame から入力を作成"""
+        instructions_df = instructions_df.dropna(subset=['product_id', 'instruction_quantity'])
+        product_codes, product_index = np.unique(
+            instructions_df['product_id'].to_numpy(dtype=np.int64), return_inverse=True
+        )
+        dates = pd.to_datetime(instructions_df['instruction_date']).dt.normalize()
+        day_index = ((dates - dates.min()).dt.days.to_numpy() if len(dates) else np.zeros(0, dtype=np.int64))
+
+        daily_capacity, smoothing_level, volume_per_unit = align_product_constraints(product_codes, constraints_df)
+
+        return cls(
+            product_ids=product_codes,
+            product_index=product_index,
+            day_index=day_index.astype(np.int64),
+            demand=instructions_df['instruction_quantity'].to_numpy(dtype=float),
+            daily_capacity=daily_capacity,
+            smoothing_level=smoothing_level,
+            volume_per_unit=volume_per_unit,
+            truck_volume=float(truck_volume or 0.0),
+            n_days=int(day_index.max()) + 1 if len(day_index) else 0,
+        )
+
+
+def evaluate_scenario(data: ScenarioInput, scenario: PlanScenario) -> Dict[str, Any]:
+    """1シナリオの KPI 計算（ベクトル化）"""
+    capacity = data.daily_capacity * scenario.capacity_factor
+    smoothing = data.smoothing_level.copy()
+    if scenario.smoothing_level is not None:
+        smoothing = np.where(np.isnan(capacity), smoothing, scenario.smoothing_level)
+    for product_id, factor in scenario.capacity_factors.items():
+        capacity[data.product_ids == product_id] *= factor
+    for product_id, level in scenario.smoothing_levels.items():
+        smoothing[data.product_ids == product_id] = level
+
+    pidx = data.product_index
+    planned = ProductionCalculator.calculate_planned_quantities(
+        data.demand, smoothing[pidx], capacity[pidx]
+    )
+
+    total_demand = data.demand.sum()
+    total_planned = planned.sum()
+
+    # 制約対象の製品×日ごとの能力利用率
+    constrained = ~np.isnan(capacity[pidx])
+    cell = pidx[constrained] * max(data.n_days, 1) + data.day_index[constrained]
+    cells, cell_pos = np.unique(cell, return_inverse=True)
+    used = np.bincount(cell_pos, weights=planned[constrained], minlength=len(cells))
+    available = capacity[cells // max(data.n_days, 1)]
+    utilization = used.sum() / available.sum() if available.sum() > 0 else 0.0
+    peak_utilization = float(np.max(used / np.where(available > 0, available, np.inf))) if len(cells) else 0.0
+
+    # 日次体積から必要便数を算出
+    daily_volume = np.bincount(data.day_index, weights=planned * data.volume_per_unit[pidx],
+                               minlength=data.n_days)
+    trips = int(np.ceil(daily_volume / data.truck_volume).sum()) if data.truck_volume > 0 else 0
+
+    return {
+        "scenario": scenario.name,
+        "total_demand": float(total_demand),
+        "total_planned": float(total_planned),
+        "fulfillment_rate": float(total_planned / total_demand) if total_demand > 0 else 0.0,
+        "backlog": float(np.maximum(data.demand - planned, 0).sum()),
+        "trips": trips,
+        "capacity_utilization": float(utilization),
+        "peak_utilization": peak_utilization,
+    }
+
+
+# ワーカープロセス側で共有する入力（initializer で1回だけ受け取る）
+_WORKER_INPUT: Optional[ScenarioInput] = None
+
+
+def _init_worker(data: ScenarioInput):
+    global _WORKER_INPUT
+    _WORKER_INPUT = data
+
+
+def _evaluate_in_worker(scenario: PlanScenario) -> Dict[str, Any]:
+    return evaluate_scenario(_WORKER_INPUT, scenario)
+
+
+class ScenarioRunner:
+    """What-if シナリオ並列実行"""
+
+    def run(self, data: ScenarioInput, scenarios: List[PlanScenario],
+            max_workers: Optional[int] = None) -> pd.DataFrame:
+        """シナリオ一括実行 - KPI 比較表を返す"""
+        if not scenarios:
+            return pd.DataFrame()
+
+        workers = min(max_workers or os.cpu_count() or 1, len(scenarios))
+        if workers <= 1:
+            results = [evaluate_scenario(data, s) for s in scenarios]
+        else:
+            # 入力は各ワーカーへ1回だけ転送し、タスクにはシナリオのみを渡す
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(data,)) as executor:
+                results = list(executor.map(_evaluate_in_worker, scenarios))
+
+        table = pd.DataFrame(results)
+        base = table.iloc[0]
+        table['fulfillment_diff'] = table['fulfillment_rate'] - base['fulfillment_rate']
+        table['trips_diff'] = table['trips'] - base['trips']
+        return table
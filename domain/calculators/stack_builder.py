@@ -0,0 +1,84 @@
+# app/domain/calculators/stack_builder.py
+"""段積みスタック作成 - 積載アイテムを同一容器の段積み（荷台上の積載単位）にまとめる
+
+- 段数: 荷台高さ ÷ 容器高さ
+- can_mix が False の容器は1スタックに1製品のみ
+- stackable が False の製品の箱は上に積めないため最上段のみ（空きがなければ単独スタック）
+"""
+from typing import Dict, List, Optional
+from ..models.transport import Container, LoadingItem, LoadingStack
+
+
+class StackBuilder:
+    """段積みスタック作成"""
+
+    def build_stacks(self,
+                     items: List[LoadingItem],
+                     containers: List[Container],
+                     max_height: int,
+                     stackable: Optional[Dict[int, bool]] = None) -> List[LoadingStack]:
+        """容器ごとにアイテムを段積みし、スタックの一覧を返す（容器が見つからないアイテムは除外）"""
+        stackable = stackable or {}
+        container_map = {c.id: c for c in containers}
+        groups: Dict[int, List[LoadingItem]] = {}
+        for item in items:
+            if item.quantity and item.quantity > 0 and item.container_id in container_map:
+                groups.setdefault(item.container_id, []).append(item)
+
+        stacks = []
+        for container_id, group in groups.items():
+            container = container_map[container_id]
+            tiers = max(1, int(max_height // container.height)) if container.height else 1
+            can_mix = container.can_mix is not False
+            base_items = [i for i in group if stackable.get(i.product_id, True) is not False]
+            top_items = [i for i in group if stackable.get(i.product_id, True) is False]
+
+            if can_mix:
+                container_stacks = self._fill_stacks(container, base_items, tiers)
+            else:
+                container_stacks = []
+                for item in base_items:
+                    container_stacks.extend(self._fill_stacks(container, [item], tiers))
+            container_stacks.extend(self._place_on_top(container, container_stacks, top_items, tiers, can_mix))
+            stacks.extend(container_stacks)
+        return stacks
+
+    def _fill_stacks(self, container: Container, items: List[LoadingItem], tiers: int) -> List[LoadingStack]:
+        """アイテムを順に下段から詰め、tiers 段ごとに新しいスタックにする"""
+        stacks = []
+        current, filled = None, 0
+        dimensions = (container.id, container.width, container.depth, container.height)
+        for item in items:
+            remaining = int(item.quantity)
+            while remaining > 0:
+                if current is None or filled >= tiers:
+                    current = LoadingStack(*dimensions)
+                    stacks.append(current)
+                    filled = 0
+                take = min(tiers - filled, remaining)
+                current.items.append(LoadingItem(item.product_id, item.container_id, take, item.weight_per_unit))
+                filled += take
+                remaining -= take
+        return stacks
+
+    def _place_on_top(self, container: Container, stacks: List[LoadingStack], items: List[LoadingItem],
+                      tiers: int, can_mix: bool) -> List[LoadingStack]:
+        """段積み不可の箱を空きのあるスタックの最上段に1箱ずつ載せる - 載らない箱の単独スタックを返す"""
+        open_stacks = [s for s in stacks if s.tiers < tiers]
+        standalone = []
+        dimensions = (container.id, container.width, container.depth, container.height)
+        for item in items:
+            remaining = int(item.quantity)
+            for stack in list(open_stacks):
+                if remaining == 0:
+                    break
+                if not can_mix and any(i.product_id != item.product_id for i in stack.items):
+                    continue
+                stack.items.append(LoadingItem(item.product_id, item.container_id, 1, item.weight_per_unit))
+                open_stacks.remove(stack)
+                remaining -= 1
+            for _ in range(remaining):
+                stack = LoadingStack(*dimensions)
+                stack.items.append(LoadingItem(item.product_id, item.container_id, 1, item.weight_per_unit))
+                standalone.append(stack)
+        return standalone
@@ -1,10 +1,15 @@
 # app/domain/calculators/transport_planner.py
-from typing import List, Dict, Any
-from ..models.transport import Container, Truck, LoadingItem, TransportPlan
+from collections import Counter
+from typing import List, Dict, Any, Optional
+from ..models.transport import Container, Truck, LoadingItem, LoadingStack, TransportPlan
+from .stack_builder import StackBuilder
 
 class TransportPlanner:
     """運送計画計算機"""
     
+    def __init__(self):
+        self.stack_builder = StackBuilder()
+    
     def calculate_loading_plan(self, 
                              items: List[LoadingItem],
                              containers: List[Container],
@@ -35,6 +40,153 @@ class TransportPlanner:
             "efficiency": self._calculate_efficiency(plans)
         }
     
+    def calculate_stacked_loading_plan(self,
+                                       items: List[LoadingItem],
+                                       containers: List[Container],
+                                       trucks: List[Truck],
+                                       stackable: Optional[Dict[int, bool]] = None) -> Dict[str, Any]:
+        """段積みスタック単位の積載計画（荷台床面に列単位で配置）
+        
+        stackable は product_id → 段積み可否。スタックは荷台高さに合わせてトラックごとに作成する。
+        """
+        plans = []
+        remaining_items = [item for item in items if item.quantity and item.quantity > 0]
+        sorted_trucks = sorted(trucks, key=lambda x: (not x.default_use, x.departure_time or '23:59:59'))
+        total_stacks = 0
+        
+        # 荷台高さが前の便と同じなら、積み残したスタックをそのまま次の便に回す
+        stacks, stacks_height = [], None
+        for truck in sorted_trucks:
+            if truck.height != stacks_height:
+                stacks = self.stack_builder.build_stacks(remaining_items, containers, truck.height, stackable)
+                stacks_height = truck.height
+            loaded = self._place_stacks(stacks, truck)
+            if loaded:
+                plans.append(self._stacked_truck_plan(truck, loaded))
+                total_stacks += len(loaded)
+                remaining_items = self._subtract_loaded_stacks(remaining_items, loaded)
+                loaded_ids = {id(stack) for stack in loaded}
+                stacks = [stack for stack in stacks if id(stack) not in loaded_ids]
+            
+            if not remaining_items:
+                break
+        
+        return {
+            "plans": plans,
+            "remaining_items": remaining_items,
+            "total_trips": len(plans),
+            "total_stacks": total_stacks,
+            "efficiency": self._calculate_efficiency(plans)
+        }
+    
+    def plan_route_loading(self,
+                           truck: Truck,
+                           stop_items: List[List[LoadingItem]],
+                           containers: List[Container],
+                           stackable: Optional[Dict[int, bool]] = None):
+        """複数納入先ルートの積載計画 - (計画, 積み残しアイテム)
+        
+        納入先ごとにスタックを作り、最後の納入先の荷から奥に積む（手前から順に降ろせる LIFO 配置）。
+        """
+        stacks = []
+        for sequence, items in enumerate(stop_items, 1):
+            stop_stacks = self.stack_builder.build_stacks(items, containers, truck.height, stackable)
+            for stack in stop_stacks:
+                stack.sequence = sequence
+            stacks.extend(stop_stacks)
+        loaded = self._place_stacks(stacks, truck, lifo=True)
+        all_items = [item for items in stop_items for item in items]
+        return self._stacked_truck_plan(truck, loaded), self._subtract_loaded_stacks(all_items, loaded)
+    
+    def _place_stacks(self, stacks: List[LoadingStack], truck: Truck, lifo: bool = False) -> List[LoadingStack]:
+        """スタックを荷台に列（幅方向）単位で配置 - 配置できたスタックを返す
+        
+        大きいスタックから順に、奥の列から空き幅に詰め、入らなければ手前に新しい列を作る。
+        lifo の場合は荷降ろし順の遅いスタックから積み、前の列には戻らない。
+        """
+        placed = []
+        if not stacks:
+            return placed
+        truck_width, truck_depth, truck_height = truck.width, truck.depth, truck.height
+        max_weight = truck.max_weight
+        min_side = min(min(s.width, s.depth) for s in stacks)
+        rows = []  # [列の奥行位置, 列の奥行, 使用済み幅]
+        used_depth = 0
+        weight = 0.0
+        # 配置済みは増える一方なので、一度置けなかった床面寸法はこの便では以後も置けない
+        rejected_footprints = set()
+        if lifo:
+            order = sorted(stacks, key=lambda s: (s.sequence or 0, s.width * s.depth, s.total_weight), reverse=True)
+        else:
+            order = sorted(stacks, key=lambda s: (s.width * s.depth, s.total_weight), reverse=True)
+        for stack in order:
+            # 最小のスタックも置けなくなったら終了
+            if used_depth + min_side > truck_depth and all(r[2] + min_side > truck_width for r in rows):
+                break
+            if (stack.width, stack.depth) in rejected_footprints or stack.total_height > truck_height:
+                continue
+            stack_weight = stack.total_weight
+            if weight + stack_weight > max_weight:
+                continue
+            # 長辺を幅方向に向け、荷台幅を超える場合は回転
+            if stack.width < stack.depth <= truck_width or stack.width > truck_width:
+                stack.rotate()
+            if stack.width > truck_width or stack.depth > truck_depth:
+                rejected_footprints.update({(stack.width, stack.depth), (stack.depth, stack.width)})
+                continue
+            candidates = rows[-1:] if lifo else rows
+            row = next((r for r in candidates if r[2] + stack.width <= truck_width and stack.depth <= r[1]), None)
+            if row is None:
+                if used_depth + stack.depth > truck_depth:
+                    rejected_footprints.update({(stack.width, stack.depth), (stack.depth, stack.width)})
+                    continue
+                row = [used_depth, stack.depth, 0]
+                rows.append(row)
+                used_depth += stack.depth
+            stack.x, stack.y = row[2], row[0]
+            row[2] += stack.width
+            weight += stack_weight
+            placed.append(stack)
+        return placed
+    
+    def _stacked_truck_plan(self, truck: Truck, stacks: List[LoadingStack]) -> TransportPlan:
+        """配置済みスタックからトラック1便分の計画を作成（アイテムは製品×容器で集約）"""
+        quantities = Counter()
+        weights = {}
+        for stack in stacks:
+            for item in stack.items:
+                quantities[(item.product_id, item.container_id)] += item.quantity
+                weights[(item.product_id, item.container_id)] = item.weight_per_unit
+        loaded_items = [LoadingItem(p, c, q, weights[(p, c)]) for (p, c), q in quantities.items()]
+        
+        total_volume = sum(stack.volume for stack in stacks)
+        total_weight = sum(stack.total_weight for stack in stacks)
+        truck_volume = (truck.width * truck.depth * truck.height) / 1000000000  # mm³ → m³
+        return TransportPlan(
+            truck=truck,
+            loaded_items=loaded_items,
+            total_volume=total_volume,
+            total_weight=total_weight,
+            volume_utilization=total_volume / truck_volume if truck_volume > 0 else 0,
+            weight_utilization=total_weight / truck.max_weight if truck.max_weight > 0 else 0,
+            stacks=stacks
+        )
+    
+    def _subtract_loaded_stacks(self, items: List[LoadingItem], stacks: List[LoadingStack]) -> List[LoadingItem]:
+        """積載済みの数量を差し引いた残りアイテム"""
+        loaded = Counter()
+        for stack in stacks:
+            for item in stack.items:
+                loaded[(item.product_id, item.container_id)] += item.quantity
+        remaining = []
+        for item in items:
+            key = (item.product_id, item.container_id)
+            taken = min(loaded[key], item.quantity)
+            loaded[key] -= taken
+            if item.quantity - taken > 0:
+                remaining.append(LoadingItem(item.product_id, item.container_id, item.quantity - taken, item.weight_per_unit))
+        return remaining
+    
     def _plan_truck_loading(self, 
                           items: List[LoadingItem],
                           containers: List[Container],
@@ -0,0 +1,106 @@
+# app/domain/calculators/working_calendar.py
+"""稼働日カレンダー - 暦日 ⇔ 稼働日番号の変換と稼働日単位のずらしを NumPy 配列で一括計算する
+
+- 稼働日: 曜日パターン（weekmask、'1111100' = 月〜金）から休日を除き、出勤日を加えた日
+- 稼働日番号: 範囲内の最初の稼働日を 0 とする通し番号
+- 暦日 → 番号は「その日までの稼働日数」の累積配列を引くだけなので O(1)
+"""
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+_NAT = np.datetime64('NaT', 'D')
+
+
+def _as_days(dates) -> np.ndarray:
+    """date / Timestamp / 文字列 / 配列 → datetime64[D] 配列"""
+    if isinstance(dates, (pd.Series, pd.Index)):
+        return pd.to_datetime(dates).to_numpy(dtype='datetime64[D]')
+    values = np.asarray(dates)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[D]')
+    return pd.to_datetime(np.atleast_1d(values)).to_numpy(dtype='datetime64[D]').reshape(values.shape)
+
+
+class WorkingCalendar:
+    """稼働日カレンダー（start〜end の暦日を事前計算）"""
+
+    def __init__(self, start, end, holidays: Iterable = (), workdays: Iterable = (),
+                 weekmask: str = '1111100'):
+        self.start = _as_days(start).reshape(-1)[0]
+        self.end = _as_days(end).reshape(-1)[0]
+        if self.end < self.start:
+            raise ValueError(f"カレンダーの終了日が開始日より前です: {self.start}〜{self.end}")
+        self.days = np.arange(self.start, self.end + np.timedelta64(1, 'D'))
+        holidays = _as_days(list(holidays)) if holidays is not None else np.zeros(0, 'datetime64[D]')
+        self.working = np.is_busday(self.days, weekmask=weekmask, holidays=holidays)
+        # 休日の曜日でも出勤日として登録された日は稼働日
+        workdays = _as_days(list(workdays)) if workdays is not None else np.zeros(0, 'datetime64[D]')
+        self.working |= np.isin(self.days, workdays)
+        self.working_days = self.days[self.working]
+        # 暦日ごとの「その日までの稼働日数」
+        self._count = np.cumsum(self.working)
+
+    def __len__(self) -> int:
+        return len(self.working_days)
+
+    def _offsets(self, dates) -> np.ndarray:
+        days = _as_days(dates)
+        offsets = (days - self.start).astype(np.int64)
+        if ((offsets < 0) | (offsets >= len(self.days))).any():
+            raise ValueError(f"カレンダー範囲外の日付があります（{self.start}〜{self.end}）")
+        return offsets
+
+    def is_working(self, dates) -> np.ndarray:
+        """稼働日かどうか"""
+        return self.working[self._offsets(dates)]
+
+    def to_index(self, dates, roll: str = 'backward') -> np.ndarray:
+        """暦日 → 稼働日番号（非稼働日は backward なら直前、forward なら直後の稼働日）
+
+        範囲内に直前の稼働日がなければ -1、直後の稼働日がなければ稼働日数を返す。
+        """
+        offsets = self._offsets(dates)
+        count = self._count[offsets]
+        if roll == 'forward':
+            return count - self.working[offsets]
+        return count - 1
+
+    def to_date(self, indices) -> np.ndarray:
+        """稼働日番号 → 暦日（範囲外は NaT）"""
+        indices = np.asarray(indices, dtype=np.int64)
+        valid = (indices >= 0) & (indices < len(self.working_days))
+        dates = np.full(indices.shape, _NAT)
+        dates[valid] = self.working_days[indices[valid]]
+        return dates
+
+    def shift(self, dates, working_days, roll: str = 'backward') -> np.ndarray:
+        """稼働日単位でずらした暦日（負の値は前へ）"""
+        return self.to_date(self.to_index(dates, roll) + np.asarray(working_days, dtype=np.int64))
+
+    def calendar_days(self, dates, working_days) -> np.ndarray:
+        """稼働日 working_days 日後までの暦日数（非稼働日の起点は直後の稼働日から数える、カレンダー範囲外は NaN）"""
+        start = _as_days(dates)
+        days = (self.shift(start, working_days, roll='forward') - start).astype('timedelta64[D]')
+        # NaT を float にすると最小の整数値になり isfinite で除けないため、先に NaN へ置き換える
+        return np.where(np.isnat(days), np.nan, days.astype(float))
+
+    def between(self, start, end) -> pd.DatetimeIndex:
+        """start〜end（両端含む）の稼働日"""
+        first = self.to_index(start, roll='forward').reshape(-1)[0]
+        last = self.to_index(end, roll='backward').reshape(-1)[0]
+        return pd.DatetimeIndex(self.working_days[first:last + 1].astype('datetime64[ns]'))
+
+    def count_between(self, start, end) -> np.ndarray:
+        """start〜end（両端含む）の稼働日数"""
+        return np.maximum(self.to_index(end, 'backward') - self.to_index(start, 'forward') + 1, 0)
+
+    def month_working_day(self, months, day_numbers) -> np.ndarray:
+        """月の第 n 稼働日（生産指示の month_type / day_number 用、月内にない番号は NaT）"""
+        months = np.asarray(pd.to_datetime(np.atleast_1d(months)).to_numpy(dtype='datetime64[M]'))
+        first = self.to_index(months.astype('datetime64[D]'), roll='forward')
+        dates = self.to_date(first + np.asarray(day_numbers, dtype=np.int64) - 1)
+        in_month = ~np.isnat(dates) & (dates.astype('datetime64[M]') == months)
+        return np.where(in_month, dates, _NAT)
+
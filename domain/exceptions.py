@@ -0,0 +1,14 @@
+# app/domain/exceptions.py
+"""計画処理の例外 - メッセージは画面・API・ジョブ履歴にそのまま表示する"""
+
+
+class PlanningError(Exception):
+    """計画処理の失敗（データ取得・計算エラー）"""
+
+
+class NoDataError(PlanningError):
+    """計算対象のデータがない"""
+
+
+class InvalidInputError(PlanningError):
+    """入力値が不正（未入力のセルなど）"""
@@ -1,10 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, TIMESTAMP, Date
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import text
-from sqlalchemy.orm import declarative_base
-from domain.models.transport import Container
-
-Base = declarative_base()
+# Container と同じメタデータに載せ、リレーション解決とスキーマ作成を1つの Base で行う
+from domain.models.transport import Base, Container
 
 
 class Product(Base):
@@ -18,6 +16,36 @@ class Product(Base):
     # 容器へのFK (専用/汎用どちらを使うか)
     used_container_id = Column(Integer, ForeignKey("container_capacity.id"), nullable=True)
 
+    # products.csv の取込列
+    data_no = Column(Integer, nullable=True)
+    factory = Column(String(10), nullable=True)
+    client_code = Column(String(20), nullable=True)
+    calculation_date = Column(Date, nullable=True)
+    production_complete_date = Column(Date, nullable=True)
+    modified_factory = Column(String(10), nullable=True)
+    product_category = Column(String(10), nullable=True)
+    ac_code = Column(String(20), nullable=True)
+    processing_content = Column(String(100), nullable=True)
+    delivery_location = Column(String(20), nullable=True)
+    box_type = Column(String(10), nullable=True)
+    grouping_category = Column(String(10), nullable=True)
+    form_category = Column(String(10), nullable=True)
+    inspection_category = Column(String(10), nullable=True)
+    ordering_category = Column(String(10), nullable=True)
+    regular_replenishment_category = Column(String(10), nullable=True)
+    lead_time = Column(Integer, nullable=True)
+    fixed_point_days = Column(Integer, nullable=True)
+    shipping_factory = Column(String(10), nullable=True)
+    client_product_code = Column(String(50), nullable=True)
+    purchasing_org = Column(String(10), nullable=True)
+    item_group = Column(String(10), nullable=True)
+    processing_type = Column(String(10), nullable=True)
+    inventory_transfer_category = Column(String(10), nullable=True)
+    container_width = Column(Integer, nullable=True)
+    container_depth = Column(Integer, nullable=True)
+    container_height = Column(Integer, nullable=True)
+    stackable = Column(Boolean, nullable=True)
+
     created_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
 
     # リレーション: Container 側に backref
@@ -54,3 +82,48 @@ class ProductConstraint(Base):
             f"daily_capacity={self.daily_capacity}, smoothing_level={self.smoothing_level}, "
             f"volume_per_unit={self.volume_per_unit}, is_transport_constrained={self.is_transport_constrained})>"
         )
+
+
+class ProductLotConstraint(Base):
+    """ロット制約（最小・最大ロット、製造リードタイム）"""
+    __tablename__ = "products_constraints"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    min_lot_size = Column(Integer, nullable=True)
+    max_lot_size = Column(Integer, nullable=True)
+    lead_time_days = Column(Integer, nullable=True)
+
+    created_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
+
+    def __repr__(self):
+        return (
+            f"<ProductLotConstraint(product_id={self.product_id}, min={self.min_lot_size}, "
+            f"max={self.max_lot_size}, lead_time_days={self.lead_time_days})>"
+        )
+
+
+class ProductionInstructionDetail(Base):
+    """生産指示明細（production_instructions_detail.csv の取込先）"""
+    __tablename__ = "production_instructions_detail"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    record_type = Column(String(10), nullable=True)
+    start_month = Column(String(10), nullable=True)
+    total_first_month = Column(Integer, nullable=True)
+    total_next_month = Column(Integer, nullable=True)
+    total_next_next_month = Column(Integer, nullable=True)
+    instruction_date = Column(Date, nullable=True, index=True)
+    instruction_quantity = Column(Integer, nullable=True)
+    inspection_category = Column(String(10), nullable=True)
+    month_type = Column(String(10), nullable=True)
+    day_number = Column(Integer, nullable=True)
+
+    created_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
+
+    def __repr__(self):
+        return (
+            f"<ProductionInstructionDetail(id={self.id}, product_id={self.product_id}, "
+            f"date={self.instruction_date}, quantity={self.instruction_quantity})>"
+        )
@@ -2,14 +2,7 @@
 from dataclasses import dataclass
 from datetime import datetime, date
 from typing import Optional, List
-from domain.models.transport import Truck, Container, TruckContainerRule, TransportConstraint, LoadingItem, TransportPlan
-from sqlalchemy.exc import SQLAlchemyError
-import pandas as pd
-from repository.database_manager import DatabaseManager
-from repository.production_repository import ProductionRepository
-from repository.transport_repository import TransportRepository
-import streamlit as st
-from domain.models.product import Product
+
 @dataclass
 class ProductionInstruction:
     """生産指示モデル - production_instructions_detailテーブル構造に合わせる"""
@@ -50,6 +43,8 @@ class ProductionPlan:
     planned_quantity: float
     inspection_category: str
     is_constrained: bool
+    smoothed_quantity: Optional[float] = None  # ロットサイジング前の平均化計画量
+    shortage_quantity: Optional[float] = None  # 計画期間内に生産できない量（前倒しが期間開始より前になる分）
     
     @classmethod
     def from_dict(cls, data: dict):
@@ -0,0 +1,22 @@
+# app/domain/models/scenario.py
+from dataclasses import dataclass, field
+from typing import Optional, Dict
+
+
+@dataclass
+class PlanScenario:
+    """What-if シナリオモデル - 生産制約の上書き条件"""
+    name: str
+    capacity_factor: float = 1.0                 # 全製品の日次生産能力倍率
+    smoothing_level: Optional[float] = None      # 全製品の平均化レベル上書き
+    capacity_factors: Dict[int, float] = field(default_factory=dict)   # 製品ID別の能力倍率
+    smoothing_levels: Dict[int, float] = field(default_factory=dict)   # 製品ID別の平均化レベル
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """辞書からモデルを作成"""
+        valid_fields = {}
+        for field_name, field_type in cls.__annotations__.items():
+            if field_name in data and data[field_name] is not None:
+                valid_fields[field_name] = data[field_name]
+        return cls(**valid_fields)
@@ -1,11 +1,14 @@
 # app/domain/models/transport.py
-from typing import List, Optional
-import pandas as pd
+from typing import List, Optional, TYPE_CHECKING
 from datetime import time
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Time, Float 
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import Column, Integer, String, Float, Boolean, TIMESTAMP
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.sql import text
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 Base = declarative_base()
 
@@ -23,7 +26,7 @@ class Container(Base):
     max_weight = Column(Integer, nullable=False, default=0)
     max_volume = Column(Float, Computed("((width * depth * height) / 1000000000.0)", persisted=True))
     can_mix = Column(Boolean, default=True)
-    created_at = Column(TIMESTAMP, nullable=True, server_default="CURRENT_TIMESTAMP")
+    created_at = Column(TIMESTAMP, nullable=True, server_default=text("CURRENT_TIMESTAMP"))
 
     def __repr__(self):
         return f"<Container(id={self.id}, name='{self.name}', size={self.width}x{self.depth}x{self.height}, max_weight={self.max_weight}, max_volume={self.max_volume}, can_mix={self.can_mix})>"
@@ -98,13 +101,15 @@ class TransportPlan:
     """運送計画モデル"""
     
     def __init__(self, truck: Truck, loaded_items: List[LoadingItem], total_volume: float,
-                 total_weight: float, volume_utilization: float, weight_utilization: float):
+                 total_weight: float, volume_utilization: float, weight_utilization: float,
+                 stacks: Optional[List['LoadingStack']] = None):
         self.truck = truck
         self.loaded_items = loaded_items
         self.total_volume = total_volume
         self.total_weight = total_weight
         self.volume_utilization = volume_utilization
         self.weight_utilization = weight_utilization
+        self.stacks = stacks or []
     
     @classmethod
     def from_dict(cls, data: dict):
@@ -117,6 +122,82 @@ class TransportPlan:
             volume_utilization=data.get('volume_utilization'),
             weight_utilization=data.get('weight_utilization')
         )
+class LoadingStack:
+    """積載スタック - 同一容器を段積みした荷台上の積載単位（下段から順に items）"""
+    
+    def __init__(self, container_id: int, width: int, depth: int, height: int,
+                 items: Optional[List[LoadingItem]] = None):
+        self.container_id = container_id
+        self.width = width            # mm（荷台の幅方向）
+        self.depth = depth            # mm（荷台の奥行方向）
+        self.height = height          # mm（容器1段の高さ）
+        self.items = items or []
+        # 荷台上の配置（左奥を原点とした mm、積載計画で設定）
+        self.x: Optional[int] = None
+        self.y: Optional[int] = None
+        # 荷降ろし順（複数納入先ルートの何番目の納入先か、1始まり）
+        self.sequence: Optional[int] = None
+    
+    @property
+    def tiers(self) -> int:
+        return sum(item.quantity for item in self.items)
+    
+    @property
+    def total_height(self) -> int:
+        return self.height * self.tiers
+    
+    @property
+    def total_weight(self) -> float:
+        return sum(item.weight_per_unit * item.quantity for item in self.items)
+    
+    @property
+    def volume(self) -> float:
+        """容器体積の合計 (m³)"""
+        return self.width * self.depth * self.total_height / 1000000000
+    
+    def rotate(self):
+        """荷台上で90度回転"""
+        self.width, self.depth = self.depth, self.width
+    
+    def __repr__(self):
+        return f"<LoadingStack(container_id={self.container_id}, tiers={self.tiers}, at=({self.x}, {self.y}))>"
+
+class DeliveryRoute:
+    """配送ルート - 1便で複数の納入先を巡回する"""
+    
+    def __init__(self, truck: Truck, stops: List[str], arrival_minutes: List[float],
+                 distance_km: float, duration_minutes: float, load_volume: float, load_weight: float,
+                 plan: Optional[TransportPlan] = None):
+        self.truck = truck
+        self.stops = stops                        # 納入先（delivery_location）の巡回順
+        self.arrival_minutes = arrival_minutes    # 出発からの各納入先到着（分）
+        self.distance_km = distance_km
+        self.duration_minutes = duration_minutes  # 出発から最終納入先到着まで（分）
+        self.load_volume = load_volume
+        self.load_weight = load_weight
+        self.plan = plan                          # 荷降ろし順を考慮した積載計画
+    
+    def __repr__(self):
+        return f"<DeliveryRoute(truck={self.truck.name}, stops={self.stops}, duration={self.duration_minutes:.0f}min)>"
+
+class DockAssignment:
+    """積込ドック割り当て - 時刻は出荷日 0:00 からの分（負の値は前日）"""
+
+    def __init__(self, truck_id: int, truck_name: str, dock: str, containers: int,
+                 start_minute: float, end_minute: float, departure_minute: Optional[float],
+                 delay_minutes: float = 0.0):
+        self.truck_id = truck_id
+        self.truck_name = truck_name
+        self.dock = dock
+        self.containers = containers              # 積込箱数
+        self.start_minute = start_minute          # 積込開始
+        self.end_minute = end_minute              # 積込完了
+        self.departure_minute = departure_minute  # 予定出発（未設定は None）
+        self.delay_minutes = delay_minutes        # ドックが空かず予定出発に間に合わない分
+
+    def __repr__(self):
+        return f"<DockAssignment(truck={self.truck_name}, dock={self.dock}, {self.start_minute:.0f}-{self.end_minute:.0f})>"
+
 class TransportConstraint:
     """運送制約モデル"""
     def __init__(self, id: int, product_id: int, container_id: int, max_quantity: Optional[int] = None):
@@ -145,12 +226,13 @@ class TransportConstraint:
             "max_quantity": self.max_quantity
         }
     @staticmethod
-    def to_dataframe(constraints: List['TransportConstraint']) -> pd.DataFrame:
+    def to_dataframe(constraints: List['TransportConstraint']) -> 'pd.DataFrame':
         """TransportConstraintのリストをDataFrameに変換"""
+        import pandas as pd
         data = [constraint.to_dict() for constraint in constraints]
         return pd.DataFrame(data)
     @staticmethod
-    def from_dataframe(df: pd.DataFrame) -> List['TransportConstraint']:
+    def from_dataframe(df: 'pd.DataFrame') -> List['TransportConstraint']:
         """DataFrameからTransportConstraintのリストを作成"""
         constraints = []
         for _, row in df.iterrows():
@@ -2,28 +2,25 @@
 
 
 import streamlit as st
-from repository.database_manager import DatabaseManager
-from services.production_service import ProductionService
-from services.transport_service import TransportService
+from services.service_container import ServiceContainer, get_service_container
 from ui.layouts.sidebar import create_sidebar
 from ui.pages.dashboard_page import DashboardPage
 from ui.pages.constraints_page import ConstraintsPage
 from ui.pages.production_page import ProductionPage
 from ui.pages.transport_page import TransportPage
 from ui.pages.product_page import ProductPage
+from ui.pages.diagnostics_page import DiagnosticsPage
+from ui.components.profiler import PageProfiler
 from config import APP_CONFIG
-from services.product_service import ProductService
 class ProductionPlanningApp:
     """生産計画アプリケーション - メイン制御クラス"""
     
-    def __init__(self):
-        # データベース接続
-        self.db = DatabaseManager()
-        
-        # サービス層初期化
-        self.production_service = ProductionService(self.db)
-        self.transport_service = TransportService(self.db)
-        self.product_service = ProductService(self.db)
+    def __init__(self, container: ServiceContainer):
+        # サービス層（DB接続プール・キャッシュはコンテナ側で保持）
+        self.container = container
+        self.production_service = container.production_service
+        self.transport_service = container.transport_service
+        self.product_service = container.product_service
         
         # ページ初期化
         self.pages = {
@@ -33,6 +30,8 @@ class ProductionPlanningApp:
             "配送便計画": TransportPage(self.transport_service),
             "製品管理": ProductPage(self.product_service)
         }
+        # メニューに出さない診断ページ（?diagnostics=1 で表示）
+        self.diagnostics_page = DiagnosticsPage(container.metrics)
     
     def run(self):
         """アプリケーション実行"""
@@ -47,24 +46,31 @@ class ProductionPlanningApp:
         selected_page = create_sidebar()
         
         # 選択されたページを表示
-        if selected_page in self.pages:
+        if st.query_params.get("diagnostics") == "1":
+            self.diagnostics_page.show()
+        elif selected_page in self.pages:
             try:
-                self.pages[selected_page].show()
+                if st.session_state.get("profiling_enabled"):
+                    engine = "pyinstrument" if st.query_params.get("profile") == "pyinstrument" else "cprofile"
+                    PageProfiler().run(selected_page, self.pages[selected_page].show, engine)
+                else:
+                    self.pages[selected_page].show()
             except Exception as e:
                 st.error(f"ページ表示エラー: {e}")
                 st.info("データベース接続を確認してください")
         else:
             st.error("選択されたページが見つかりません")
-    
-    def __del__(self):
-        """リソース解放"""
-        if hasattr(self, 'db'):
-            self.db.close()
+
+
+@st.cache_resource
+def get_app() -> ProductionPlanningApp:
+    """アプリケーション取得 - プロセス内で1回だけ生成し、再実行・セッション間で共有"""
+    return ProductionPlanningApp(get_service_container())
 
 def main():
     """メイン関数"""
     try:
-        app = ProductionPlanningApp()
+        app = get_app()
         app.run()
     except Exception as e:
         st.error(f"アプリケーション起動エラー: {e}")
@@ -0,0 +1,83 @@
+# app/repository/calendar_repository.py
+"""工場別稼働日カレンダー（ローカル CSV）
+
+CSV 形式: factory,date,end_date,is_working,note
+- factory 空欄の行は全工場共通（会社休日）、工場コード指定の行はその工場だけに適用
+- end_date を指定した行は date〜end_date の連続した休止（長期休暇・設備停止）
+- is_working = 1 の行は土日などを出勤日にする
+ファイルがなければ曜日パターン（CALENDAR_CONFIG.weekmask）のみのカレンダーとする。
+読み込んだ休日はファイル更新時刻ごとに、作成したカレンダーは工場×年範囲ごとにキャッシュする。
+"""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from config import CALENDAR_CONFIG
+from domain.calculators.working_calendar import WorkingCalendar
+
+_cache: Dict[str, Tuple[tuple, pd.DataFrame]] = {}
+_calendars: Dict[tuple, WorkingCalendar] = {}
+_cache_lock = threading.Lock()
+
+
+class CalendarRepository:
+    """稼働日カレンダーデータアクセス"""
+
+    def __init__(self, path: Optional[str] = None, weekmask: Optional[str] = None):
+        self.path = path or CALENDAR_CONFIG.holidays_path
+        self.weekmask = weekmask or CALENDAR_CONFIG.weekmask
+
+    def get_calendar(self, start_date, end_date, factory: Optional[str] = None) -> WorkingCalendar:
+        """start_date〜end_date を含む工場のカレンダー（前後1年分を含めて年単位で作成）"""
+        first_year = pd.Timestamp(start_date).year - 1
+        last_year = pd.Timestamp(end_date).year + 1
+        signature, entries = self._load_entries()
+        key = (os.path.abspath(self.path), signature, self.weekmask, factory or '', first_year, last_year)
+        with _cache_lock:
+            calendar = _calendars.get(key)
+        if calendar is not None:
+            return calendar
+
+        applies = entries['factory'].eq('') | entries['factory'].eq(str(factory or ''))
+        entries = entries[applies]
+        days = [pd.date_range(row.date, row.end_date, freq='D') for row in entries.itertuples()]
+        working = entries['is_working'].to_numpy()
+        holidays = [d for span, w in zip(days, working) if not w for d in span]
+        workdays = [d for span, w in zip(days, working) if w for d in span]
+        calendar = WorkingCalendar(f"{first_year}-01-01", f"{last_year}-12-31",
+                                   holidays, workdays, self.weekmask)
+        with _cache_lock:
+            _calendars[key] = calendar
+        return calendar
+
+    def _load_entries(self) -> Tuple[tuple, pd.DataFrame]:
+        """休日・出勤日の行（ファイル未更新ならキャッシュを返す）"""
+        empty = pd.DataFrame({'factory': pd.Series(dtype=str), 'date': pd.Series(dtype='datetime64[ns]'),
+                              'end_date': pd.Series(dtype='datetime64[ns]'), 'is_working': pd.Series(dtype=bool)})
+        path = os.path.abspath(self.path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return (), empty
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with _cache_lock:
+            cached = _cache.get(path)
+            if cached and cached[0] == signature:
+                return cached
+        try:
+            df = pd.read_csv(path, dtype={'factory': str})
+            df['factory'] = df.get('factory', pd.Series('', index=df.index)).fillna('').str.strip()
+            df['date'] = pd.to_datetime(df['date'])
+            end_date = pd.to_datetime(df['end_date']) if 'end_date' in df.columns else df['date']
+            df['end_date'] = end_date.fillna(df['date'])
+            is_working = df['is_working'] if 'is_working' in df.columns else pd.Series(0, index=df.index)
+            df['is_working'] = pd.to_numeric(is_working, errors='coerce').fillna(0).astype(bool)
+            entries = df.dropna(subset=['date'])[['factory', 'date', 'end_date', 'is_working']]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"稼働日カレンダー読み込みエラー: {e}")
+            entries = empty
+        with _cache_lock:
+            _cache[path] = (signature, entries)
+        return signature, entries
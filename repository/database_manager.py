@@ -1,30 +1,164 @@
-from sqlalchemy import create_engine
+import contextvars
+import re
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, scoped_session
-from config import DB_CONFIG
+from sqlalchemy.pool import StaticPool
+from config import DB_CONFIG, DatabaseConfig
+
+# リポジトリの生SQLで使う DB-API 形式のプレースホルダ
+_PLACEHOLDER = re.compile(r"%s")
+
+# 実行中の作業単位のセッション（スレッド・タスクごと）
+_current_session: contextvars.ContextVar = contextvars.ContextVar("current_session", default=None)
+
 
 class DatabaseManager:
-    """SQLAlchemy を使ったデータベース接続管理"""
+    """SQLAlchemy を使ったデータベース接続管理（MySQL / SQLite）"""
 
-    def __init__(self):
-        # DB_CONFIG から接続情報を取得
-        user = DB_CONFIG.user
-        password = DB_CONFIG.password
-        host = DB_CONFIG.host
-        port = DB_CONFIG.port
-        dbname = DB_CONFIG.database
+    def __init__(self, config: Optional[DatabaseConfig] = None):
+        config = config or DB_CONFIG
+        self.backend = config.backend
 
-        db_url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{dbname}?charset=utf8mb4"
-        self.engine = create_engine(db_url, echo=False, future=True)
+        if config.backend == "sqlite":
+            if config.sqlite_path == ":memory:":
+                # インメモリは接続ごとに別DBになるため、1接続を全スレッドで共有
+                self.engine = create_engine(
+                    "sqlite://",
+                    echo=False,
+                    future=True,
+                    poolclass=StaticPool,
+                    connect_args={"check_same_thread": False},
+                )
+            else:
+                self.engine = create_engine(
+                    f"sqlite:///{config.sqlite_path}",
+                    echo=False,
+                    future=True,
+                    connect_args={"check_same_thread": False},
+                )
+        elif config.backend == "mysql":
+            # DB_CONFIG から接続情報を取得
+            user = config.user
+            password = config.password
+            host = config.host
+            port = config.port
+            dbname = config.database
+
+            db_url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{dbname}?charset={config.charset}"
+            self.engine = create_engine(
+                db_url,
+                echo=False,
+                future=True,
+                pool_size=config.pool_size,
+                max_overflow=config.max_overflow,
+                pool_recycle=config.pool_recycle,
+                pool_pre_ping=config.pool_pre_ping,
+            )
+        else:
+            raise ValueError(f"未対応のDBバックエンド: {config.backend}")
 
         # セッションファクトリ（scoped_sessionでスレッドセーフ）
         self.SessionLocal = scoped_session(sessionmaker(bind=self.engine, autocommit=False, autoflush=False))
+        # 作業単位用（読み取りではコミット後も属性を失効させない）
+        self._uow_factory = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
 
     def get_session(self):
-        """新しいセッションを取得"""
+        """セッションを取得 - 作業単位の実行中はそのセッションを共有"""
+        current = self._active_session()
+        if current is not None:
+            return current
         return self.SessionLocal()
 
+    def _active_session(self):
+        """このエンジンで実行中の作業単位のセッション（なければ None）"""
+        current = _current_session.get()
+        return current if current is not None and current.bind is self.engine else None
+
+    @contextmanager
+    def unit_of_work(self, read_only: bool = False):
+        """作業単位 - ブロック内のリポジトリ呼び出しで1つのセッション・トランザクションを共有
+
+        正常終了でコミット、例外時はロールバックする。read_only はコミットせずに閉じる
+        （rollback は読み込み済みオブジェクトを失効させるため使わない）。
+        入れ子の場合は外側の作業単位にそのまま参加する。
+        """
+        current = self._active_session()
+        if current is not None:
+            yield current
+            return
+
+        session = self._uow_factory(expire_on_commit=not read_only)
+        token = _current_session.set(session)
+        try:
+            yield session
+            if not read_only:
+                session.commit()
+        except BaseException:
+            session.rollback()
+            raise
+        finally:
+            _current_session.reset(token)
+            session.close()
+
+    def in_unit_of_work(self, session) -> bool:
+        return session is not None and session is self._active_session()
+
+    def commit_session(self, session):
+        """リポジトリ用コミット - 作業単位内では flush のみ（コミットは作業単位の終了時）"""
+        if self.in_unit_of_work(session):
+            session.flush()
+        else:
+            session.commit()
+
+    def close_session(self, session):
+        """リポジトリ用クローズ - 作業単位のセッションは閉じない"""
+        if not self.in_unit_of_work(session):
+            session.close()
+
+    @staticmethod
+    def _bind(query: str, params=None):
+        """%s プレースホルダを名前付きパラメータに変換 - (text, dict)"""
+        if params is None:
+            return text(query), {}
+        if isinstance(params, dict):
+            return text(query), params
+        values = list(params)
+        counter = iter(range(len(values)))
+        sql = _PLACEHOLDER.sub(lambda _: f":p{next(counter)}", query)
+        return text(sql), {f"p{i}": value for i, value in enumerate(values)}
+
+    def execute_query(self, query: str, params=None) -> pd.DataFrame:
+        """SELECT を実行して DataFrame で返す"""
+        statement, bind = self._bind(query, params)
+        current = self._active_session()
+        if current is not None:
+            return pd.read_sql_query(statement, current.connection(), params=bind)
+        with self.engine.connect() as conn:
+            return pd.read_sql_query(statement, conn, params=bind)
+
+    def execute_update(self, query: str, params=None) -> bool:
+        """INSERT / UPDATE / DELETE を1トランザクションで実行（作業単位内ではそのトランザクションに参加）"""
+        statement, bind = self._bind(query, params)
+        current = self._active_session()
+        if current is not None:
+            current.connection().execute(statement, bind)
+            return True
+        with self.engine.begin() as conn:
+            conn.execute(statement, bind)
+        return True
+
+    def create_schema(self):
+        """ORM メタデータからテーブルを作成（既存テーブルはそのまま）"""
+        # 全モデルを登録してから作成する
+        import domain.models.product  # noqa: F401
+        from domain.models.transport import Base
+        Base.metadata.create_all(self.engine)
+
     def close(self):
         """セッションと接続を閉じる"""
         self.SessionLocal.remove()
         self.engine.dispose()
-        
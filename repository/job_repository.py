@@ -0,0 +1,205 @@
+# app/repository/job_repository.py
+import pickle
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+
+import pandas as pd
+
+
+class JobRepository:
+    """バックグラウンドジョブ管理テーブル（SQLite）"""
+
+    # ジョブ状態
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._create_table()
+
+    def _connect(self) -> sqlite3.Connection:
+        """スレッドごとに接続を作成（sqlite3 接続はスレッド間で共有しない）"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _create_table(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                owner TEXT,
+                status TEXT NOT NULL,
+                progress REAL DEFAULT 0,
+                message TEXT,
+                result BLOB,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                worker TEXT,
+                heartbeat_at TEXT
+            )
+            """)
+            # 実行プロセス列がない旧テーブルには列を追加
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column in ("worker", "heartbeat_at"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def create_job(self, kind: str, owner: Optional[str] = None, worker: Optional[str] = None) -> str:
+        """ジョブ登録 - ジョブIDを返す（worker は実行するプロセスの識別子）"""
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat(timespec="seconds")
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, owner, status, created_at, worker, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, owner, self.PENDING, now, worker, now)
+            )
+            conn.commit()
+            return job_id
+        finally:
+            conn.close()
+
+    def mark_running(self, job_id: str):
+        self._update(job_id, status=self.RUNNING, started_at=datetime.now().isoformat(timespec="seconds"))
+
+    def update_progress(self, job_id: str, progress: float, message: Optional[str] = None):
+        self._update(job_id, progress=max(0.0, min(1.0, float(progress))), message=message)
+
+    def mark_done(self, job_id: str, result: Any):
+        self._update(job_id, status=self.DONE, progress=1.0, result=pickle.dumps(result),
+                     finished_at=datetime.now().isoformat(timespec="seconds"))
+
+    def mark_failed(self, job_id: str, error: str):
+        self._update(job_id, status=self.FAILED, error=error,
+                     finished_at=datetime.now().isoformat(timespec="seconds"))
+
+    def _update(self, job_id: str, **fields):
+        fields = {k: v for k, v in fields.items() if v is not None}
+        if not fields:
+            return
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        conn = self._connect()
+        try:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"ジョブ更新エラー: {e}")
+        finally:
+            conn.close()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """ジョブ状態取得（結果本体は含まない）"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, kind, owner, status, progress, message, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    def get_result(self, job_id: str) -> Any:
+        """完了ジョブの結果取得"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT result FROM jobs WHERE id = ? AND status = ?", (job_id, self.DONE)).fetchone()
+            return pickle.loads(row["result"]) if row and row["result"] is not None else None
+        finally:
+            conn.close()
+
+    def list_jobs(self, owner: Optional[str] = None, limit: int = 20) -> pd.DataFrame:
+        """ジョブ一覧取得（新しい順）"""
+        query = ("SELECT id, kind, owner, status, progress, message, error, created_at, finished_at "
+                 "FROM jobs")
+        params: List[Any] = []
+        if owner:
+            query += " WHERE owner = ?"
+            params.append(owner)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(query, conn, params=params)
+        finally:
+            conn.close()
+
+    def heartbeat(self, worker: str):
+        """worker が実行中（待機中を含む）のジョブの生存時刻を更新"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE worker = ? AND status IN (?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), worker, self.PENDING, self.RUNNING)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"ジョブ生存通知エラー: {e}")
+        finally:
+            conn.close()
+
+    def active_workers(self) -> List[str]:
+        """待機中・実行中のジョブを持つ worker の一覧"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT worker FROM jobs WHERE status IN (?, ?) AND worker IS NOT NULL",
+                (self.PENDING, self.RUNNING)
+            ).fetchall()
+            return [row["worker"] for row in rows]
+        finally:
+            conn.close()
+
+    def fail_stale_jobs(self, stale_seconds: float, dead_workers: Optional[List[str]] = None) -> int:
+        """実行プロセスが終了したジョブを失敗扱いにする - 件数を返す
+
+        生存時刻が stale_seconds 秒より古いジョブ、または dead_workers のジョブが対象。
+        他のプロセスが実行中のジョブは生存時刻が更新され続けるため対象にならない。
+        """
+        now = datetime.now()
+        threshold = (now - timedelta(seconds=stale_seconds)).isoformat(timespec="seconds")
+        dead_workers = list(dead_workers or [])
+        query = ("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?) "
+                 "AND (COALESCE(heartbeat_at, started_at, created_at) < ?")
+        if dead_workers:
+            query += f" OR worker IN ({', '.join('?' * len(dead_workers))})"
+        query += ")"
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                query,
+                (self.FAILED, "実行プロセスの終了により中断されました", now.isoformat(timespec="seconds"),
+                 self.PENDING, self.RUNNING, threshold, *dead_workers)
+            )
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"中断ジョブ更新エラー: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def purge_old_jobs(self, retention_days: int):
+        """保持期間を過ぎたジョブを削除"""
+        threshold = (datetime.now() - timedelta(days=retention_days)).isoformat(timespec="seconds")
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM jobs WHERE created_at < ?", (threshold,))
+            conn.commit()
+        finally:
+            conn.close()
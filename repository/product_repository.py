@@ -1,3 +1,4 @@
+from typing import List, Dict, Any
 from sqlalchemy.exc import SQLAlchemyError
 import pandas as pd
 
@@ -29,7 +30,71 @@ class ProductRepository:
             print(f"製品取得エラー: {e}")
             return pd.DataFrame()
         finally:
-            session.close()
+            self.db.close_session(session)
+
+    def get_product_master(self) -> pd.DataFrame:
+        """計画計算で共用する製品マスタ
+
+        在庫推移・ロットサイジング（入り数・リードタイム・定点日数）、積載（容器・段積み・納入先）、
+        工場別分割・稼働日カレンダー（生産工場・製品グループ）で使う列をまとめて返す。
+        """
+        try:
+            query = """
+            SELECT 
+                id,
+                product_code,
+                product_name,
+                capacity,
+                used_container_id,
+                lead_time,
+                fixed_point_days,
+                regular_replenishment_category,
+                stackable,
+                delivery_location,
+                client_code,
+                factory,
+                modified_factory,
+                shipping_factory,
+                item_group
+            FROM products
+            ORDER BY id
+            """
+            return self.db.execute_query(query)
+        except Exception as e:
+            print(f"製品マスタ取得エラー: {e}")
+            return pd.DataFrame()
+
+    def get_lot_constraints(self) -> pd.DataFrame:
+        """ロット制約取得（最小・最大ロット、製造リードタイム）"""
+        try:
+            query = """
+            SELECT 
+                product_id,
+                min_lot_size,
+                max_lot_size,
+                lead_time_days
+            FROM products_constraints
+            ORDER BY product_id
+            """
+            return self.db.execute_query(query)
+        except Exception as e:
+            print(f"ロット制約取得エラー: {e}")
+            return pd.DataFrame()
+
+    def get_daily_capacities(self) -> pd.DataFrame:
+        """製品別の日産能力取得"""
+        try:
+            query = """
+            SELECT 
+                product_id,
+                daily_capacity
+            FROM production_constraints
+            ORDER BY product_id
+            """
+            return self.db.execute_query(query)
+        except Exception as e:
+            print(f"日産能力取得エラー: {e}")
+            return pd.DataFrame()
 
     def get_product_constraints(self) -> pd.DataFrame:
         """製品制約取得"""
@@ -55,7 +120,7 @@ class ProductRepository:
             print(f"製品制約取得エラー: {e}")
             return pd.DataFrame()
         finally:
-            session.close()
+            self.db.close_session(session)
 
     def save_product_constraints(self, constraints_df: pd.DataFrame) -> bool:
         """製品制約保存（全削除 → 一括挿入）"""
@@ -71,14 +136,47 @@ class ProductRepository:
                     is_transport_constrained=bool(row.get("is_transport_constrained", False))
                 )
                 session.add(constraint)
-            session.commit()
+            self.db.commit_session(session)
+            return True
+        except SQLAlchemyError as e:
+            session.rollback()
+            print(f"製品制約保存エラー: {e}")
+            return False
+        finally:
+            self.db.close_session(session)
+
+    def upsert_product_constraints(self, rows: List[Dict[str, Any]]) -> bool:
+        """製品制約の一括更新（変更行のみ・1トランザクション）"""
+        if not rows:
+            return True
+        session = self.db.get_session()
+        try:
+            product_ids = [int(row["product_id"]) for row in rows]
+            existing = {
+                c.product_id: c for c in
+                session.query(ProductConstraint).filter(ProductConstraint.product_id.in_(product_ids)).all()
+            }
+            for row in rows:
+                values = {
+                    "daily_capacity": int(row.get("daily_capacity", 0)),
+                    "smoothing_level": float(row.get("smoothing_level", 0.0)),
+                    "volume_per_unit": float(row.get("volume_per_unit", 0.0)),
+                    "is_transport_constrained": bool(row.get("is_transport_constrained", False)),
+                }
+                constraint = existing.get(int(row["product_id"]))
+                if constraint is None:
+                    session.add(ProductConstraint(product_id=int(row["product_id"]), **values))
+                else:
+                    for key, value in values.items():
+                        setattr(constraint, key, value)
+            self.db.commit_session(session)
             return True
         except SQLAlchemyError as e:
             session.rollback()
             print(f"製品制約保存エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db.close_session(session)
 
     def create_product(self, product_data: dict) -> bool:
         """製品を新規登録"""
@@ -91,14 +189,14 @@ class ProductRepository:
                 used_container_id=product_data.get("used_container_id"),
             )
             session.add(product)
-            session.commit()
+            self.db.commit_session(session)
             return True
         except SQLAlchemyError as e:
             session.rollback()
             print(f"製品登録エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db.close_session(session)
 
     def update_product(self, product_id: int, update_data: dict) -> bool:
         """製品を更新"""
@@ -109,14 +207,14 @@ class ProductRepository:
                 return False
             for key, value in update_data.items():
                 setattr(product, key, value)
-            session.commit()
+            self.db.commit_session(session)
             return True
         except SQLAlchemyError as e:
             session.rollback()
             print(f"製品更新エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db.close_session(session)
 
     def delete_product(self, product_id: int) -> bool:
         """製品を削除"""
@@ -126,11 +224,11 @@ class ProductRepository:
             if not product:
                 return False
             session.delete(product)
-            session.commit()
+            self.db.commit_session(session)
             return True
         except SQLAlchemyError as e:
             session.rollback()
             print(f"製品削除エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db.close_session(session)
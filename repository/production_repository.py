@@ -4,10 +4,10 @@ import pandas as pd
 
 class ProductionRepository:
     """生産関連データアクセス"""
-    
+
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
-    
+
     def get_production_instructions(self, start_date=None, end_date=None) -> pd.DataFrame:
         """生産指示データ取得 - 製品情報と結合"""
         base_query = """
@@ -30,21 +30,7 @@ class ProductionRepository:
             return self.db.execute_query(query, [start_date, end_date])
         else:
             query = base_query + " ORDER BY pid.instruction_date"
-            return self.db.execute_query(query)# app/repository/production_repository.py
-from .database_manager import DatabaseManager
-import pandas as pd
-
-class ProductionRepository:
-    """生産関連データアクセス"""
-
-    def __init__(self, db_manager: DatabaseManager):
-        self.db = db_manager
-
-    # 既存
-    def get_production_instructions(self, start_date=None, end_date=None) -> pd.DataFrame:
-        ...
-
-    # --- 新規追加 ---
+            return self.db.execute_query(query)
 
     def create_production(self, plan_data: dict) -> bool:
         """生産計画を新規登録"""
@@ -85,6 +71,116 @@ class ProductionRepository:
             print(f"生産計画取得エラー: {e}")
             return []
 
+    def _production_filters(self, product_id=None, start_date=None, end_date=None):
+        """生産計画一覧の絞り込み条件 - (WHERE句, パラメータ)"""
+        conditions, params = [], []
+        if product_id:
+            conditions.append("pid.product_id = %s")
+            params.append(product_id)
+        if start_date and end_date:
+            conditions.append("pid.instruction_date BETWEEN %s AND %s")
+            params.extend([start_date, end_date])
+        where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+        return where, params
+
+    def count_productions(self, product_id=None, start_date=None, end_date=None) -> int:
+        """登録済み生産計画の件数"""
+        try:
+            where, params = self._production_filters(product_id, start_date, end_date)
+            df = self.db.execute_query(
+                "SELECT COUNT(*) AS total FROM production_instructions_detail pid" + where, params
+            )
+            return int(df.iloc[0]["total"]) if df is not None and not df.empty else 0
+        except Exception as e:
+            print(f"生産計画件数取得エラー: {e}")
+            return 0
+
+    def get_productions_page(self, offset: int = 0, limit: int = 20, product_id=None,
+                             start_date=None, end_date=None) -> pd.DataFrame:
+        """登録済み生産計画のページ取得（日付・ID順 LIMIT/OFFSET）"""
+        try:
+            where, params = self._production_filters(product_id, start_date, end_date)
+            query = """
+            SELECT 
+                pid.id,
+                pid.product_id,
+                p.product_name,
+                pid.instruction_date AS scheduled_date,
+                pid.instruction_quantity AS quantity
+            FROM production_instructions_detail pid
+            LEFT JOIN products p ON pid.product_id = p.id
+            """ + where + " ORDER BY pid.instruction_date, pid.id LIMIT %s OFFSET %s"
+            return self.db.execute_query(query, params + [limit, offset])
+        except Exception as e:
+            print(f"生産計画取得エラー: {e}")
+            return pd.DataFrame()
+
+    def get_daily_demand_totals(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """日別需要量をDB側で集計（チャート用ロールアップ）"""
+        try:
+            query = """
+            SELECT 
+                pid.instruction_date,
+                SUM(pid.instruction_quantity) AS instruction_quantity
+            FROM production_instructions_detail pid
+            WHERE pid.instruction_quantity > 0
+            """
+            params = []
+            if start_date and end_date:
+                query += " AND pid.instruction_date BETWEEN %s AND %s"
+                params = [start_date, end_date]
+            query += " GROUP BY pid.instruction_date ORDER BY pid.instruction_date"
+            return self.db.execute_query(query, params)
+        except Exception as e:
+            print(f"日別需要集計エラー: {e}")
+            return pd.DataFrame()
+
+    def get_product_demand_totals(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """製品別需要量をDB側で集計"""
+        try:
+            query = """
+            SELECT 
+                p.product_code,
+                p.product_name,
+                SUM(pid.instruction_quantity) AS instruction_quantity
+            FROM production_instructions_detail pid
+            LEFT JOIN products p ON pid.product_id = p.id
+            WHERE pid.instruction_quantity > 0
+            """
+            params = []
+            if start_date and end_date:
+                query += " AND pid.instruction_date BETWEEN %s AND %s"
+                params = [start_date, end_date]
+            query += " GROUP BY p.product_code, p.product_name ORDER BY instruction_quantity DESC"
+            return self.db.execute_query(query, params)
+        except Exception as e:
+            print(f"製品別需要集計エラー: {e}")
+            return pd.DataFrame()
+
+    def get_demand_forecasts(self) -> pd.DataFrame:
+        """製品別の月次予測量を取得（最新の開始月）"""
+        try:
+            query = """
+            SELECT 
+                pid.product_id,
+                pid.start_month,
+                MAX(pid.total_first_month) AS total_first_month,
+                MAX(pid.total_next_month) AS total_next_month,
+                MAX(pid.total_next_next_month) AS total_next_next_month
+            FROM production_instructions_detail pid
+            INNER JOIN (
+                SELECT product_id, MAX(start_month) AS start_month
+                FROM production_instructions_detail
+                GROUP BY product_id
+            ) latest ON pid.product_id = latest.product_id AND pid.start_month = latest.start_month
+            GROUP BY pid.product_id, pid.start_month
+            ORDER BY pid.product_id
+            """
+            return self.db.execute_query(query)
+        except Exception as e:
+            print(f"月次予測取得エラー: {e}")
+            return pd.DataFrame()
+
     def update_production(self, plan_id: int, update_data: dict) -> bool:
         """生産計画を更新"""
         try:
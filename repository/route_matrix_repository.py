@@ -0,0 +1,87 @@
+# app/repository/route_matrix_repository.py
+"""拠点間の距離・所要時間表（ローカル CSV）
+
+CSV 形式: from_location,to_location,distance_km,travel_minutes
+片方向のみ記載された区間は逆方向も同じ値とみなし、記載のない区間は到達不可（inf）とする。
+読み込み結果は拠点コード → 行番号の索引付き NumPy 行列としてファイル更新時刻ごとにキャッシュする。
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import ROUTING_CONFIG
+
+_cache: Dict[str, Tuple[tuple, 'RouteMatrix']] = {}
+_cache_lock = threading.Lock()
+
+
+@dataclass
+class RouteMatrix:
+    """索引付き距離・所要時間行列"""
+    locations: List[str]
+    index: Dict[str, int]
+    distance: np.ndarray     # (拠点数, 拠点数) km
+    minutes: np.ndarray      # (拠点数, 拠点数) 分
+
+    def positions(self, codes: Sequence[str]) -> np.ndarray:
+        """拠点コード → 行番号（未登録は -1）"""
+        return np.array([self.index.get(str(code), -1) for code in codes], dtype=np.int64)
+
+    def submatrix(self, codes: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """指定拠点の順に並べた (距離, 所要時間) 行列"""
+        pos = self.positions(codes)
+        if (pos < 0).any():
+            missing = [code for code, p in zip(codes, pos) if p < 0]
+            raise KeyError(f"距離表に未登録の拠点: {missing}")
+        grid = np.ix_(pos, pos)
+        return self.distance[grid], self.minutes[grid]
+
+
+class RouteMatrixRepository:
+    """距離・所要時間表データアクセス"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or ROUTING_CONFIG.matrix_path
+
+    def get_matrix(self) -> Optional[RouteMatrix]:
+        """距離表を取得（ファイル未更新ならキャッシュを返す）"""
+        try:
+            path = os.path.abspath(self.path)
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            with _cache_lock:
+                cached = _cache.get(path)
+                if cached and cached[0] == signature:
+                    return cached[1]
+            matrix = self._load(path)
+            with _cache_lock:
+                _cache[path] = (signature, matrix)
+            return matrix
+        except (OSError, ValueError, KeyError) as e:
+            print(f"距離表読み込みエラー: {e}")
+            return None
+
+    @staticmethod
+    def _load(path: str) -> RouteMatrix:
+        df = pd.read_csv(path, dtype={'from_location': str, 'to_location': str})
+        df = df.dropna(subset=['from_location', 'to_location'])
+        locations = sorted(set(df['from_location']) | set(df['to_location']))
+        index = {code: i for i, code in enumerate(locations)}
+        src = df['from_location'].map(index).to_numpy()
+        dst = df['to_location'].map(index).to_numpy()
+
+        n = len(locations)
+        distance = np.full((n, n), np.inf)
+        minutes = np.full((n, n), np.inf)
+        # 逆方向を先に埋め、明示された方向で上書き
+        distance[dst, src] = df['distance_km'].to_numpy(dtype=float)
+        minutes[dst, src] = df['travel_minutes'].to_numpy(dtype=float)
+        distance[src, dst] = df['distance_km'].to_numpy(dtype=float)
+        minutes[src, dst] = df['travel_minutes'].to_numpy(dtype=float)
+        np.fill_diagonal(distance, 0.0)
+        np.fill_diagonal(minutes, 0.0)
+        return RouteMatrix(locations=locations, index=index, distance=distance, minutes=minutes)
@@ -0,0 +1,96 @@
+# app/repository/seed.py
+"""初期データ投入: python -m repository.seed
+
+ORM メタデータからスキーマを作成し、products.csv / production_instructions_detail.csv を一括投入する。
+APP_DB_BACKEND=sqlite と組み合わせると MySQL なしで開発・ベンチマーク用の DB を用意できる。
+"""
+import argparse
+import sys
+from typing import Dict
+
+import pandas as pd
+from sqlalchemy import Boolean, Date, Integer, Float, TIMESTAMP, DateTime
+
+from repository.database_manager import DatabaseManager
+
+DEFAULT_SOURCES = {
+    "products": "products.csv",
+    "production_instructions_detail": "production_instructions_detail.csv",
+}
+
+
+def _table(name: str):
+    import domain.models.product  # noqa: F401  全モデルをメタデータに登録
+    from domain.models.transport import Base
+    return Base.metadata.tables[name]
+
+
+def _coerce(df: pd.DataFrame, table) -> pd.DataFrame:
+    """テーブル定義に合わせて列を絞り込み・型変換（計算列は除外）"""
+    columns = [c for c in table.columns if c.name in df.columns and c.computed is None]
+    result = pd.DataFrame(index=df.index)
+    for column in columns:
+        values = df[column.name]
+        if isinstance(column.type, (Integer, Float)):
+            values = pd.to_numeric(values, errors="coerce")
+        elif isinstance(column.type, Boolean):
+            if not pd.api.types.is_bool_dtype(values):
+                values = pd.to_numeric(values, errors="coerce").astype("boolean")
+        elif isinstance(column.type, Date):
+            values = pd.to_datetime(values, errors="coerce").dt.date
+        elif isinstance(column.type, (TIMESTAMP, DateTime)):
+            values = pd.to_datetime(values, errors="coerce")
+        result[column.name] = values
+    # NaN / NaT は NULL として投入
+    return result.astype(object).where(result.notna(), None)
+
+
+def bulk_load(db: DatabaseManager, table_name: str, df: pd.DataFrame, chunk_size: int = 5000) -> int:
+    """DataFrame をテーブルへ一括 INSERT（executemany・1トランザクション）"""
+    table = _table(table_name)
+    records = _coerce(df, table).to_dict("records")
+    with db.engine.begin() as conn:
+        for start in range(0, len(records), chunk_size):
+            conn.execute(table.insert(), records[start:start + chunk_size])
+    return len(records)
+
+
+def seed_from_csv(db: DatabaseManager, sources: Dict[str, str] = None, replace: bool = False) -> Dict[str, int]:
+    """CSV からスキーマ作成・一括投入 - テーブル別の投入件数を返す"""
+    sources = sources or DEFAULT_SOURCES
+    db.create_schema()
+    if replace:
+        # 子テーブルから削除
+        with db.engine.begin() as conn:
+            for table_name in reversed(list(sources)):
+                conn.execute(_table(table_name).delete())
+
+    counts = {}
+    for table_name, path in sources.items():
+        df = pd.read_csv(path, dtype=str, na_values=["NULL"], keep_default_na=True)
+        counts[table_name] = bulk_load(db, table_name, df)
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m repository.seed", description="スキーマ作成と初期データ投入")
+    parser.add_argument("--products", default=DEFAULT_SOURCES["products"], help="製品 CSV")
+    parser.add_argument("--instructions", default=DEFAULT_SOURCES["production_instructions_detail"], help="生産指示 CSV")
+    parser.add_argument("--replace", action="store_true", help="既存データを削除してから投入")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager()
+    try:
+        counts = seed_from_csv(db, {
+            "products": args.products,
+            "production_instructions_detail": args.instructions,
+        }, replace=args.replace)
+    finally:
+        db.close()
+    for table_name, count in counts.items():
+        print(f"{table_name}: {count}行")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Optional, List, Dict, Any
 from repository.database_manager import DatabaseManager
@@ -19,21 +20,70 @@ class TransportRepository:
             print(f"Container取得エラー: {e}")
             return []
         finally:
-            session.close()
+            self.db_manager.close_session(session)
+
+    def count_containers(self, name_filter: Optional[str] = None) -> int:
+        """容器件数（名称で絞り込み可）"""
+        session = self.db_manager.get_session()
+        try:
+            query = session.query(func.count(Container.id))
+            if name_filter:
+                query = query.filter(Container.name.like(f"%{name_filter}%"))
+            return int(query.scalar() or 0)
+        except SQLAlchemyError as e:
+            print(f"Container集計エラー: {e}")
+            return 0
+        finally:
+            self.db_manager.close_session(session)
+
+    def get_containers_page(self, offset: int = 0, limit: int = 20,
+                            name_filter: Optional[str] = None) -> List[Container]:
+        """容器一覧のページ取得（ID順 LIMIT/OFFSET）"""
+        session = self.db_manager.get_session()
+        try:
+            query = session.query(Container)
+            if name_filter:
+                query = query.filter(Container.name.like(f"%{name_filter}%"))
+            return query.order_by(Container.id).offset(offset).limit(limit).all()
+        except SQLAlchemyError as e:
+            print(f"Container取得エラー: {e}")
+            return []
+        finally:
+            self.db_manager.close_session(session)
+
+    def get_container_stats(self) -> Dict[str, float]:
+        """容器統計（件数・平均体積・平均最大重量）をDB側で集計"""
+        session = self.db_manager.get_session()
+        try:
+            count, avg_volume, avg_weight = session.query(
+                func.count(Container.id),
+                func.avg(Container.width * Container.depth * Container.height),
+                func.avg(Container.max_weight)
+            ).one()
+            return {
+                "count": int(count or 0),
+                "avg_volume": float(avg_volume or 0),
+                "avg_weight": float(avg_weight or 0),
+            }
+        except SQLAlchemyError as e:
+            print(f"Container集計エラー: {e}")
+            return {"count": 0, "avg_volume": 0.0, "avg_weight": 0.0}
+        finally:
+            self.db_manager.close_session(session)
 
     def save_container(self, container_data: dict) -> bool:
         session = self.db_manager.get_session()
         try:
             container = Container(**container_data)
             session.add(container)
-            session.commit()
+            self.db_manager.commit_session(session)
             return True
         except SQLAlchemyError as e:
             session.rollback()
             print(f"Container保存エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
 
 
 
@@ -58,10 +108,62 @@ class TransportRepository:
             print(f"truck_masterテーブル取得エラー: {e}")
             return pd.DataFrame()
         finally:
-            session.close()
+            self.db_manager.close_session(session)
 
     
 
+    def count_trucks(self, name_filter: Optional[str] = None) -> int:
+        """トラック件数（名称で絞り込み可）"""
+        session = self.db_manager.get_session()
+        try:
+            query = session.query(func.count(Truck.id))
+            if name_filter:
+                query = query.filter(Truck.name.like(f"%{name_filter}%"))
+            return int(query.scalar() or 0)
+        except SQLAlchemyError as e:
+            print(f"truck_masterテーブル集計エラー: {e}")
+            return 0
+        finally:
+            self.db_manager.close_session(session)
+
+    def get_trucks_page(self, offset: int = 0, limit: int = 20,
+                        name_filter: Optional[str] = None) -> pd.DataFrame:
+        """トラック一覧のページ取得（ID順 LIMIT/OFFSET）"""
+        session = self.db_manager.get_session()
+        try:
+            query = session.query(Truck)
+            if name_filter:
+                query = query.filter(Truck.name.like(f"%{name_filter}%"))
+            trucks = query.order_by(Truck.id).offset(offset).limit(limit).all()
+            return pd.DataFrame([{
+                "id": t.id,
+                "name": t.name,
+                "width": t.width,
+                "depth": t.depth,
+                "height": t.height,
+                "max_weight": t.max_weight,
+                "departure_time": t.departure_time,
+                "arrival_time": t.arrival_time,
+                "default_use": t.default_use,
+                "arrival_day_offset": t.arrival_day_offset
+            } for t in trucks])
+        except SQLAlchemyError as e:
+            print(f"truck_masterテーブル取得エラー: {e}")
+            return pd.DataFrame()
+        finally:
+            self.db_manager.close_session(session)
+
+    def get_truck_models(self) -> List[Truck]:
+        """トラック一覧取得 - ORM オブジェクトで返す（計画計算用）"""
+        session = self.db_manager.get_session()
+        try:
+            return session.query(Truck).order_by(Truck.id).all()
+        except SQLAlchemyError as e:
+            print(f"truck_masterテーブル取得エラー: {e}")
+            return []
+        finally:
+            self.db_manager.close_session(session)
+
     def save_truck(self, truck_data: dict) -> bool:
         """トラック保存 - truck_masterテーブルを使用 (DATETIME対応)"""
         session = self.db_manager.get_session()
@@ -95,14 +197,14 @@ class TransportRepository:
                 arrival_day_offset=offset,
             )
             session.add(truck)
-            session.commit()
+            self.db_manager.commit_session(session)
             return True
         except Exception as e:
             session.rollback()
             print(f"Truck保存エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
    
     
 
@@ -112,7 +214,7 @@ class TransportRepository:
             truck = session.get(Truck, truck_id)
             if truck:
                 session.delete(truck)
-                session.commit()
+                self.db_manager.commit_session(session)
                 return True
             return False
         except SQLAlchemyError as e:
@@ -120,7 +222,7 @@ class TransportRepository:
             print(f"Truck削除エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
 
     def get_truck_container_rules(self):
         session = self.db_manager.get_session()
@@ -132,21 +234,21 @@ class TransportRepository:
             print(f"TruckContainerRule取得エラー: {e}")
             return []
         finally:
-            session.close()
+            self.db_manager.close_session(session)
 
     def save_truck_container_rule(self, rule_data: dict) -> bool:
         session = self.db_manager.get_session()
         try:
             rule = TruckContainerRule(**rule_data)
             session.merge(rule)  # UPSERT 的に扱う
-            session.commit()
+            self.db_manager.commit_session(session)
             return True
         except SQLAlchemyError as e:
             session.rollback()
             print(f"TruckContainerRule保存エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
 
     def get_transport_constraints(self):
         session = self.db_manager.get_session()
@@ -158,7 +260,7 @@ class TransportRepository:
             print(f"TransportConstraint取得エラー: {e}")
             return None
         finally:
-            session.close()
+            self.db_manager.close_session(session)
 
     def save_transport_constraints(self, constraints_data: dict) -> bool:
         session = self.db_manager.get_session()
@@ -166,14 +268,14 @@ class TransportRepository:
             session.query(TransportConstraint).delete()  # 全削除
             constraint = TransportConstraint(**constraints_data)
             session.add(constraint)
-            session.commit()
+            self.db_manager.commit_session(session)
             return True
         except SQLAlchemyError as e:
             session.rollback()
             print(f"TransportConstraint保存エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
     def delete_container(self, container_id: int) -> bool:
         """容器を削除"""
         session = self.db_manager.get_session()
@@ -181,7 +283,7 @@ class TransportRepository:
             container = session.get(Container, container_id)
             if container:
                 session.delete(container)
-                session.commit()
+                self.db_manager.commit_session(session)
                 return True
             return False
         except SQLAlchemyError as e:
@@ -189,7 +291,7 @@ class TransportRepository:
             print(f"Container削除エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
     def delete_truck_container_rule(self, rule_id: int) -> bool:
         """トラック容器ルールを削除"""
         session = self.db_manager.get_session()
@@ -197,7 +299,7 @@ class TransportRepository:
             rule = session.get(TruckContainerRule, rule_id)
             if rule:
                 session.delete(rule)
-                session.commit()
+                self.db_manager.commit_session(session)
                 return True
             return False
         except SQLAlchemyError as e:
@@ -205,7 +307,7 @@ class TransportRepository:
             print(f"TruckContainerRule削除エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
     def update_container(self, container_id: int, update_data: dict) -> bool:
         """容器を更新"""
         session = self.db_manager.get_session()
@@ -214,7 +316,7 @@ class TransportRepository:
             if container:
                 for key, value in update_data.items():
                     setattr(container, key, value)
-                session.commit()
+                self.db_manager.commit_session(session)
                 return True
             return False
         except SQLAlchemyError as e:
@@ -222,7 +324,7 @@ class TransportRepository:
             print(f"Container更新エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
     def update_truck(self, truck_id: int, update_data: dict) -> bool:
         """トラックを更新"""
         session = self.db_manager.get_session()
@@ -231,7 +333,7 @@ class TransportRepository:
             if truck:
                 for key, value in update_data.items():
                     setattr(truck, key, value)
-                session.commit()
+                self.db_manager.commit_session(session)
                 return True
             return False
         except SQLAlchemyError as e:
@@ -239,7 +341,7 @@ class TransportRepository:
             print(f"Truck更新エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
     def update_truck_container_rule(self, rule_id: int, update_data: dict) -> bool:
         """トラック容器ルールを更新"""
         session = self.db_manager.get_session()
@@ -248,7 +350,7 @@ class TransportRepository:
             if rule:
                 for key, value in update_data.items():
                     setattr(rule, key, value)
-                session.commit()
+                self.db_manager.commit_session(session)
                 return True
             return False
         except SQLAlchemyError as e:
@@ -256,7 +358,7 @@ class TransportRepository:
             print(f"TruckContainerRule更新エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
     def update_transport_constraints(self, update_data: dict) -> bool:
         """輸送制約を更新"""
         session = self.db_manager.get_session()
@@ -265,7 +367,7 @@ class TransportRepository:
             if constraint:
                 for key, value in update_data.items():
                     setattr(constraint, key, value)
-                session.commit()
+                self.db_manager.commit_session(session)
                 return True
             return False
         except SQLAlchemyError as e:
@@ -273,7 +375,7 @@ class TransportRepository:
             print(f"TransportConstraint更新エラー: {e}")
             return False
         finally:
-            session.close()
+            self.db_manager.close_session(session)
     def get_container_by_id(self, container_id: int) -> Optional[Container]:
         """IDで容器を取得"""
         session = self.db_manager.get_session()
@@ -283,7 +385,7 @@ class TransportRepository:
             print(f"Container取得エラー: {e}")
             return None
         finally:
-            session.close()
+            self.db_manager.close_session(session)
     def get_truck_by_id(self, truck_id: int) -> Optional[Truck]:
         """IDでトラックを取得"""
         session = self.db_manager.get_session()
@@ -293,7 +395,7 @@ class TransportRepository:
             print(f"Truck取得エラー: {e}")
             return None
         finally:
-            session.close()
+            self.db_manager.close_session(session)
     def get_truck_container_rule_by_id(self, rule_id: int) -> Optional[TruckContainerRule]:
         """IDでトラック容器ルールを取得"""
         session = self.db_manager.get_session()
@@ -303,5 +405,5 @@ class TransportRepository:
             print(f"TruckContainerRule取得エラー: {e}")
             return None
         finally:
-            session.close()
+            self.db_manager.close_session(session)
             
\ No newline at end of file
@@ -0,0 +1,216 @@
+# app/services/instrumentation.py
+"""計測 - SQL クエリとサービス・計算機呼び出しの回数・所要時間を集計する
+
+- instrument_engine: SQLAlchemy エンジンのイベントでクエリ数・行数・時間・エラー・スロークエリを記録
+- instrument_service: サービスと保持する計算機の公開メソッドをタイマーで包む
+- 集計結果は診断ページ（?diagnostics=1）と Prometheus テキスト形式（API /metrics）で参照する
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import event
+
+from config import INSTRUMENTATION_CONFIG
+
+logger = logging.getLogger("app.metrics")
+
+# 実行中の計測対象（クエリを発行元のサービス・計算機に紐付ける）
+_current_operation: contextvars.ContextVar = contextvars.ContextVar("current_operation", default="-")
+
+_SQL_TEXT_LIMIT = 2000
+
+
+class MetricsRegistry:
+    """計測値の集計（スレッドセーフ・プロセス内）"""
+
+    def __init__(self, slow_query_ms: float, slow_query_keep: int):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._operations: Dict[str, Dict[str, float]] = {}
+        self._queries: Dict[str, Dict[str, float]] = {}
+        self._slow_queries = deque(maxlen=slow_query_keep)
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, float]:
+        return {"calls": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0, "rows": 0}
+
+    def _record(self, table: Dict[str, Dict[str, float]], name: str, duration: float,
+                rows: Optional[int], error: bool):
+        with self._lock:
+            stats = table.setdefault(name, self._empty_stats())
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["total_s"] += duration
+            stats["max_s"] = max(stats["max_s"], duration)
+            if rows is not None and rows >= 0:
+                stats["rows"] += rows
+
+    def record_operation(self, name: str, duration: float, rows: Optional[int] = None, error: bool = False):
+        """サービス・計算機呼び出しの記録"""
+        self._record(self._operations, name, duration, rows, error)
+
+    def record_query(self, operation: str, statement: str, parameters, duration: float,
+                     rows: Optional[int] = None, error: bool = False):
+        """SQL クエリの記録（閾値超過時はスロークエリとして SQL 文を保持）"""
+        self._record(self._queries, operation, duration, rows, error)
+        if duration * 1000 >= self.slow_query_ms:
+            entry = {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "operation": operation,
+                "duration_ms": round(duration * 1000, 1),
+                "rows": rows,
+                "statement": statement[:_SQL_TEXT_LIMIT],
+                "parameters": repr(parameters)[:_SQL_TEXT_LIMIT],
+            }
+            with self._lock:
+                self._slow_queries.append(entry)
+            log_event("slow_query", **entry)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """現在の集計値のコピー"""
+        with self._lock:
+            return {
+                "operations": [{"name": k, **v} for k, v in self._operations.items()],
+                "queries": [{"operation": k, **v} for k, v in self._queries.items()],
+                "slow_queries": list(self._slow_queries),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+            self._queries.clear()
+            self._slow_queries.clear()
+
+    def to_prometheus(self) -> str:
+        """Prometheus テキスト形式で出力"""
+        snap = self.snapshot()
+        lines: List[str] = []
+
+        def emit(metric: str, kind: str, help_text: str, label: str, rows: list, field: str):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for row in rows:
+                lines.append(f'{metric}{{{label}="{_escape_label(row[label])}"}} {row[field]}')
+
+        ops, queries = snap["operations"], snap["queries"]
+        emit("app_operation_calls_total", "counter", "Service and calculator calls", "name", ops, "calls")
+        emit("app_operation_errors_total", "counter", "Calls that raised", "name", ops, "errors")
+        emit("app_operation_seconds_total", "counter", "Total call duration", "name", ops, "total_s")
+        emit("app_operation_seconds_max", "gauge", "Slowest call", "name", ops, "max_s")
+        emit("app_db_queries_total", "counter", "SQL statements by issuing operation", "operation", queries, "calls")
+        emit("app_db_query_errors_total", "counter", "Failed SQL statements", "operation", queries, "errors")
+        emit("app_db_query_seconds_total", "counter", "Total SQL duration", "operation", queries, "total_s")
+        emit("app_db_query_seconds_max", "gauge", "Slowest SQL statement", "operation", queries, "max_s")
+        emit("app_db_rows_total", "counter", "Rows reported by the cursor", "operation", queries, "rows")
+        lines.append("# HELP app_db_slow_queries_retained Slow queries currently retained")
+        lines.append("# TYPE app_db_slow_queries_retained gauge")
+        lines.append(f"app_db_slow_queries_retained {len(snap['slow_queries'])}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def log_event(event_name: str, **fields):
+    """構造化ログ（1行 JSON）"""
+    logger.warning(json.dumps({"event": event_name, **fields}, ensure_ascii=False, default=str))
+
+
+METRICS = MetricsRegistry(INSTRUMENTATION_CONFIG.slow_query_ms, INSTRUMENTATION_CONFIG.slow_query_keep)
+
+
+def get_metrics() -> MetricsRegistry:
+    """プロセス共有の計測レジストリ"""
+    return METRICS
+
+
+def _row_count(result) -> Optional[int]:
+    if result is None or isinstance(result, (str, bytes, dict)):
+        return None
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def timed(name: str):
+    """呼び出し回数・所要時間・例外・返却件数を記録するデコレータ"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = _current_operation.set(name)
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                METRICS.record_operation(name, time.perf_counter() - started, error=True)
+                log_event("operation_error", operation=name, error=repr(e))
+                raise
+            finally:
+                _current_operation.reset(token)
+            METRICS.record_operation(name, time.perf_counter() - started, rows=_row_count(result))
+            return result
+        return wrapper
+    return decorator
+
+
+def instrument_methods(obj, prefix: str):
+    """インスタンスの公開メソッドを timed で包む（クラス定義は変更しない）"""
+    for attr, _ in inspect.getmembers(type(obj), inspect.isfunction):
+        if attr.startswith("_"):
+            continue
+        setattr(obj, attr, timed(f"{prefix}.{attr}")(getattr(obj, attr)))
+    return obj
+
+
+def instrument_service(service, prefix: str):
+    """サービスと、そのサービスが保持する計算機・検証器を計測対象にする"""
+    if not INSTRUMENTATION_CONFIG.enabled:
+        return service
+    for attr, value in vars(service).items():
+        if type(value).__module__.startswith("domain."):
+            instrument_methods(value, f"{prefix}.{attr}")
+    return instrument_methods(service, prefix)
+
+
+def instrument_engine(engine):
+    """SQLAlchemy エンジンにクエリ計測のイベントを登録"""
+    if not INSTRUMENTATION_CONFIG.enabled or event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    return engine
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_started"].pop()
+    METRICS.record_query(_current_operation.get(), statement, parameters, duration, rows=cursor.rowcount)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    started = conn.info.get("query_started") if conn is not None else None
+    duration = time.perf_counter() - started.pop() if started else 0.0
+    statement = exception_context.statement or ""
+    METRICS.record_query(_current_operation.get(), statement, exception_context.parameters, duration, error=True)
+    # リポジトリ側で例外が握りつぶされても SQL 文とエラーはログに残す
+    log_event(
+        "query_error",
+        operation=_current_operation.get(),
+        error=repr(exception_context.original_exception),
+        statement=statement[:_SQL_TEXT_LIMIT],
+    )
@@ -0,0 +1,116 @@
+# app/services/job_service.py
+import inspect
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Any, Dict
+
+from config import JOB_CONFIG
+from repository.job_repository import JobRepository
+
+
+def _process_alive(worker: str) -> Optional[bool]:
+    """worker（ホスト名:PID）のプロセスが生存しているか - 判定できない場合は None"""
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit() or os.name == "nt":
+        # 別ホストのプロセスと Windows（os.kill がプロセスを終了させる）は生存通知の途絶で判定する
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobService:
+    """バックグラウンドジョブ実行 - ワーカープールとジョブテーブルを管理
+
+    ジョブテーブルは API・CLI・Streamlit の各プロセスで共有するため、ジョブには実行プロセス
+    （ホスト名:PID）を記録し、実行中は一定間隔で生存時刻を更新する。起動時と生存通知のたびに、
+    終了したプロセスのジョブと生存通知が途絶えたジョブだけを失敗扱いにする。
+    """
+
+    def __init__(self, repository: JobRepository, max_workers: int = 4,
+                 heartbeat_seconds: float = 10.0, stale_seconds: float = 60.0):
+        self.repository = repository
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = max(stale_seconds, heartbeat_seconds * 2)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self.fail_stale_jobs()
+        self._stopped = threading.Event()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def submit(self, kind: str, func: Callable, *args, owner: Optional[str] = None, **kwargs) -> str:
+        """ジョブ投入 - ジョブIDを返す
+
+        func が progress 引数を受け取る場合は進捗通知用コールバック progress(割合, メッセージ) を渡す。
+        """
+        job_id = self.repository.create_job(kind, owner, self.worker_id)
+        if "progress" in inspect.signature(func).parameters:
+            kwargs["progress"] = lambda fraction, message=None: self.repository.update_progress(job_id, fraction, message)
+        self.executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def _run(self, job_id: str, func: Callable, args: tuple, kwargs: dict):
+        """ワーカースレッドでジョブを実行し、結果をジョブテーブルに保存"""
+        self.repository.mark_running(job_id)
+        try:
+            result = func(*args, **kwargs)
+            self.repository.mark_done(job_id, result)
+        except Exception as e:
+            print(f"ジョブ実行エラー ({job_id}): {e}")
+            self.repository.mark_failed(job_id, f"{e}\n{traceback.format_exc()}")
+
+    def fail_stale_jobs(self) -> int:
+        """実行プロセスが終了したジョブを失敗扱いにする - 件数を返す"""
+        dead = [worker for worker in self.repository.active_workers()
+                if worker != self.worker_id and _process_alive(worker) is False]
+        return self.repository.fail_stale_jobs(self.stale_seconds, dead)
+
+    def _heartbeat_loop(self):
+        """自プロセスのジョブの生存時刻を更新し、他プロセスの中断ジョブを片付ける"""
+        while not self._stopped.wait(self.heartbeat_seconds):
+            try:
+                self.repository.heartbeat(self.worker_id)
+                self.fail_stale_jobs()
+            except Exception as e:
+                print(f"ジョブ生存通知エラー: {e}")
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """ジョブ状態取得"""
+        return self.repository.get_job(job_id)
+
+    def get_result(self, job_id: str) -> Any:
+        """ジョブ結果取得"""
+        return self.repository.get_result(job_id)
+
+    def list_jobs(self, owner: Optional[str] = None, limit: int = 20):
+        """ジョブ一覧取得"""
+        return self.repository.list_jobs(owner, limit)
+
+    def shutdown(self):
+        self._stopped.set()
+        self.executor.shutdown(wait=False)
+
+
+# プロセス内で共有するジョブサービス（Streamlit の再実行をまたいで生存）
+_job_service: Optional[JobService] = None
+_job_service_lock = threading.Lock()
+
+
+def get_job_service() -> JobService:
+    """プロセス共有のジョブサービスを取得"""
+    global _job_service
+    with _job_service_lock:
+        if _job_service is None:
+            repository = JobRepository(JOB_CONFIG.db_path)
+            repository.purge_old_jobs(JOB_CONFIG.retention_days)
+            _job_service = JobService(repository, JOB_CONFIG.max_workers,
+                                      JOB_CONFIG.heartbeat_seconds, JOB_CONFIG.stale_seconds)
+        return _job_service
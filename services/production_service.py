@@ -1,19 +1,59 @@
 # app/services/production_service.py
+from dataclasses import replace
 from typing import List
+import numpy as np
+import pandas as pd
 from repository.product_repository import ProductRepository
 from repository.production_repository import ProductionRepository
+from repository.transport_repository import TransportRepository
+from repository.calendar_repository import CalendarRepository
 from domain.calculators.production_calculator import ProductionCalculator
+from domain.calculators.plan_diff_calculator import PlanDiffCalculator, CONSTRAINT_VALUES
+from domain.calculators.scenario_runner import ScenarioInput, ScenarioRunner
+from domain.calculators.demand_simulator import SimulationInput, DemandSimulator
+from domain.calculators.inventory_projector import ProjectionInput, InventoryProjector
+from domain.calculators.lot_sizer import LotSizingInput, LotSizer
+from domain.calculators.partitioned_planner import PartitionedPlanner, production_shards
 from domain.models.product import Product, ProductConstraint
 from domain.models.production import ProductionInstruction, ProductionPlan
-import streamlit as st
+from domain.models.scenario import PlanScenario
+from domain.exceptions import PlanningError, NoDataError, InvalidInputError
+from services.job_service import get_job_service
+from config import PLANNING_CONFIG
+
+# 制約未設定の製品に用いる既定値
+CONSTRAINT_DEFAULTS = {
+    'daily_capacity': 1000,
+    'smoothing_level': 0.7,
+    'volume_per_unit': 1.0,
+    'is_transport_constrained': False,
+}
+
+
+def _no_progress(fraction: float, message: str = None):
+    """進捗通知なし"""
+
 
 class ProductionService:
-    """生産関連ビジネスロジック"""
+    """生産関連ビジネスロジック
     
-    def __init__(self, db_manager):
+    取得・計算の失敗は PlanningError（対象データなしは NoDataError）として送出し、画面・API・ジョブで表示する。
+    """
+    
+    def __init__(self, db_manager, job_service=None):
+        self._job_service = job_service
+        self.db = db_manager
         self.product_repo = ProductRepository(db_manager)
         self.production_repo = ProductionRepository(db_manager)
+        self.transport_repo = TransportRepository(db_manager)
         self.calculator = ProductionCalculator()
+        self.diff_calculator = PlanDiffCalculator()
+        self.scenario_runner = ScenarioRunner()
+        self.demand_simulator = DemandSimulator()
+        self.inventory_projector = InventoryProjector()
+        self.lot_sizer = LotSizer()
+        self.partitioned_planner = PartitionedPlanner()
+        self.calendar_repo = CalendarRepository()
     
     def get_all_products(self) -> List[Product]:
         """全製品取得 - 安全なモデル変換"""
@@ -29,8 +69,7 @@ class ProductionService:
                     continue
             return products
         except Exception as e:
-            st.error(f"製品データ取得エラー: {e}")
-            return []
+            raise PlanningError(f"製品データ取得エラー: {e}") from e
     
     def get_production_instructions(self, start_date=None, end_date=None) -> List[ProductionInstruction]:
         """生産指示取得 - 安全なモデル変換"""
@@ -46,8 +85,15 @@ class ProductionService:
                     continue
             return instructions
         except Exception as e:
-            st.error(f"生産指示データ取得エラー: {e}")
-            return []
+            raise PlanningError(f"生産指示データ取得エラー: {e}") from e
+    
+    def get_daily_demand_totals(self, start_date=None, end_date=None):
+        """日別需要量（DB集計）"""
+        return self.production_repo.get_daily_demand_totals(start_date, end_date)
+    
+    def get_product_demand_totals(self, start_date=None, end_date=None):
+        """製品別需要量（DB集計）"""
+        return self.production_repo.get_product_demand_totals(start_date, end_date)
     
     def get_product_constraints(self) -> List[ProductConstraint]:
         """製品制約取得 - 安全なモデル変換"""
@@ -63,31 +109,250 @@ class ProductionService:
                     continue
             return constraints
         except Exception as e:
-            st.error(f"制約データ取得エラー: {e}")
-            return []
+            raise PlanningError(f"制約データ取得エラー: {e}") from e
     
-    def calculate_production_plan(self, start_date, end_date) -> List[ProductionPlan]:
-        """生産計画計算"""
+    def calculate_production_plan(self, start_date, end_date, lot_sizing: bool = True,
+                                  max_workers: int = None, progress=None) -> List[ProductionPlan]:
+        """生産計画計算（平均化 → ロットサイジング）
+        
+        max_workers（既定 PLANNING_CONFIG.workers）が2以上なら工場別に分割して並列計算する。
+        progress(割合, メッセージ) を渡すと各段階の開始を通知する（バックグラウンドジョブ用）。
+        期間内に生産指示がなければ空リストを返す。
+        """
+        progress = progress or _no_progress
         try:
-            instructions = self.get_production_instructions(start_date, end_date)
-            constraints = self.get_product_constraints()
+            # 指示と制約を同一スナップショットから読み込む
+            progress(0.1, "生産指示・製品制約取得中")
+            with self.db.unit_of_work(read_only=True):
+                instructions = self.get_production_instructions(start_date, end_date)
+                constraints = self.get_product_constraints()
             
             if not instructions:
-                st.warning("生産指示データがありません")
                 return []
                 
+            progress(0.4, f"計画計算中 ({len(instructions)}件)")
+            plans = self._plan_instructions(instructions, constraints, max_workers)
+            if not lot_sizing:
+                return plans
+            progress(0.8, "ロットサイジング中")
+            return self.apply_lot_sizing(plans)
+        except PlanningError:
+            raise
+        except Exception as e:
+            raise PlanningError(f"生産計画計算エラー: {e}") from e
+    
+    def _plan_instructions(self, instructions: List[ProductionInstruction], constraints: List[ProductConstraint],
+                           max_workers: int = None) -> List[ProductionPlan]:
+        """平均化計算 - ワーカー2以上なら工場（と PLANNING_CONFIG.shard_group_column）別に分割して並列計算"""
+        workers = PLANNING_CONFIG.workers if max_workers is None else max_workers
+        if workers <= 1:
             return self.calculator.calculate_production_plan(instructions, constraints)
+        shard_of = production_shards(self.product_repo.get_product_master(),
+                                     PLANNING_CONFIG.shard_group_column or None)
+        return self.partitioned_planner.plan_production(instructions, constraints, shard_of, workers)
+    
+    def apply_lot_sizing(self, plans: List[ProductionPlan]) -> List[ProductionPlan]:
+        """計画量を入り数の倍数・最小/最大ロットに合わせる
+        
+        ロットは製品×日で集計されるため、同じ日の2行目以降の計画量は 0 になる。
+        リードタイムで前倒しされ指示のない日に生産する分は需要 0 の行として追加する。
+        前倒しが期間開始より前になり初日の最大ロットを超える分は、初日の行の shortage_quantity に載せる。
+        製品ごとに「ロット合計 + shortage_quantity = 平均化後の計画量 + 入り数・最小ロットへの切り上げ分」となる
+        （切り上げ分 = 期末の過剰在庫 − 期末の未充足）。一致しなければ PlanningError。
+        日付はすべての行で datetime.date に揃える（DB によっては文字列で返るため）。
+        """
+        if not plans:
+            return plans
+        plan_df = pd.DataFrame([{
+            'date': plan.date,
+            'product_id': plan.product_id,
+            'planned_quantity': plan.planned_quantity,
+        } for plan in plans])
+        with self.db.unit_of_work(read_only=True):
+            products_df = self.product_repo.get_product_master()
+            lot_constraints_df = self.product_repo.get_lot_constraints()
+        calendar = self.get_calendar(plan_df['date'].min(), plan_df['date'].max(), products_df)
+        result = self.lot_sizer.size(LotSizingInput.from_frames(plan_df, products_df, lot_constraints_df, calendar))
+        lots = {(row.product_id, row.date): row.lot_quantity for row in LotSizer.to_frame(result).itertuples()}
+        first_day = result["dates"][0].date() if len(result["dates"]) else None
+        shortages = {(product_id, first_day): quantity
+                     for product_id, quantity in zip(result["product_ids"].tolist(), result["past_due"].tolist())
+                     if quantity > 0}
+        
+        sized = []
+        templates = {}
+        for plan in plans:
+            day = pd.Timestamp(plan.date).date()
+            quantity = lots.pop((plan.product_id, day), 0.0)
+            sized.append(replace(plan, date=day, smoothed_quantity=plan.planned_quantity, planned_quantity=quantity,
+                                 shortage_quantity=shortages.pop((plan.product_id, day), None) if quantity else None))
+            templates.setdefault(plan.product_id, plan)
+        for (product_id, day), quantity in sorted(lots.items(), key=lambda item: item[0][1]):
+            sized.append(replace(templates[product_id], date=day, demand_quantity=0,
+                                 smoothed_quantity=0.0, planned_quantity=quantity,
+                                 shortage_quantity=shortages.pop((product_id, day), None)))
+        self._check_lot_totals(plans, sized, result)
+        return sized
+    
+    @staticmethod
+    def _check_lot_totals(plans: List[ProductionPlan], sized: List[ProductionPlan], result) -> None:
+        """製品ごとに ロット合計 + 前倒し不足 = 平均化後の計画量 + 期末の過剰在庫 − 期末の未充足 を確認"""
+        if not result["lots"].size:
+            return
+        product_ids = result["product_ids"]
+        
+        def totals(rows: List[ProductionPlan], value) -> np.ndarray:
+            series = pd.Series([value(plan) for plan in rows], index=[plan.product_id for plan in rows], dtype=float)
+            return series.fillna(0).groupby(level=0).sum().reindex(product_ids, fill_value=0.0).to_numpy()
+        
+        smoothed = totals(plans, lambda plan: plan.planned_quantity)
+        sized_total = totals(sized, lambda plan: plan.planned_quantity + (plan.shortage_quantity or 0))
+        expected = smoothed + result["surplus"][:, -1] - result["backlog"][:, -1]
+        mismatch = ~np.isclose(sized_total, expected)
+        if mismatch.any():
+            raise PlanningError(f"ロット合計が平均化後の計画量と一致しません（製品ID: {product_ids[mismatch].tolist()}）")
+    
+    @property
+    def jobs(self):
+        """バックグラウンドジョブサービス"""
+        return self._job_service or get_job_service()
+    
+    def submit_production_plan(self, start_date, end_date, owner=None) -> str:
+        """生産計画計算をバックグラウンドジョブとして投入 - ジョブIDを返す"""
+        return self.jobs.submit("production_plan", self.calculate_production_plan, start_date, end_date, owner=owner)
+    
+    def run_scenarios(self, start_date, end_date, scenarios: List[PlanScenario], max_workers=None):
+        """What-if シナリオ比較 - 先頭にベースラインを付けて KPI 比較表を返す"""
+        try:
+            instructions_df = self.production_repo.get_production_instructions(start_date, end_date)
+            if instructions_df is None or instructions_df.empty:
+                raise NoDataError("生産指示データがありません")
+            
+            data = ScenarioInput.from_frames(
+                instructions_df,
+                self.product_repo.get_product_constraints(),
+                self.get_truck_volume()
+            )
+            return self.scenario_runner.run(data, [PlanScenario(name="ベースライン")] + scenarios, max_workers)
+        except PlanningError:
+            raise
         except Exception as e:
-            st.error(f"生産計画計算エラー: {e}")
-            return []
+            raise PlanningError(f"シナリオ計算エラー: {e}") from e
     
+    def simulate_demand_uncertainty(self, n_scenarios: int = 10000, monthly_cv: float = 0.15,
+                                    daily_cv: float = 0.25, working_days: int = 20,
+                                    seed=None, max_workers=1):
+        """需要変動モンテカルロ - 必要能力・便数のパーセンタイルを返す"""
+        try:
+            forecasts_df = self.production_repo.get_demand_forecasts()
+            if forecasts_df is None or forecasts_df.empty:
+                raise NoDataError("月次予測データがありません")
+            
+            data = SimulationInput.from_frames(
+                forecasts_df,
+                self.product_repo.get_product_constraints(),
+                self.get_truck_volume(),
+                working_days=working_days,
+                monthly_cv=monthly_cv,
+                daily_cv=daily_cv
+            )
+            return self.demand_simulator.simulate(data, n_scenarios, seed=seed, max_workers=max_workers)
+        except PlanningError:
+            raise
+        except Exception as e:
+            raise PlanningError(f"需要シミュレーションエラー: {e}") from e
+    
+    def project_inventory(self, start_date, end_date, initial_cover_days: float = 0.0, initial_on_hand=None):
+        """時系列在庫推移 - 製品×日の在庫・入庫・手配量と欠品サマリーを返す"""
+        try:
+            with self.db.unit_of_work(read_only=True):
+                instructions_df = self.production_repo.get_production_instructions(start_date, end_date)
+                products_df = self.product_repo.get_product_master()
+            if instructions_df is None or instructions_df.empty:
+                raise NoDataError("生産指示データがありません")
+            
+            data = ProjectionInput.from_frames(
+                instructions_df, products_df, start_date, end_date,
+                initial_on_hand=initial_on_hand,
+                initial_cover_days=initial_cover_days,
+                calendar=self.get_calendar(start_date, end_date, products_df)
+            )
+            result = self.inventory_projector.project(data)
+            if not products_df.empty:
+                master = products_df[['id', 'product_code', 'product_name', 'regular_replenishment_category']]
+                result["summary"] = result["summary"].merge(
+                    master.rename(columns={'id': 'product_id'}), on='product_id', how='left'
+                )
+            return result
+        except PlanningError:
+            raise
+        except Exception as e:
+            raise PlanningError(f"在庫推移計算エラー: {e}") from e
+    
+    def get_calendar(self, start_date, end_date, products_df: pd.DataFrame):
+        """期間の稼働日カレンダー - 対象製品の生産工場が1つならその工場、複数・不明なら全工場共通の休日で作成"""
+        factories = set()
+        if products_df is not None and not products_df.empty:
+            factories = {key[0] for key in production_shards(products_df).values()} - {''}
+        factory = factories.pop() if len(factories) == 1 else None
+        return self.calendar_repo.get_calendar(start_date, end_date, factory)
+    
+    def get_truck_volume(self) -> float:
+        """1便あたり積載体積 (m³) - デフォルト便のうち最大の荷台体積"""
+        trucks_df = self.transport_repo.get_trucks()
+        if trucks_df.empty:
+            return 0.0
+        if trucks_df['default_use'].any():
+            trucks_df = trucks_df[trucks_df['default_use'].astype(bool)]
+        volumes = trucks_df['width'] * trucks_df['depth'] * trucks_df['height'] / 1000000000  # mm³ → m³
+        return float(volumes.max())
+    
+    def compare_plans(self, old_df, new_df, plan_type: str = "production") -> dict:
+        """計画スナップショット差分 - plan_type: production / loading"""
+        if plan_type == "loading":
+            return self.diff_calculator.diff_loading_plans(old_df, new_df)
+        return self.diff_calculator.diff_production_plans(old_df, new_df)
+    
+    def get_constraint_grid(self):
+        """制約編集グリッド用データ - 全製品に既存制約（未設定は既定値）を結合"""
+        products_df = self.product_repo.get_all_products()
+        if products_df.empty:
+            return products_df
+        grid = products_df[['id', 'product_code', 'product_name']].rename(columns={'id': 'product_id'})
+        constraints_df = self.product_repo.get_product_constraints()
+        if not constraints_df.empty:
+            grid = grid.merge(
+                constraints_df[['product_id'] + CONSTRAINT_VALUES], on='product_id', how='left'
+            )
+        for column, default in CONSTRAINT_DEFAULTS.items():
+            grid[column] = grid[column].fillna(default) if column in grid else default
+        return grid.astype({'daily_capacity': int, 'is_transport_constrained': bool})
+
+    def save_constraint_changes(self, original_df, edited_df):
+        """編集グリッドの変更行だけを一括保存 - (成功可否, 保存件数)
+        
+        数値のセルを空にした行は InvalidInputError（保存しない）。運送制限の空欄は既定値とする。
+        """
+        edited_df = edited_df.fillna({'is_transport_constrained': CONSTRAINT_DEFAULTS['is_transport_constrained']})
+        numeric = [c for c in CONSTRAINT_VALUES if c != 'is_transport_constrained' and c in edited_df.columns]
+        empty = edited_df[numeric].isna().any(axis=1)
+        if empty.any():
+            label = 'product_code' if 'product_code' in edited_df.columns else 'product_id'
+            codes = edited_df.loc[empty, label]
+            raise InvalidInputError(f"未入力のセルがあります（製品: {', '.join(map(str, codes))}）")
+        changed = self.diff_calculator.diff_constraints(original_df, edited_df)["changed"]
+        if changed.empty:
+            return True, 0
+        rows = edited_df[edited_df['product_id'].isin(changed['product_id'])]
+        ok = self.product_repo.upsert_product_constraints(rows.to_dict('records'))
+        return ok, len(rows) if ok else 0
+
     def save_product_constraints(self, constraints_df) -> bool:
         """製品制約保存"""
         try:
             return self.product_repo.save_product_constraints(constraints_df)
         except Exception as e:
-            st.error(f"制約保存エラー: {e}")
-            return False
+            raise PlanningError(f"制約保存エラー: {e}") from e
     def create_production(self, plan_data: dict) -> bool:
         """生産計画を新規登録"""
         return self.production_repo.create_production(plan_data)
@@ -105,8 +370,16 @@ class ProductionService:
                     continue
             return productions
         except Exception as e:
-            st.error(f"生産計画データ取得エラー: {e}")
-            return []
+            raise PlanningError(f"生産計画データ取得エラー: {e}") from e
+    def count_productions(self, product_id=None, start_date=None, end_date=None) -> int:
+        """登録済み生産計画の件数"""
+        return self.production_repo.count_productions(product_id, start_date, end_date)
+
+    def get_productions_page(self, offset: int = 0, limit: int = 20, product_id=None,
+                             start_date=None, end_date=None):
+        """登録済み生産計画のページ取得"""
+        return self.production_repo.get_productions_page(offset, limit, product_id, start_date, end_date)
+
     def update_production(self, plan_id: int, update_data: dict) -> bool:
         """生産計画を更新"""
         return self.production_repo.update_production(plan_id, update_data) or False
@@ -0,0 +1,50 @@
+# app/services/service_container.py
+import threading
+from typing import Optional
+
+from repository.database_manager import DatabaseManager
+from services.instrumentation import instrument_engine, instrument_service, get_metrics
+from services.job_service import get_job_service
+from services.product_service import ProductService
+from services.production_service import ProductionService
+from services.transport_service import TransportService
+
+
+class ServiceContainer:
+    """サービスコンテナ - DB接続とサービス群をプロセス内で1組だけ保持"""
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        self.db = db_manager or DatabaseManager()
+        instrument_engine(self.db.engine)
+        # ジョブサービスは各サービスが初回利用時に取得する（CLI ワーカー等では生成しない）
+        self.production_service = instrument_service(ProductionService(self.db), "production")
+        self.transport_service = instrument_service(TransportService(self.db), "transport")
+        self.product_service = instrument_service(ProductService(self.db), "product")
+
+    @property
+    def jobs(self):
+        """バックグラウンドジョブサービス"""
+        return get_job_service()
+
+    @property
+    def metrics(self):
+        """計測レジストリ"""
+        return get_metrics()
+
+    def close(self):
+        """リソース解放（プロセス終了時のみ）"""
+        self.db.close()
+
+
+# プロセス共有のコンテナ（Streamlit の再実行・セッションをまたいで再利用）
+_container: Optional[ServiceContainer] = None
+_container_lock = threading.Lock()
+
+
+def get_service_container() -> ServiceContainer:
+    """プロセス共有のサービスコンテナを取得"""
+    global _container
+    with _container_lock:
+        if _container is None:
+            _container = ServiceContainer()
+        return _container
@@ -1,17 +1,60 @@
 # app/services/transport_service.py
+import math
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any
+import numpy as np
+import pandas as pd
+from repository.product_repository import ProductRepository
 from repository.transport_repository import TransportRepository
+from repository.route_matrix_repository import RouteMatrixRepository
+from repository.calendar_repository import CalendarRepository
 from domain.calculators.transport_planner import TransportPlanner
+from domain.calculators.container_demand import ContainerDemandInput, ContainerDemandCalculator
+from domain.calculators.route_planner import RoutePlanner
+from domain.calculators.dock_scheduler import DockScheduler, jobs_from_plans, time_to_minutes
+from domain.calculators.jit_sequencer import SequencingInput, JITSequencer
+from domain.calculators.partitioned_planner import PartitionedPlanner
 from domain.validators.loading_validator import LoadingValidator
-from domain.models.transport import Container, Truck, LoadingItem
+from domain.models.transport import Container, Truck, LoadingItem, TransportPlan
+from services.job_service import get_job_service
+from config import ROUTING_CONFIG, DOCK_CONFIG, SEQUENCING_CONFIG, PLANNING_CONFIG
+
+# 計画スナップショット別の容器需要（プロセス内 LRU）
+_CONTAINER_DEMAND_CACHE_SIZE = 16
+_container_demand_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_container_demand_lock = threading.Lock()
+
+
+def _snapshot_key(df: pd.DataFrame) -> str:
+    """DataFrame の内容ハッシュ（列構成を含む）"""
+    if df is None or df.empty:
+        return "empty"
+    digest = int(pd.util.hash_pandas_object(df, index=False).sum()) & (2 ** 64 - 1)
+    return ",".join(map(str, df.columns)) + ":" + format(digest, 'x')
 
 class TransportService:
     """運送関連ビジネスロジック"""
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, job_service=None):
+        self._job_service = job_service
+        self.db = db_manager
         self.repository = TransportRepository(db_manager)
+        self.product_repo = ProductRepository(db_manager)
         self.planner = TransportPlanner()
         self.validator = LoadingValidator()
+        self.container_demand_calculator = ContainerDemandCalculator()
+        self.route_matrix_repo = RouteMatrixRepository()
+        self.route_planner = RoutePlanner(self.planner)
+        self.calendar_repo = CalendarRepository()
+        self.dock_scheduler = DockScheduler(
+            setup_minutes=DOCK_CONFIG.setup_minutes,
+            minutes_per_container=DOCK_CONFIG.minutes_per_container,
+            max_early_minutes=DOCK_CONFIG.max_early_minutes,
+            day_start=time_to_minutes(DOCK_CONFIG.day_start),
+        )
+        self.jit_sequencer = JITSequencer()
+        self.partitioned_planner = PartitionedPlanner()
     
     def get_containers(self) -> List[Container]:
         """容器一覧取得"""
@@ -22,6 +65,26 @@ class TransportService:
         """トラック一覧取得"""
         return self.repository.get_trucks()
 
+    def count_containers(self, name_filter=None) -> int:
+        """容器件数"""
+        return self.repository.count_containers(name_filter)
+    
+    def get_containers_page(self, offset: int = 0, limit: int = 20, name_filter=None) -> List[Container]:
+        """容器一覧ページ取得"""
+        return self.repository.get_containers_page(offset, limit, name_filter)
+    
+    def get_container_stats(self) -> Dict[str, float]:
+        """容器統計"""
+        return self.repository.get_container_stats()
+    
+    def count_trucks(self, name_filter=None) -> int:
+        """トラック件数"""
+        return self.repository.count_trucks(name_filter)
+    
+    def get_trucks_page(self, offset: int = 0, limit: int = 20, name_filter=None) -> pd.DataFrame:
+        """トラック一覧ページ取得"""
+        return self.repository.get_trucks_page(offset, limit, name_filter)
+
     def delete_truck(self, truck_id: int) -> bool:
         """トラック削除"""
         return self.repository.delete_truck(truck_id) 
@@ -47,24 +110,276 @@ class TransportService:
         return self.repository.save_truck(truck_data)
     
     def calculate_delivery_plan(self, delivery_items: List[dict]) -> Dict[str, Any]:
-        """配送計画計算"""
-        containers = self.get_containers()
-        trucks = self.get_trucks()
+        """配送計画計算（段積みスタック単位）"""
+        # 容器・トラック・製品マスタを1セッション・1トランザクションで読み込む
+        with self.db.unit_of_work(read_only=True):
+            containers = self.get_containers()
+            trucks = self.repository.get_truck_models()
+            products_df = self.product_repo.get_product_master()
         
         # モデル変換
         items = [LoadingItem(**item) for item in delivery_items]
+        stackable = self._stackable_map(products_df)
+        
+        # 計画計算・積込ドック割り当て
+        result = self.planner.calculate_stacked_loading_plan(items, containers, trucks, stackable)
+        result["dock_schedule"] = self.schedule_docks(result["plans"])
+        return result
+    
+    @staticmethod
+    def _stackable_map(products_df: pd.DataFrame) -> Dict[int, bool]:
+        """製品ID → 段積み可否（未設定は段積み可）"""
+        if products_df.empty or 'stackable' not in products_df.columns:
+            return {}
+        known = products_df[products_df['stackable'].notna()]
+        return dict(zip(known['id'].astype(int), known['stackable'].astype(bool)))
+    
+    def plan_delivery_routes(self, delivery_items: List[dict], time_budget_s: float = None,
+                             ship_date=None) -> Dict[str, Any]:
+        """納入先別の複数立ち寄りルートと積載計画を全車両分計算
+        
+        納入先は製品マスタの delivery_location、距離・所要時間は ROUTING_CONFIG.matrix_path の CSV を使う。
+        ship_date を指定すると、トラックの到着日オフセットを稼働日として数える（金曜発の翌日着は月曜着）。
+        """
+        matrix = self.route_matrix_repo.get_matrix()
+        if matrix is None:
+            return {"routes": [], "error": f"距離表を読み込めません: {self.route_matrix_repo.path}"}
+        
+        with self.db.unit_of_work(read_only=True):
+            containers = self.get_containers()
+            trucks = self.repository.get_truck_models()
+            products_df = self.product_repo.get_product_master()
+        
+        items = [LoadingItem(**item) for item in delivery_items]
+        known = products_df[products_df['delivery_location'].notna()] if not products_df.empty else products_df
+        item_locations = (dict(zip(known['id'].astype(int), known['delivery_location'].astype(str)))
+                          if not known.empty else {})
+        result = self.route_planner.plan_routes(
+            items, item_locations, containers, trucks,
+            matrix.index, matrix.distance, matrix.minutes,
+            depot=ROUTING_CONFIG.depot,
+            service_minutes=ROUTING_CONFIG.service_minutes,
+            stackable=self._stackable_map(products_df),
+            time_budget_s=ROUTING_CONFIG.time_budget_s if time_budget_s is None else time_budget_s,
+            arrival_days=self.arrival_days(trucks, ship_date) if ship_date is not None else None
+        )
+        if ROUTING_CONFIG.depot not in matrix.index:
+            result["error"] = f"距離表に出発拠点 {ROUTING_CONFIG.depot} がありません"
+        result["dock_schedule"] = self.schedule_docks([route.plan for route in result["routes"]])
+        return result
+    
+    def arrival_days(self, trucks: List[Truck], ship_date) -> Dict[int, float]:
+        """トラックID → 出発日から到着日までの暦日数（arrival_day_offset を稼働日で数える）"""
+        if not trucks:
+            return {}
+        calendar = self.calendar_repo.get_calendar(ship_date, ship_date)
+        offsets = np.array([t.arrival_day_offset or 0 for t in trucks])
+        days = calendar.calendar_days(np.repeat(np.datetime64(pd.Timestamp(ship_date).date(), 'D'), len(trucks)),
+                                      offsets)
+        return {t.id: float(d) for t, d in zip(trucks, days) if np.isfinite(d)}
+    
+    def schedule_docks(self, plans: List[TransportPlan], dock_count: int = None) -> Dict[str, Any]:
+        """積載計画の各便に積込ドックと積込時間帯を割り当て（ドック数は DOCK_CONFIG.dock_count）"""
+        count = DOCK_CONFIG.dock_count if dock_count is None else dock_count
+        docks = [f"ドック{i}" for i in range(1, count + 1)]
+        return self.dock_scheduler.schedule(jobs_from_plans(plans), docks)
+    
+    def sequence_production(self, plan_df: pd.DataFrame, plan_date) -> Dict[str, Any]:
+        """生産計画スナップショットの指定日分を、積込便の時刻から逆算した生産順序に並べる
         
-        # 計画計算
-        return self.planner.calculate_loading_plan(items, containers, trucks)
+        積載計画・ドック割り当てを作成し、製品×便の箱数を便の積込開始時刻までに作る。
+        始業前に積み込む便の分は前稼働日のシフトで作る。前稼働日の当日出荷分と翌稼働日の始業前分も
+        同じシフトで作るため、その時間を先に押さえてから並べる（結果は指定日の出荷分のみ）。
+        """
+        plan_result = self.calculate_delivery_plan(self.loading_items_for_date(plan_df, plan_date))
+        with self.db.unit_of_work(read_only=True):
+            products_df = self.product_repo.get_product_master()
+            capacities_df = self.product_repo.get_daily_capacities()
+        
+        demand_df = self._sequencing_demand(plan_result)
+        if demand_df.empty or products_df.empty:
+            return {"sequence": pd.DataFrame(), "summary": pd.DataFrame(), "plan_result": plan_result}
+        
+        shift_start = time_to_minutes(SEQUENCING_CONFIG.shift_start)
+        previous_day = self.adjacent_working_day(plan_date, -1)
+        next_day = self.adjacent_working_day(plan_date, 1)
+        previous_offset = (pd.Timestamp(plan_date) - pd.Timestamp(previous_day)).days * 1440.0
+        next_offset = (pd.Timestamp(next_day) - pd.Timestamp(plan_date)).days * 1440.0
+        
+        before_shift = demand_df["due_minute"] <= shift_start
+        demand_df = demand_df.assign(production_day=np.where(before_shift, -1, 0), booked=False)
+        # 前稼働日の当日出荷分（前稼働日のシフト）と翌稼働日の始業前分（当日のシフト）。期限は指定日 0:00 からの分
+        previous_df = self._sequencing_demand(
+            self.calculate_delivery_plan(self.loading_items_for_date(plan_df, previous_day)))
+        previous_df = previous_df[previous_df["due_minute"] > shift_start].assign(
+            due_minute=lambda d: d["due_minute"] - previous_offset, production_day=-1, booked=True)
+        next_df = self._sequencing_demand(
+            self.calculate_delivery_plan(self.loading_items_for_date(plan_df, next_day)))
+        next_df = next_df[next_df["due_minute"] <= shift_start].assign(
+            due_minute=lambda d: d["due_minute"] + next_offset, production_day=0, booked=True)
+        demand_df = pd.concat([df for df in (demand_df, previous_df, next_df) if not df.empty], ignore_index=True)
+        
+        data = SequencingInput.from_frames(
+            demand_df, products_df, capacities_df,
+            shift_minutes=SEQUENCING_CONFIG.shift_minutes,
+            default_daily_capacity=SEQUENCING_CONFIG.default_daily_capacity
+        )
+        result = self.jit_sequencer.sequence(
+            data, shift_start, shift_start + SEQUENCING_CONFIG.shift_minutes, previous_shift_offset=previous_offset
+        )
+        sequence = result["sequence"]
+        if not sequence.empty:
+            sequence.insert(2, "production_date", np.where(sequence["production_day"] < 0, previous_day,
+                                                           pd.Timestamp(plan_date).date()))
+        result["plan_result"] = plan_result
+        return result
+    
+    def adjacent_working_day(self, ship_date, step: int):
+        """出荷日の前後の稼働日（step = -1 で前稼働日、1 で翌稼働日、カレンダー範囲外は暦日で前後）"""
+        ship_day = np.datetime64(pd.Timestamp(ship_date).date(), 'D')
+        roll = 'forward' if step < 0 else 'backward'
+        day = self.calendar_repo.get_calendar(ship_date, ship_date).shift(ship_day, step, roll=roll).reshape(-1)[0]
+        if np.isnat(day):
+            return (pd.Timestamp(ship_date) + pd.Timedelta(days=step)).date()
+        return pd.Timestamp(day).date()
+    
+    @staticmethod
+    def _sequencing_demand(plan_result: Dict[str, Any]) -> pd.DataFrame:
+        """製品×便の箱数と期限（積込開始、なければ出発時刻、積み残しは終業時刻）"""
+        loading_start = {a.truck_id: a.start_minute
+                         for a in plan_result.get("dock_schedule", {}).get("assignments", [])}
+        shift_end = time_to_minutes(SEQUENCING_CONFIG.shift_start) + SEQUENCING_CONFIG.shift_minutes
+        rows = []
+        for plan in plan_result.get("plans", []):
+            due = loading_start.get(plan.truck.id, time_to_minutes(plan.truck.departure_time))
+            for item in plan.loaded_items:
+                rows.append((item.product_id, plan.truck.name, item.quantity, shift_end if due is None else due))
+        for item in plan_result.get("remaining_items", []):
+            rows.append((item.product_id, "積み残し", item.quantity, shift_end))
+        demand_df = pd.DataFrame(rows, columns=["product_id", "truck_name", "containers", "due_minute"])
+        return demand_df.groupby(["product_id", "truck_name", "due_minute"], as_index=False)["containers"].sum()
+    
+    @property
+    def jobs(self):
+        """バックグラウンドジョブサービス"""
+        return self._job_service or get_job_service()
+    
+    def submit_delivery_plan(self, delivery_items: List[dict], owner=None) -> str:
+        """配送計画計算をバックグラウンドジョブとして投入 - ジョブIDを返す"""
+        return self.jobs.submit("delivery_plan", self.calculate_delivery_plan, delivery_items, owner=owner)
     
     def validate_loading(self, items: List[dict], truck_id: int) -> tuple:
         """積載バリデーション"""
-        containers = self.get_containers()
-        trucks = self.get_trucks()
+        with self.db.unit_of_work(read_only=True):
+            containers = self.get_containers()
+            truck = self.repository.get_truck_by_id(truck_id)
         
-        truck = next((t for t in trucks if t.id == truck_id), None)
         if not truck:
             return False, ["トラックが見つかりません"]
         
         loading_items = [LoadingItem(**item) for item in items]
-        return self.validator.validate_loading(loading_items, containers, truck)
\ No newline at end of file
+        return self.validator.validate_loading(loading_items, containers, truck)
+    
+    def build_loading_items(self, plan_df: pd.DataFrame, products_df: pd.DataFrame,
+                            containers: List[Container]) -> List[dict]:
+        """生産計画（1日分）から積載アイテムを作成 - 数量は容器数（入り数で切り上げ）"""
+        if plan_df.empty or products_df.empty:
+            return []
+        container_weights = {c.id: float(c.max_weight or 0) for c in containers}
+        merged = plan_df.merge(
+            products_df[['id', 'capacity', 'used_container_id']],
+            left_on='product_id', right_on='id', how='inner'
+        )
+        merged = merged[merged['used_container_id'].notna() & (merged['planned_quantity'] > 0)]
+        items = []
+        for row in merged.itertuples(index=False):
+            capacity = int(row.capacity) if row.capacity and row.capacity > 0 else 1
+            container_id = int(row.used_container_id)
+            items.append({
+                'product_id': int(row.product_id),
+                'container_id': container_id,
+                'quantity': math.ceil(row.planned_quantity / capacity),
+                'weight_per_unit': container_weights.get(container_id, 0.0),
+            })
+        return items
+    
+    def calculate_loading_plans(self, plan_df: pd.DataFrame, max_workers: int = None) -> pd.DataFrame:
+        """生産計画（複数日）の出荷日ごとの積載計画を行形式で返す
+        
+        max_workers（既定 PLANNING_CONFIG.workers）が2以上なら出荷日ごとにワーカープロセスで並列計算する。
+        """
+        if plan_df is None or plan_df.empty:
+            return pd.DataFrame()
+        with self.db.unit_of_work(read_only=True):
+            containers = self.get_containers()
+            trucks = self.repository.get_truck_models()
+            products_df = self.product_repo.get_product_master()
+        
+        # DB・スナップショットにより日付が文字列・date・Timestamp で混在するため date に揃えて日ごとに分ける
+        plan_dates = pd.to_datetime(plan_df['date']).dt.date
+        day_items = {
+            plan_date: [LoadingItem(**item) for item in self.build_loading_items(day_df, products_df, containers)]
+            for plan_date, day_df in plan_df.groupby(plan_dates, sort=True)
+        }
+        results = self.partitioned_planner.plan_loading(
+            day_items, containers, trucks, self._stackable_map(products_df),
+            PLANNING_CONFIG.workers if max_workers is None else max_workers
+        )
+        frames = [self.loading_plan_to_dataframe(result, plan_date) for plan_date, result in results.items()]
+        frames = [frame for frame in frames if not frame.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
+    def get_container_demand(self, plan_df: pd.DataFrame, shipping_df: pd.DataFrame = None,
+                             return_days: int = 3) -> Dict[str, Any]:
+        """生産計画（と積載計画）から容器種別×日の必要箱数・流通箱数を計算
+        
+        同じ計画スナップショット・製品マスタ・返却日数の結果はキャッシュから返す。
+        """
+        products_df = self.product_repo.get_product_master()
+        key = (_snapshot_key(plan_df), _snapshot_key(shipping_df), _snapshot_key(products_df), int(return_days))
+        with _container_demand_lock:
+            if key in _container_demand_cache:
+                _container_demand_cache.move_to_end(key)
+                return _container_demand_cache[key]
+        
+        if plan_df is None or plan_df.empty or products_df.empty:
+            return {"daily": pd.DataFrame(), "summary": pd.DataFrame(), "return_days": return_days}
+        data = ContainerDemandInput.from_frames(plan_df, products_df, shipping_df, return_days)
+        result = self.container_demand_calculator.calculate(data)
+        names = {c.id: c.name for c in self.get_containers()}
+        for frame in (result["daily"], result["summary"]):
+            frame.insert(1, "container_name", frame["container_id"].map(names))
+        
+        with _container_demand_lock:
+            _container_demand_cache[key] = result
+            while len(_container_demand_cache) > _CONTAINER_DEMAND_CACHE_SIZE:
+                _container_demand_cache.popitem(last=False)
+        return result
+    
+    def loading_items_for_date(self, plan_df: pd.DataFrame, plan_date) -> List[dict]:
+        """生産計画スナップショットの指定日分を積載アイテムに変換"""
+        if plan_df is None or plan_df.empty:
+            return []
+        day_df = plan_df[pd.to_datetime(plan_df['date']).dt.date == pd.Timestamp(plan_date).date()]
+        with self.db.unit_of_work(read_only=True):
+            products_df = self.product_repo.get_product_master()
+            containers = self.get_containers()
+        return self.build_loading_items(day_df, products_df, containers)
+    
+    @staticmethod
+    def loading_plan_to_dataframe(plan_result: Dict[str, Any], plan_date=None) -> pd.DataFrame:
+        """積載計画結果を行形式の DataFrame に変換（トラック×日付×製品）"""
+        rows = []
+        for plan in plan_result.get('plans', []):
+            for item in plan.loaded_items:
+                rows.append({
+                    'truck_id': plan.truck.id,
+                    'truck_name': plan.truck.name,
+                    'date': plan_date,
+                    'product_id': item.product_id,
+                    'container_id': item.container_id,
+                    'quantity': item.quantity,
+                    'volume_utilization': plan.volume_utilization,
+                    'weight_utilization': plan.weight_utilization,
+                })
+        return pd.DataFrame(rows)
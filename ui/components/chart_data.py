@@ -0,0 +1,72 @@
+# app/ui/components/chart_data.py
+import threading
+from collections import OrderedDict
+from typing import Sequence, Callable, Any
+
+import pandas as pd
+
+# 期間に応じた集計粒度（日数の上限, pandas 期間コード, 表示名）
+BUCKET_RULES = [
+    (92, 'D', '日次'),
+    (730, 'W', '週次'),
+    (None, 'M', '月次'),
+]
+
+# 1トレースあたりこの点数を超えたら WebGL (Scattergl) で描画
+WEBGL_POINT_THRESHOLD = 1000
+
+_FIGURE_CACHE_SIZE = 32
+_figure_cache: "OrderedDict[str, Any]" = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def choose_bucket(dates: pd.Series):
+    """日付範囲から集計粒度を決定 - (pandas 期間コード, 表示名)"""
+    dates = pd.to_datetime(dates)
+    span_days = (dates.max() - dates.min()).days if len(dates) else 0
+    for max_days, freq, label in BUCKET_RULES:
+        if max_days is None or span_days <= max_days:
+            return freq, label
+
+
+def bucket_totals(df: pd.DataFrame, date_column: str, value_columns: Sequence[str], freq: str) -> pd.DataFrame:
+    """日付列で粒度ごとに合計（日次ロールアップ・明細のどちらも可）"""
+    # 各区間の開始日（週次は月曜、月次は月初）を代表日とする
+    buckets = pd.to_datetime(df[date_column]).dt.to_period(freq).dt.start_time
+    grouped = df.groupby(buckets.rename(date_column))[list(value_columns)].sum()
+    return grouped.reset_index()
+
+
+def scatter_class(point_count: int):
+    """点数に応じて Scatter / Scattergl を選択"""
+    import plotly.graph_objects as go
+
+    return go.Scattergl if point_count > WEBGL_POINT_THRESHOLD else go.Scatter
+
+
+def frame_key(name: str, *frames: pd.DataFrame, extra: Any = None) -> str:
+    """入力 DataFrame の内容ハッシュによるキャッシュキー"""
+    parts = [name, repr(extra)]
+    for df in frames:
+        if df is None or df.empty:
+            parts.append("empty")
+            continue
+        parts.append(",".join(map(str, df.columns)))
+        parts.append(format(int(pd.util.hash_pandas_object(df, index=False).sum()) & (2 ** 64 - 1), 'x'))
+    return "|".join(parts)
+
+
+def cached_figure(key: str, build: Callable[[], Any]):
+    """入力ハッシュをキーに作成済みの図を再利用（プロセス内 LRU）"""
+    with _figure_cache_lock:
+        if key in _figure_cache:
+            _figure_cache.move_to_end(key)
+            return _figure_cache[key]
+
+    fig = build()
+
+    with _figure_cache_lock:
+        _figure_cache[key] = fig
+        while len(_figure_cache) > _FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    return fig
@@ -1,63 +1,93 @@
 # app/ui/components/charts.py
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 import pandas as pd
 
+from ui.components.chart_data import choose_bucket, bucket_totals, scatter_class, frame_key, cached_figure
+
+# plotly は import コストが大きいため、チャート作成時に遅延読み込みする
+
 class ChartComponents:
-    """チャートコンポーネント"""
+    """チャートコンポーネント
+    
+    長期間は週次・月次に集計し、点数が多いトレースは WebGL で描画する。
+    作成した図は入力データのハッシュでキャッシュする。
+    """
     
     @staticmethod
     def create_demand_trend_chart(instructions_df: pd.DataFrame):
-        """需要トレンドチャート作成"""
-        if instructions_df.empty:
+        """需要トレンドチャート作成（日次ロールアップ・明細のどちらも可）"""
+        if instructions_df is None or instructions_df.empty:
             return None
-            
-        trend_data = instructions_df.groupby('instruction_date')['instruction_quantity'].sum().reset_index()
-        fig = px.line(trend_data, x='instruction_date', y='instruction_quantity', 
-                     title='日次需要量トレンド', labels={'instruction_quantity': '需要量', 'instruction_date': '日付'})
+        
+        key = frame_key("demand_trend", instructions_df[['instruction_date', 'instruction_quantity']])
+        return cached_figure(key, lambda: ChartComponents._build_demand_trend_chart(instructions_df))
+    
+    @staticmethod
+    def _build_demand_trend_chart(instructions_df: pd.DataFrame):
+        import plotly.graph_objects as go
+        
+        freq, label = choose_bucket(instructions_df['instruction_date'])
+        trend_data = bucket_totals(instructions_df, 'instruction_date', ['instruction_quantity'], freq)
+        trace_class = scatter_class(len(trend_data))
+        
+        fig = go.Figure(trace_class(
+            x=trend_data['instruction_date'], y=trend_data['instruction_quantity'],
+            name='需要量', mode='lines'
+        ))
+        fig.update_layout(title=f'{label}需要量トレンド', xaxis_title='日付', yaxis_title='需要量')
         return fig
     
     @staticmethod
     def create_production_plan_chart(plan_df: pd.DataFrame):
         """生産計画チャート作成"""
-        if plan_df.empty:
+        if plan_df is None or plan_df.empty:
             return None
         
-        daily_summary = plan_df.groupby('date').agg({
-            'demand_quantity': 'sum',
-            'planned_quantity': 'sum'
-        }).reset_index()
+        columns = ['date', 'demand_quantity', 'planned_quantity', 'is_constrained']
+        key = frame_key("production_plan", plan_df[columns])
+        return cached_figure(key, lambda: ChartComponents._build_production_plan_chart(plan_df[columns]))
+    
+    @staticmethod
+    def _build_production_plan_chart(plan_df: pd.DataFrame):
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
+        freq, label = choose_bucket(plan_df['date'])
+        plan_df = plan_df.assign(
+            constrained_quantity=plan_df['planned_quantity'].where(plan_df['is_constrained'] == True, 0)
+        )
+        summary = bucket_totals(
+            plan_df, 'date', ['demand_quantity', 'planned_quantity', 'constrained_quantity'], freq
+        )
+        trace_class = scatter_class(len(summary))
+        mode = 'lines' if trace_class is go.Scattergl else 'lines+markers'
         
         fig = make_subplots(
             rows=2, cols=1,
-            subplot_titles=('需要量 vs 計画生産量', '制約対象製品の生産状況'),
+            subplot_titles=(f'需要量 vs 計画生産量（{label}）', '制約対象製品の生産状況'),
             vertical_spacing=0.1
         )
         
         # 需要量と計画生産量
         fig.add_trace(
-            go.Scatter(
-                x=daily_summary['date'], y=daily_summary['demand_quantity'],
-                name='需要量', line=dict(color='red'), mode='lines+markers'
+            trace_class(
+                x=summary['date'], y=summary['demand_quantity'],
+                name='需要量', line=dict(color='red'), mode=mode
             ),
             row=1, col=1
         )
         fig.add_trace(
-            go.Scatter(
-                x=daily_summary['date'], y=daily_summary['planned_quantity'],
-                name='計画生産量', line=dict(color='blue'), mode='lines+markers'
+            trace_class(
+                x=summary['date'], y=summary['planned_quantity'],
+                name='計画生産量', line=dict(color='blue'), mode=mode
             ),
             row=1, col=1
         )
         
         # 制約対象製品の生産状況
-        constrained_plan = plan_df[plan_df['is_constrained'] == True]
-        if not constrained_plan.empty:
-            constrained_daily = constrained_plan.groupby('date')['planned_quantity'].sum().reset_index()
+        if summary['constrained_quantity'].any():
             fig.add_trace(
                 go.Bar(
-                    x=constrained_daily['date'], y=constrained_daily['planned_quantity'],
+                    x=summary['date'], y=summary['constrained_quantity'],
                     name='制約製品生産量', marker_color='orange'
                 ),
                 row=2, col=1
@@ -68,4 +98,4 @@ class ChartComponents:
         fig.update_yaxes(title_text="数量", row=1, col=1)
         fig.update_yaxes(title_text="数量", row=2, col=1)
         
-        return fig
\ No newline at end of file
+        return fig
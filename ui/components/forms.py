@@ -6,58 +6,6 @@ import streamlit as st
 class FormComponents:
     """フォームコンポーネント"""
     
-    @staticmethod
-    def product_constraints_form(products, existing_constraints=None):
-        """製品制約フォーム"""
-        constraints_data = []
-        
-        for product in products:
-            st.write(f"**{product.product_name}** ({product.product_code})")
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                daily_capacity = st.number_input(
-                    "日次生産能力",
-                    min_value=0,
-                    value=existing_constraints.get(product.id, {}).get('daily_capacity', 1000),
-                    key=f"capacity_{product.id}"
-                )
-            
-            with col2:
-                smoothing_level = st.number_input(
-                    "平均化レベル",
-                    min_value=0.0,
-                    max_value=1.0,
-                    value=existing_constraints.get(product.id, {}).get('smoothing_level', 0.7),
-                    key=f"smoothing_{product.id}"
-                )
-            
-            with col3:
-                volume_per_unit = st.number_input(
-                    "単位体積(m³)",
-                    min_value=0.0,
-                    value=existing_constraints.get(product.id, {}).get('volume_per_unit', 1.0),
-                    key=f"volume_{product.id}"
-                )
-            
-            is_transport_constrained = st.checkbox(
-                "運送制限対象",
-                value=existing_constraints.get(product.id, {}).get('is_transport_constrained', False),
-                key=f"transport_{product.id}"
-            )
-            
-            constraints_data.append({
-                'product_id': product.id,
-                'daily_capacity': daily_capacity,
-                'smoothing_level': smoothing_level,
-                'volume_per_unit': volume_per_unit,
-                'is_transport_constrained': is_transport_constrained
-            })
-            
-            st.divider()
-        
-        return constraints_data
     # app/ui/components/forms.py の一部修正
 
     @staticmethod
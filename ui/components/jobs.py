@@ -0,0 +1,75 @@
+# app/ui/components/jobs.py
+import streamlit as st
+
+STATUS_LABELS = {
+    "pending": "⏳ 待機中",
+    "running": "⚙️ 実行中",
+    "done": "✅ 完了",
+    "failed": "❌ 失敗",
+}
+
+
+class JobComponents:
+    """バックグラウンドジョブ表示コンポーネント"""
+
+    @staticmethod
+    def show_job_status(job_service, param_key: str):
+        """URLパラメータに保持したジョブの状態表示 - 完了時は結果を返す
+
+        ジョブIDは st.query_params に保持するため、ブラウザ更新後も追跡できる。
+        """
+        job_id = st.query_params.get(param_key)
+        if not job_id:
+            return None
+
+        job = job_service.get_job(job_id)
+        if not job:
+            st.warning("ジョブが見つかりません")
+            del st.query_params[param_key]
+            return None
+
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            label = STATUS_LABELS.get(job["status"], job["status"])
+            st.progress(float(job["progress"] or 0), text=f"{label} {job['message'] or ''}")
+        with col2:
+            if st.button("🔄 状態更新", key=f"{param_key}_refresh"):
+                st.rerun()
+        with col3:
+            if st.button("✖ 閉じる", key=f"{param_key}_clear"):
+                del st.query_params[param_key]
+                st.rerun()
+
+        if job["status"] == "failed":
+            st.error(f"ジョブ失敗: {(job['error'] or '').splitlines()[0] if job['error'] else ''}")
+            return None
+        if job["status"] != "done":
+            st.caption(f"ジョブID: {job_id}（受付: {job['created_at']}）")
+            return None
+        return job_service.get_result(job_id)
+
+    @staticmethod
+    def start_job(param_key: str, job_id: str):
+        """投入したジョブを追跡対象に設定"""
+        st.query_params[param_key] = job_id
+
+    @staticmethod
+    def show_job_list(job_service, limit: int = 10):
+        """最近のジョブ一覧表示"""
+        jobs_df = job_service.list_jobs(limit=limit)
+        if jobs_df.empty:
+            st.info("ジョブ履歴はありません")
+            return
+        jobs_df["status"] = jobs_df["status"].map(lambda s: STATUS_LABELS.get(s, s))
+        st.dataframe(
+            jobs_df[["kind", "status", "progress", "message", "created_at", "finished_at"]],
+            column_config={
+                "kind": "種別",
+                "status": "状態",
+                "progress": st.column_config.ProgressColumn("進捗", min_value=0.0, max_value=1.0),
+                "message": "メッセージ",
+                "created_at": "受付日時",
+                "finished_at": "終了日時",
+            },
+            use_container_width=True,
+        )
@@ -0,0 +1,124 @@
+# app/ui/components/profiler.py
+import cProfile
+import json
+import os
+import pstats
+import time
+from datetime import date, datetime, time as dt_time
+from typing import Callable, Dict, Any
+
+import pandas as pd
+import streamlit as st
+
+from config import PROFILING_CONFIG
+
+# セッション状態のうち、プロファイルと一緒に保存する値の型
+_PARAM_TYPES = (str, int, float, bool, type(None), date, datetime, dt_time)
+
+
+class PageProfiler:
+    """ページ表示のプロファイル計測 - 結果をファイル保存し、ホットスポットを表示"""
+
+    def __init__(self, output_dir: str = PROFILING_CONFIG.output_dir, top_n: int = PROFILING_CONFIG.top_n):
+        self.output_dir = output_dir
+        self.top_n = top_n
+
+    def run(self, page_name: str, show: Callable[[], None], engine: str = "cprofile"):
+        """show() をプロファイラ下で実行（engine: cprofile / pyinstrument）"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.join(self.output_dir, f"{datetime.now():%Y%m%d_%H%M%S}_{page_name}")
+
+        if engine == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                st.sidebar.warning("pyinstrument が未インストールのため cProfile で計測します")
+            else:
+                return self._run_pyinstrument(Profiler, page_name, show, stem)
+        return self._run_cprofile(page_name, show, stem)
+
+    def _run_cprofile(self, page_name: str, show: Callable[[], None], stem: str):
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        # st.rerun() 等の制御例外（BaseException）は保存せずにそのまま通す
+        error = None
+        try:
+            profiler.runcall(show)
+        except Exception as e:
+            error = e
+        elapsed = time.perf_counter() - started
+        profile_path = f"{stem}.prof"
+        profiler.dump_stats(profile_path)
+        self._save_params(stem, page_name, "cprofile", elapsed)
+        self._show_hotspots(self._hotspots(pstats.Stats(profiler)), elapsed, profile_path)
+        if error:
+            raise error
+
+    def _run_pyinstrument(self, profiler_class, page_name: str, show: Callable[[], None], stem: str):
+        profiler = profiler_class()
+        started = time.perf_counter()
+        error = None
+        profiler.start()
+        try:
+            show()
+        except Exception as e:
+            error = e
+        finally:
+            profiler.stop()
+        elapsed = time.perf_counter() - started
+        profile_path = f"{stem}.html"
+        with open(profile_path, "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
+        self._save_params(stem, page_name, "pyinstrument", elapsed)
+        with st.expander(f"🔬 プロファイル結果 ({elapsed:.2f}秒)", expanded=True):
+            st.text(profiler.output_text(unicode=True, show_all=False))
+            self._download_button(profile_path, "text/html")
+        if error:
+            raise error
+
+    def _save_params(self, stem: str, page_name: str, engine: str, elapsed: float):
+        """再現用にページ・URLパラメータ・セッション状態を保存"""
+        params: Dict[str, Any] = {
+            "page": page_name,
+            "engine": engine,
+            "elapsed_s": round(elapsed, 4),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "query_params": dict(st.query_params),
+            "session_state": {
+                key: value for key, value in st.session_state.items()
+                if isinstance(value, _PARAM_TYPES)
+            },
+        }
+        with open(f"{stem}.json", "w", encoding="utf-8") as f:
+            json.dump(params, f, ensure_ascii=False, indent=2, default=str)
+
+    def _hotspots(self, stats: pstats.Stats) -> pd.DataFrame:
+        """自己時間の大きい関数の上位"""
+        rows = [{
+            "function": f"{func} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "tottime": tottime,
+            "cumtime": cumtime,
+        } for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.stats.items()]
+        return pd.DataFrame(rows).sort_values("tottime", ascending=False).head(self.top_n)
+
+    def _show_hotspots(self, hotspots_df: pd.DataFrame, elapsed: float, profile_path: str):
+        with st.expander(f"🔬 プロファイル結果 ({elapsed:.2f}秒)", expanded=True):
+            st.dataframe(
+                hotspots_df,
+                column_config={
+                    "function": "関数",
+                    "calls": "呼出回数",
+                    "tottime": st.column_config.NumberColumn("自己時間(秒)", format="%.4f"),
+                    "cumtime": st.column_config.NumberColumn("累積時間(秒)", format="%.4f"),
+                },
+                use_container_width=True,
+                hide_index=True,
+            )
+            self._download_button(profile_path, "application/octet-stream")
+
+    def _download_button(self, profile_path: str, mime: str):
+        st.caption(f"保存先: {profile_path}（パラメータ: {os.path.splitext(profile_path)[0]}.json）")
+        with open(profile_path, "rb") as f:
+            st.download_button("📥 プロファイルをダウンロード", data=f.read(),
+                               file_name=os.path.basename(profile_path), mime=mime)
@@ -1,6 +1,7 @@
 # app/ui/components/tables.py
 import streamlit as st
 import pandas as pd
+from domain.calculators.dock_scheduler import format_minutes
 
 class TableComponents:
     """テーブルコンポーネント"""
@@ -12,6 +13,38 @@ class TableComponents:
             st.write(f"**{title}**")
         st.dataframe(df, use_container_width=True)
     
+    @staticmethod
+    def paginator(key: str, total: int, page_sizes=(20, 50, 100)):
+        """ページ送り - (offset, limit) を返す"""
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            limit = st.selectbox("表示件数", page_sizes, key=f"{key}_page_size")
+        page_count = max(1, -(-total // limit))
+        with col2:
+            page = st.number_input("ページ", min_value=1, max_value=page_count, value=1, step=1, key=f"{key}_page")
+        offset = (int(page) - 1) * limit
+        with col3:
+            if total:
+                st.caption(f"全{total}件中 {offset + 1}〜{min(offset + limit, total)}件 ({page}/{page_count}ページ)")
+            else:
+                st.caption("該当データはありません")
+        return offset, limit
+
+    @staticmethod
+    def select_row(df: pd.DataFrame, key: str, label_column: str, title: str = None):
+        """ページ内の行一覧を表示し、編集対象の1行を選択 - 選択行(Series)を返す"""
+        if df.empty:
+            return None
+        if title:
+            st.write(f"**{title}**")
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        row_ids = df['id'].tolist()
+        labels = dict(zip(row_ids, df[label_column].astype(str)))
+        selected_id = st.selectbox(
+            "編集対象", row_ids, format_func=lambda i: f"{labels[i]} (ID: {i})", key=f"{key}_selected"
+        )
+        return df[df['id'] == selected_id].iloc[0]
+    
     @staticmethod
     def display_loading_plan(plan_result: dict):
         """積載計画表示"""
@@ -38,6 +71,18 @@ class TableComponents:
             with col2:
                 st.metric("重量利用率", f"{plan.weight_utilization*100:.1f}%")
             
+            # 段積みスタックの配置
+            if getattr(plan, 'stacks', None):
+                st.write(f"**段積みスタック** {len(plan.stacks)}基")
+                st.dataframe(pd.DataFrame([{
+                    '容器ID': stack.container_id,
+                    '段数': stack.tiers,
+                    '製品ID': ", ".join(str(item.product_id) for item in stack.items),
+                    '位置X(mm)': stack.x,
+                    '位置Y(mm)': stack.y,
+                    '重量': stack.total_weight,
+                } for stack in plan.stacks]), use_container_width=True)
+            
             # 積載アイテム表示
             if plan.loaded_items:
                 items_data = []
@@ -48,4 +93,54 @@ class TableComponents:
                         '数量': item.quantity,
                         '重量/個': item.weight_per_unit
                     })
-                st.dataframe(pd.DataFrame(items_data), use_container_width=True)
\ No newline at end of file
+                st.dataframe(pd.DataFrame(items_data), use_container_width=True)
+        
+        if plan_result.get('dock_schedule'):
+            TableComponents.display_dock_schedule(plan_result['dock_schedule'])
+    
+    @staticmethod
+    def display_dock_schedule(schedule: dict):
+        """積込ドックスケジュール表示"""
+        st.subheader("積込ドックスケジュール")
+        if not schedule['assignments']:
+            st.info("積込する便がありません")
+            return
+        
+        for conflict in schedule['conflicts']:
+            st.warning(conflict)
+        st.dataframe(pd.DataFrame([{
+            'ドック': a.dock,
+            'トラック': a.truck_name,
+            '箱数': a.containers,
+            '積込開始': format_minutes(a.start_minute),
+            '積込完了': format_minutes(a.end_minute),
+            '予定出発': format_minutes(a.departure_minute),
+            '遅れ(分)': round(a.delay_minutes),
+        } for a in schedule['assignments']]), use_container_width=True)
+    
+    @staticmethod
+    def display_plan_diff(diff_result: dict):
+        """計画差分表示"""
+        summary = diff_result['summary']
+        
+        st.subheader("差分サマリー")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("追加行", summary['added_rows'])
+        with col2:
+            st.metric("削除行", summary['removed_rows'])
+        with col3:
+            st.metric("変更行", summary['changed_rows'])
+        with col4:
+            delta_key = 'planned_quantity_delta' if 'planned_quantity_delta' in summary else 'quantity_delta'
+            st.metric("数量差分", f"{summary.get(delta_key, 0):+,.0f}")
+        
+        if not (summary['added_rows'] or summary['removed_rows'] or summary['changed_rows']):
+            st.success("2つの計画に差分はありません")
+            return
+        
+        for title, key in [("変更", 'changed'), ("追加", 'added'), ("削除", 'removed')]:
+            df = diff_result[key]
+            if not df.empty:
+                st.write(f"**{title} ({len(df):,}行)**")
+                st.dataframe(df, use_container_width=True)
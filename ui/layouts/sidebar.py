@@ -11,6 +11,15 @@ def create_sidebar() -> str:
         key="main_navigation"
     )
     
+    # プロファイル計測（?profile=1 で既定オン、?profile=pyinstrument で pyinstrument を使用）
+    profile_param = st.query_params.get("profile")
+    st.sidebar.toggle(
+        "🔬 プロファイル計測",
+        value=profile_param in ("1", "pyinstrument"),
+        key="profiling_enabled",
+        help="選択中ページの表示処理を計測し、ホットスポットを表示して結果を保存します"
+    )
+    
     # システム情報
     st.sidebar.markdown("---")
     st.sidebar.info(
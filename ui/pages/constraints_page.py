@@ -1,7 +1,7 @@
 # app/ui/pages/constraints_page.py
 import streamlit as st
-import pandas as pd
-from ui.components.forms import FormComponents
+
+from domain.exceptions import InvalidInputError
 
 class ConstraintsPage:
     """制限設定ページ - 生産・運送制約の設定画面"""
@@ -21,69 +21,54 @@ class ConstraintsPage:
             self._show_transport_constraints()
     
     def _show_production_constraints(self):
-        """生産制約設定表示"""
+        """生産制約設定表示 - 全製品を1つの編集グリッドで表示し、変更行のみ保存"""
         st.header("🏭 生産能力設定")
         st.write("製品ごとの生産能力と平均化レベルを設定します。")
         
         try:
-            products = self.service.get_all_products()
-            existing_constraints = self.service.get_product_constraints()
+            grid_df = self.service.get_constraint_grid()
             
-            if not products:
+            if grid_df.empty:
                 st.warning("製品データがありません")
                 return
             
-            # 製品データを辞書形式に変換
-            products_dict = [{
-                'id': product.id,
-                'product_code': product.product_code,
-                'product_name': product.product_name
-            } for product in products]
-            
-            # 既存制約を辞書形式に変換
-            constraints_dict = [{
-                'product_id': constraint.product_id,
-                'daily_capacity': constraint.daily_capacity,
-                'smoothing_level': constraint.smoothing_level,
-                'volume_per_unit': constraint.volume_per_unit,
-                'is_transport_constrained': constraint.is_transport_constrained
-            } for constraint in existing_constraints]
-            
-            st.info("各製品の生産制約を設定してください")
-            
-            # フォーム表示
-            constraints_data = FormComponents.product_constraints_form(
-                products_dict, constraints_dict
-            )
-            
-            col1, col2 = st.columns([1, 4])
-            with col1:
-                if st.button("💾 生産制約を保存", type="primary"):
-                    try:
-                        self.service.save_product_constraints(constraints_data)
-                        st.success("生産制約設定を保存しました")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"保存エラー: {e}")
+            st.info("表のセルを直接編集し、保存ボタンで変更行のみを一括保存します")
             
-            with col2:
-                if st.button("🔄 デフォルト値にリセット"):
-                    st.info("リセットするにはページを再読み込みしてください")
+            # フォーム内のグリッドはセル編集ごとに再実行されない
+            with st.form("constraints_grid_form"):
+                edited_df = st.data_editor(
+                    grid_df,
+                    column_config={
+                        "product_id": None,
+                        "product_code": st.column_config.TextColumn("製品コード", disabled=True),
+                        "product_name": st.column_config.TextColumn("製品名", disabled=True),
+                        "daily_capacity": st.column_config.NumberColumn("日次生産能力", min_value=0, step=1),
+                        "smoothing_level": st.column_config.NumberColumn(
+                            "平均化レベル", min_value=0.0, max_value=1.0, step=0.05
+                        ),
+                        "volume_per_unit": st.column_config.NumberColumn("単位体積(m³)", min_value=0.0),
+                        "is_transport_constrained": st.column_config.CheckboxColumn("運送制限"),
+                    },
+                    num_rows="fixed",
+                    hide_index=True,
+                    use_container_width=True,
+                    key="constraints_grid",
+                )
+                submitted = st.form_submit_button("💾 生産制約を保存", type="primary")
             
-            # 現在の設定表示
-            st.subheader("現在の設定")
-            if existing_constraints:
-                display_df = pd.DataFrame([{
-                    '製品コード': constraint.product_code,
-                    '製品名': constraint.product_name,
-                    '日次生産能力': constraint.daily_capacity,
-                    '平均化レベル': constraint.smoothing_level,
-                    '単位体積': constraint.volume_per_unit,
-                    '運送制限': '✅' if constraint.is_transport_constrained else '❌'
-                } for constraint in existing_constraints])
-                st.dataframe(display_df, use_container_width=True)
-            else:
-                st.info("設定が保存されていません")
+            if submitted:
+                try:
+                    ok, saved = self.service.save_constraint_changes(grid_df, edited_df)
+                except InvalidInputError as e:
+                    st.warning(f"生産制約を保存できません: {e}")
+                    return
+                if not ok:
+                    st.error("生産制約の保存に失敗しました")
+                elif saved:
+                    st.success(f"生産制約を保存しました（{saved}件）")
+                    st.rerun()
+                else:
+                    st.info("変更はありません")
                 
         except Exception as e:
             st.error(f"データ取得エラー: {e}")
@@ -2,6 +2,7 @@
 import streamlit as st
 import pandas as pd
 from ui.components.charts import ChartComponents
+from domain.exceptions import PlanningError
 
 class DashboardPage:
     """ダッシュボードページ - メインの分析画面"""
@@ -14,17 +15,19 @@ class DashboardPage:
         """ページ表示"""
         st.title("🏭 生産計画管理ダッシュボード")
         
+        # 日別需要は DB 側で集計し、メトリクスとチャートで共用
+        daily_df = self.service.get_daily_demand_totals()
+        
         # 基本情報表示
-        self._show_basic_metrics()
+        self._show_basic_metrics(daily_df)
         
         # 需要トレンドグラフ
-        self._show_demand_trend()
+        self._show_demand_trend(daily_df)
     
-    def _show_basic_metrics(self):
+    def _show_basic_metrics(self, daily_df: pd.DataFrame):
         """基本メトリクス表示"""
         try:
             products = self.service.get_all_products()
-            instructions = self.service.get_production_instructions()
             constraints = self.service.get_product_constraints()
             
             col1, col2, col3, col4 = st.columns(4)
@@ -36,43 +39,36 @@ class DashboardPage:
                 st.metric("制約対象製品", len(constraints))
             
             with col3:
-                total_demand = sum(inst.instruction_quantity for inst in instructions) if instructions else 0
+                total_demand = daily_df['instruction_quantity'].sum() if not daily_df.empty else 0
                 st.metric("総需要量", f"{total_demand:,.0f}")
             
             with col4:
-                if instructions:
-                    date_range = f"{min(inst.instruction_date for inst in instructions).strftime('%m/%d')} - {max(inst.instruction_date for inst in instructions).strftime('%m/%d')}"
+                if not daily_df.empty:
+                    dates = pd.to_datetime(daily_df['instruction_date'])
+                    date_range = f"{dates.min().strftime('%m/%d')} - {dates.max().strftime('%m/%d')}"
                     st.metric("計画期間", date_range)
                 else:
                     st.metric("計画期間", "データなし")
                     
+        except PlanningError as e:
+            st.error(str(e))
         except Exception as e:
             st.error(f"データ取得エラー: {e}")
     
-    def _show_demand_trend(self):
+    def _show_demand_trend(self, daily_df: pd.DataFrame):
         """需要トレンド表示"""
         st.subheader("📈 需要トレンド分析")
         
         try:
-            instructions = self.service.get_production_instructions()
-            if instructions:
-                # DataFrameに変換
-                instructions_df = pd.DataFrame([{
-                    'instruction_date': inst.instruction_date,
-                    'instruction_quantity': inst.instruction_quantity,
-                    'product_code': inst.product_code,
-                    'product_name': inst.product_name
-                } for inst in instructions])
-                
+            if not daily_df.empty:
                 # トレンドグラフ表示
-                fig = self.charts.create_demand_trend_chart(instructions_df)
+                fig = self.charts.create_demand_trend_chart(daily_df)
                 if fig:
                     st.plotly_chart(fig, use_container_width=True)
                 
                 # 製品別需要
                 st.subheader("製品別需要分析")
-                product_demand = instructions_df.groupby(['product_code', 'product_name'])['instruction_quantity'].sum().reset_index()
-                product_demand = product_demand.sort_values('instruction_quantity', ascending=False)
+                product_demand = self.service.get_product_demand_totals()
                 
                 col1, col2 = st.columns([2, 1])
                 
@@ -0,0 +1,64 @@
+# app/ui/pages/diagnostics_page.py
+import streamlit as st
+import pandas as pd
+
+class DiagnosticsPage:
+    """診断ページ - クエリ・処理時間の計測結果（?diagnostics=1 で表示）"""
+    
+    def __init__(self, metrics):
+        self.metrics = metrics
+    
+    def show(self):
+        """ページ表示"""
+        st.title("🩺 診断情報")
+        st.caption(f"スロークエリ閾値: {self.metrics.slow_query_ms:.0f} ms")
+        
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            if st.button("🔄 更新"):
+                st.rerun()
+        with col2:
+            if st.button("🧹 計測値をリセット"):
+                self.metrics.reset()
+                st.rerun()
+        
+        snapshot = self.metrics.snapshot()
+        tab1, tab2, tab3, tab4 = st.tabs(["⏱ 処理時間", "🗄 クエリ", "🐢 スロークエリ", "📄 Prometheus"])
+        
+        with tab1:
+            self._show_stats(pd.DataFrame(snapshot["operations"]), "name", "処理")
+        with tab2:
+            self._show_stats(pd.DataFrame(snapshot["queries"]), "operation", "発行元")
+        with tab3:
+            slow_df = pd.DataFrame(snapshot["slow_queries"])
+            if slow_df.empty:
+                st.info("スロークエリはありません")
+            else:
+                st.dataframe(slow_df.iloc[::-1], use_container_width=True, hide_index=True)
+        with tab4:
+            text = self.metrics.to_prometheus()
+            st.code(text, language="text")
+            st.download_button("📥 metrics.txt", data=text, file_name="metrics.txt", mime="text/plain")
+    
+    def _show_stats(self, stats_df: pd.DataFrame, name_column: str, name_label: str):
+        """集計表（合計時間の降順）"""
+        if stats_df.empty:
+            st.info("計測データはありません")
+            return
+        stats_df["avg_ms"] = stats_df["total_s"] / stats_df["calls"] * 1000
+        stats_df["max_ms"] = stats_df["max_s"] * 1000
+        stats_df = stats_df.sort_values("total_s", ascending=False)
+        st.dataframe(
+            stats_df[[name_column, "calls", "errors", "rows", "total_s", "avg_ms", "max_ms"]],
+            column_config={
+                name_column: name_label,
+                "calls": "回数",
+                "errors": "エラー",
+                "rows": "行数",
+                "total_s": st.column_config.NumberColumn("合計(秒)", format="%.3f"),
+                "avg_ms": st.column_config.NumberColumn("平均(ms)", format="%.1f"),
+                "max_ms": st.column_config.NumberColumn("最大(ms)", format="%.1f"),
+            },
+            use_container_width=True,
+            hide_index=True,
+        )
@@ -3,6 +3,10 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta, date
 from ui.components.charts import ChartComponents
+from ui.components.tables import TableComponents
+from ui.components.jobs import JobComponents
+from domain.models.scenario import PlanScenario
+from domain.exceptions import PlanningError, NoDataError
 
 class ProductionPage:
     """生産計画ページ（シミュレーション + CRUD管理）"""
@@ -10,6 +14,7 @@ class ProductionPage:
     def __init__(self, production_service):
         self.service = production_service
         self.charts = ChartComponents()
+        self.tables = TableComponents()
 
     # -----------------------------
     # Entry
@@ -17,7 +22,9 @@ class ProductionPage:
     def show(self):
         st.title("🏭 生産計画")
 
-        tab1, tab2 = st.tabs(["📊 計画シミュレーション", "📝 生産計画管理"])
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
+            ["📊 計画シミュレーション", "📝 生産計画管理", "🔍 計画差分", "🧪 シナリオ比較", "🎲 需要変動", "📦 在庫推移"]
+        )
 
         with tab1:
             self._show_plan_simulation()
@@ -25,6 +32,18 @@ class ProductionPage:
         with tab2:
             self._show_plan_management()
 
+        with tab3:
+            self._show_plan_diff()
+
+        with tab4:
+            self._show_scenario_comparison()
+
+        with tab5:
+            self._show_demand_uncertainty()
+
+        with tab6:
+            self._show_inventory_projection()
+
     # -----------------------------
     # 旧：計画計算＋表示（既存機能を踏襲）
     # -----------------------------
@@ -47,33 +66,61 @@ class ProductionPage:
             st.write(""); st.write("")
             calculate_clicked = st.button("🔧 計画計算", type="primary", use_container_width=True)
 
+        run_in_background = st.checkbox(
+            "バックグラウンドで実行", value=False,
+            help="長期間の計算はジョブとして実行し、画面更新やブラウザ再読み込み後も結果を取得できます"
+        )
+
         if calculate_clicked:
-            self._calculate_and_show_plan(start_date, end_date)
+            if run_in_background:
+                job_id = self.service.submit_production_plan(start_date, end_date)
+                JobComponents.start_job("plan_job", job_id)
+                st.session_state["plan_job_range"] = (start_date, end_date)
+            else:
+                self._calculate_and_show_plan(start_date, end_date)
+
+        plans = JobComponents.show_job_status(self.service.jobs, "plan_job")
+        if plans is not None:
+            self._show_plan_result(plans, *st.session_state.get("plan_job_range", (start_date, end_date)))
+
+        with st.expander("🗂️ ジョブ履歴"):
+            JobComponents.show_job_list(self.service.jobs)
 
     def _calculate_and_show_plan(self, start_date, end_date):
         with st.spinner("生産計画を計算中..."):
             try:
                 plans = self.service.calculate_production_plan(start_date, end_date)
-                if plans:
-                    # DataFrame 化
-                    plan_df = pd.DataFrame([{
-                        'date': plan.date,
-                        'product_id': plan.product_id,
-                        'product_code': plan.product_code,
-                        'product_name': plan.product_name,
-                        'demand_quantity': plan.demand_quantity,
-                        'planned_quantity': plan.planned_quantity,
-                        'inspection_category': plan.inspection_category,
-                        'is_constrained': plan.is_constrained
-                    } for plan in plans])
-
-                    self._display_production_plan(plan_df)
-                else:
-                    st.warning("指定期間内に生産計画データがありません")
-
+                self._show_plan_result(plans, start_date, end_date)
+            except PlanningError as e:
+                st.error(str(e))
             except Exception as e:
                 st.error(f"計画計算エラー: {e}")
 
+    def _show_plan_result(self, plans, start_date, end_date):
+        """計画結果を DataFrame 化して表示"""
+        if not plans:
+            st.warning("指定期間内に生産計画データがありません")
+            return
+
+        plan_df = pd.DataFrame([{
+            'date': plan.date,
+            'product_id': plan.product_id,
+            'product_code': plan.product_code,
+            'product_name': plan.product_name,
+            'demand_quantity': plan.demand_quantity,
+            'planned_quantity': plan.planned_quantity,
+            'smoothed_quantity': plan.smoothed_quantity,
+            'inspection_category': plan.inspection_category,
+            'is_constrained': plan.is_constrained
+        } for plan in plans])
+
+        shortage = sum(plan.shortage_quantity or 0 for plan in plans)
+        if shortage > 0:
+            st.warning(f"リードタイム分の前倒しが開始日より前になるため、計画期間内に生産できない量があります: {shortage:,.0f}")
+
+        self._save_plan_snapshot(plan_df, start_date, end_date)
+        self._display_production_plan(plan_df)
+
     def _display_production_plan(self, plan_df: pd.DataFrame):
         # サマリー
         st.subheader("📈 計画サマリー")
@@ -127,6 +174,7 @@ class ProductionPage:
                 "product_name": "製品名",
                 "demand_quantity": st.column_config.NumberColumn("需要量", format="%d"),
                 "planned_quantity": st.column_config.NumberColumn("計画生産量", format="%d"),
+                "smoothed_quantity": st.column_config.NumberColumn("平均化量", format="%.1f"),
                 "inspection_category": "検査区分",
                 "is_constrained": st.column_config.CheckboxColumn("制約対象"),
             },
@@ -144,6 +192,228 @@ class ProductionPage:
             type="primary",
         )
 
+    def _save_plan_snapshot(self, plan_df: pd.DataFrame, start_date, end_date):
+        """計算結果をセッション内スナップショットとして保持（差分比較用）"""
+        snapshots = st.session_state.setdefault("plan_snapshots", {})
+        label = f"{datetime.now().strftime('%H:%M:%S')} 計算 ({start_date}〜{end_date})"
+        snapshots[label] = plan_df
+        # 古いものから破棄して直近5件のみ保持
+        while len(snapshots) > 5:
+            snapshots.pop(next(iter(snapshots)))
+
+    # -----------------------------
+    # 計画差分タブ
+    # -----------------------------
+    def _show_plan_diff(self):
+        st.subheader("🔍 計画差分")
+        st.write("2つの計画（計算結果またはCSV）を比較し、追加・削除・変更行と数量差分を表示します。")
+
+        plan_type = st.radio(
+            "計画種別", ["production", "loading"], horizontal=True,
+            format_func=lambda x: "生産計画 (日付×製品)" if x == "production" else "積載計画 (トラック×日付×製品)",
+            key="plan_diff_type"
+        )
+
+        snapshots = st.session_state.get("plan_snapshots", {})
+        col1, col2 = st.columns(2)
+        with col1:
+            old_df = self._select_plan_source("比較元", "diff_old", snapshots)
+        with col2:
+            new_df = self._select_plan_source("比較先", "diff_new", snapshots)
+
+        if old_df is None or new_df is None:
+            st.info("比較する2つの計画を選択してください")
+            return
+
+        if st.button("🔍 差分計算", type="primary"):
+            try:
+                diff_result = self.service.compare_plans(old_df, new_df, plan_type)
+                self.tables.display_plan_diff(diff_result)
+            except Exception as e:
+                st.error(f"差分計算エラー: {e}")
+
+    def _select_plan_source(self, label: str, key: str, snapshots: dict):
+        """比較対象の計画を選択（CSVアップロード優先）"""
+        uploaded = st.file_uploader(f"{label} CSV", type="csv", key=f"{key}_file")
+        if uploaded is not None:
+            return pd.read_csv(uploaded)
+
+        if not snapshots:
+            return None
+        selected = st.selectbox(f"{label} スナップショット", options=list(snapshots.keys()), key=f"{key}_snapshot")
+        return snapshots.get(selected)
+
+    # -----------------------------
+    # シナリオ比較タブ
+    # -----------------------------
+    def _show_scenario_comparison(self):
+        st.subheader("🧪 シナリオ比較")
+        st.write("生産能力・平均化レベルの条件を変えた複数シナリオを並列計算し、KPIを比較します。")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("開始日", datetime.now().date(), key="scenario_start")
+        with col2:
+            end_date = st.date_input("終了日", datetime.now().date() + timedelta(days=30), key="scenario_end")
+
+        st.write("**シナリオ定義**（対象製品IDが空欄の場合は全製品に適用）")
+        default_rows = pd.DataFrame([
+            {"シナリオ名": "能力+10%", "対象製品ID": None, "能力倍率": 1.1, "平均化レベル": None},
+            {"シナリオ名": "平均化0.5", "対象製品ID": None, "能力倍率": 1.0, "平均化レベル": 0.5},
+        ])
+        scenario_df = st.data_editor(
+            default_rows,
+            num_rows="dynamic",
+            column_config={
+                "対象製品ID": st.column_config.NumberColumn("対象製品ID", min_value=1, step=1),
+                "能力倍率": st.column_config.NumberColumn("能力倍率", min_value=0.0, step=0.05),
+                "平均化レベル": st.column_config.NumberColumn("平均化レベル", min_value=0.0, max_value=1.0),
+            },
+            use_container_width=True,
+            key="scenario_editor",
+        )
+
+        if st.button("🧪 シナリオ一括計算", type="primary"):
+            scenarios = [self._row_to_scenario(row) for _, row in scenario_df.dropna(subset=["シナリオ名"]).iterrows()]
+            try:
+                with st.spinner(f"{len(scenarios)}シナリオを計算中..."):
+                    result = self.service.run_scenarios(start_date, end_date, scenarios)
+            except NoDataError as e:
+                st.warning(str(e))
+                return
+            except PlanningError as e:
+                st.error(str(e))
+                return
+            if result is None or result.empty:
+                st.warning("シナリオ計算結果がありません")
+                return
+            st.dataframe(
+                result,
+                column_config={
+                    "scenario": "シナリオ",
+                    "total_demand": st.column_config.NumberColumn("総需要量", format="%d"),
+                    "total_planned": st.column_config.NumberColumn("総計画量", format="%d"),
+                    "fulfillment_rate": st.column_config.NumberColumn("充足率", format="%.3f"),
+                    "backlog": st.column_config.NumberColumn("未充足量", format="%d"),
+                    "trips": st.column_config.NumberColumn("必要便数", format="%d"),
+                    "capacity_utilization": st.column_config.NumberColumn("能力利用率", format="%.3f"),
+                    "peak_utilization": st.column_config.NumberColumn("最大利用率", format="%.3f"),
+                    "fulfillment_diff": st.column_config.NumberColumn("充足率差", format="%+.3f"),
+                    "trips_diff": st.column_config.NumberColumn("便数差", format="%+d"),
+                },
+                use_container_width=True,
+            )
+
+    def _row_to_scenario(self, row) -> PlanScenario:
+        """シナリオ定義行をモデルに変換"""
+        factor = float(row["能力倍率"]) if pd.notna(row["能力倍率"]) else 1.0
+        level = float(row["平均化レベル"]) if pd.notna(row["平均化レベル"]) else None
+        if pd.notna(row["対象製品ID"]):
+            product_id = int(row["対象製品ID"])
+            return PlanScenario(
+                name=str(row["シナリオ名"]),
+                capacity_factors={product_id: factor},
+                smoothing_levels={product_id: level} if level is not None else {},
+            )
+        return PlanScenario(name=str(row["シナリオ名"]), capacity_factor=factor, smoothing_level=level)
+
+    # -----------------------------
+    # 需要変動シミュレーションタブ
+    # -----------------------------
+    def _show_demand_uncertainty(self):
+        st.subheader("🎲 需要変動シミュレーション")
+        st.write("翌月・翌々月の予測量にばらつきを与えた多数のシナリオを計算し、必要能力と便数のパーセンタイルを表示します。")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            n_scenarios = st.number_input("シナリオ数", min_value=100, max_value=100000, value=10000, step=1000)
+        with col2:
+            monthly_cv = st.number_input("月次変動係数", min_value=0.0, max_value=2.0, value=0.15, step=0.05)
+        with col3:
+            daily_cv = st.number_input("日別変動係数", min_value=0.0, max_value=2.0, value=0.25, step=0.05)
+        with col4:
+            working_days = st.number_input("月稼働日数", min_value=1, max_value=31, value=20)
+
+        if st.button("🎲 シミュレーション実行", type="primary"):
+            try:
+                with st.spinner(f"{n_scenarios:,}シナリオを計算中..."):
+                    result = self.service.simulate_demand_uncertainty(
+                        int(n_scenarios), monthly_cv, daily_cv, int(working_days)
+                    )
+            except NoDataError as e:
+                st.warning(str(e))
+                return
+            except PlanningError as e:
+                st.error(str(e))
+                return
+            if not result or result["products"].empty:
+                st.warning("シミュレーション結果がありません")
+                return
+
+            st.write("**月別 必要便数・未充足量**")
+            st.dataframe(result["transport"], use_container_width=True)
+            st.write("**製品別 需要量・必要日次能力**")
+            st.dataframe(result["products"], use_container_width=True)
+
+    # -----------------------------
+    # 在庫推移（MRP）タブ
+    # -----------------------------
+    def _show_inventory_projection(self):
+        st.subheader("📦 在庫推移・欠品予測")
+        st.write("生産指示を所要量として、リードタイム・定点日数・入り数から全製品の日別在庫を計算します。")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            start_date = st.date_input("開始日", datetime.now().date(), key="projection_start")
+        with col2:
+            end_date = st.date_input("終了日", datetime.now().date() + timedelta(days=60), key="projection_end")
+        with col3:
+            cover_days = st.number_input(
+                "期首在庫（平均需要の日数分）", min_value=0.0, max_value=60.0, value=0.0, step=0.5,
+                help="在庫データがないため、平均日次需要にこの日数を掛けた量を期首在庫とします"
+            )
+
+        if st.button("📦 在庫推移を計算", type="primary"):
+            st.session_state["inventory_projection"] = None
+            try:
+                with st.spinner("在庫推移を計算中..."):
+                    st.session_state["inventory_projection"] = self.service.project_inventory(
+                        start_date, end_date, initial_cover_days=cover_days
+                    )
+            except NoDataError as e:
+                st.warning(str(e))
+            except PlanningError as e:
+                st.error(str(e))
+
+        result = st.session_state.get("inventory_projection")
+        if not result:
+            return
+
+        summary = result["summary"]
+        shortages = summary[summary["shortage_days"] > 0].sort_values(["first_shortage_date", "max_shortage"],
+                                                                      ascending=[True, False])
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("対象製品数", len(summary))
+        with col2:
+            st.metric("欠品予測製品数", len(shortages))
+        with col3:
+            st.metric("最大欠品量", f"{summary['max_shortage'].max():,.0f}")
+
+        st.write("**欠品予測（初回欠品日順）**")
+        st.dataframe(shortages, use_container_width=True)
+
+        options = summary["product_id"].tolist()
+        labels = dict(zip(summary["product_id"], summary.get("product_code", summary["product_id"])))
+        product_id = st.selectbox("推移を表示する製品", options, format_func=lambda pid: str(labels.get(pid, pid)),
+                                  key="projection_product")
+        if product_id is not None:
+            trend = pd.DataFrame({
+                field: self.service.inventory_projector.to_frame(result, field, [product_id])[product_id]
+                for field in ("on_hand", "demand", "receipts")
+            })
+            st.line_chart(trend)
+
     # -----------------------------
     # 新規：CRUD 管理タブ
     # -----------------------------
@@ -174,53 +444,57 @@ class ProductionPage:
                 else:
                     st.warning("create_production() が service に未実装です")
 
-        # --- 一覧＆編集／削除 ---
+        # --- 一覧（サーバ側ページング）＆選択行の編集／削除 ---
         st.subheader("登録済み計画一覧")
-        if not hasattr(self.service, "get_productions"):
-            st.info("get_productions() が service に未実装です")
-            return
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            filter_product_id = st.number_input("製品IDで絞り込み（0=全件）", min_value=0, step=1, key="plan_filter_product")
+        with col2:
+            filter_start = st.date_input("開始日", value=None, key="plan_filter_start")
+        with col3:
+            filter_end = st.date_input("終了日", value=None, key="plan_filter_end")
+        filters = {
+            "product_id": int(filter_product_id) or None,
+            "start_date": filter_start,
+            "end_date": filter_end,
+        }
 
-        plans = self.service.get_productions()
-        if not plans:
+        total = self.service.count_productions(**filters)
+        offset, limit = TableComponents.paginator("plans", total)
+        plans_df = self.service.get_productions_page(offset, limit, **filters)
+        if plans_df is None or plans_df.empty:
             st.info("登録されている生産計画はありません")
             return
 
-        for plan in plans:
-            with st.expander(f"📝 計画ID: {plan.id}"):
-                st.write(f"製品ID: {plan.product_id}, 数量: {plan.quantity}, 日付: {plan.scheduled_date}")
-
-                # 編集フォーム
-                with st.form(f"edit_production_{plan.id}"):
-                    new_product_id = st.number_input("製品ID", min_value=1, value=plan.product_id, key=f"p_{plan.id}")
-                    new_quantity   = st.number_input("数量",    min_value=1, value=plan.quantity,    key=f"q_{plan.id}")
-                    new_date       = st.date_input("日付", value=plan.scheduled_date, key=f"d_{plan.id}")
-
-                    update_clicked = st.form_submit_button("更新")
-                    if update_clicked:
-                        if hasattr(self.service, "update_production"):
-                            update_data = {
-                                "product_id": int(new_product_id),
-                                "quantity": int(new_quantity),
-                                "scheduled_date": new_date,
-                            }
-                            ok = self.service.update_production(plan.id, update_data)
-                            if ok:
-                                st.success("計画を更新しました")
-                                st.rerun()
-                            else:
-                                st.error("計画更新に失敗しました")
-                        else:
-                            st.warning("update_production() が service に未実装です")
-
-                # 削除ボタン
-                delete_clicked = st.button("🗑️ 削除", key=f"del_{plan.id}")
-                if delete_clicked:
-                    if hasattr(self.service, "delete_production"):
-                        ok = self.service.delete_production(plan.id)
-                        if ok:
-                            st.success("計画を削除しました")
-                            st.rerun()
-                        else:
-                            st.error("計画削除に失敗しました")
-                    else:
-                        st.warning("delete_production() が service に未実装です")
+        plan = TableComponents.select_row(plans_df, "plans", "product_name")
+        plan_id = int(plan['id'])
+
+        # 編集フォーム
+        with st.form("edit_production"):
+            st.write(f"✏️ 計画ID: {plan_id} を編集")
+            new_product_id = st.number_input("製品ID", min_value=1, value=int(plan['product_id']))
+            new_quantity   = st.number_input("数量",    min_value=1, value=int(plan['quantity']))
+            new_date       = st.date_input("日付", value=pd.to_datetime(plan['scheduled_date']).date())
+
+            update_clicked = st.form_submit_button("更新")
+            if update_clicked:
+                update_data = {
+                    "product_id": int(new_product_id),
+                    "quantity": int(new_quantity),
+                    "scheduled_date": new_date,
+                }
+                ok = self.service.update_production(plan_id, update_data)
+                if ok:
+                    st.success("計画を更新しました")
+                    st.rerun()
+                else:
+                    st.error("計画更新に失敗しました")
+
+        # 削除ボタン
+        if st.button("🗑️ 削除", key="del_production"):
+            ok = self.service.delete_production(plan_id)
+            if ok:
+                st.success("計画を削除しました")
+                st.rerun()
+            else:
+                st.error("計画削除に失敗しました")
@@ -3,6 +3,8 @@ import streamlit as st
 import pandas as pd
 from ui.components.forms import FormComponents
 from ui.components.tables import TableComponents
+from ui.components.jobs import JobComponents
+from domain.calculators.dock_scheduler import format_minutes
 
 class TransportPage:
     """配送便計画ページ - トラック積載計画の作成画面"""
@@ -16,7 +18,9 @@ class TransportPage:
         st.title("🚚 配送便計画")
         st.write("トラックの積載計画と容器・車両管理を行います。")
         
-        tab1, tab2, tab3 = st.tabs(["📦 積載計画", "🧰 容器管理", "🚛 トラック管理"])
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
+            ["📦 積載計画", "🧰 容器管理", "🚛 トラック管理", "📈 容器需要", "🗺️ 配送ルート", "⏱️ 生産順序"]
+        )
         
         with tab1:
             self._show_loading_planning()
@@ -24,6 +28,12 @@ class TransportPage:
             self._show_container_management()
         with tab3:
             self._show_truck_management()
+        with tab4:
+            self._show_container_demand()
+        with tab5:
+            self._show_delivery_routes()
+        with tab6:
+            self._show_production_sequence()
     
     def _show_loading_planning(self):
         """積載計画表示"""
@@ -64,10 +74,18 @@ class TransportPage:
             with col2:
                 st.subheader("積載計画")
                 
+                run_in_background = st.checkbox("バックグラウンドで実行", value=False, key="loading_in_background")
                 if st.button("🔄 積載計画計算", type="primary"):
-                    with st.spinner("積載計画を計算中..."):
-                        plan_result = self.service.calculate_delivery_plan(sample_items)
-                        self.tables.display_loading_plan(plan_result)
+                    if run_in_background:
+                        JobComponents.start_job("loading_job", self.service.submit_delivery_plan(sample_items))
+                    else:
+                        with st.spinner("積載計画を計算中..."):
+                            plan_result = self.service.calculate_delivery_plan(sample_items)
+                            self.tables.display_loading_plan(plan_result)
+                
+                plan_result = JobComponents.show_job_status(self.service.jobs, "loading_job")
+                if plan_result is not None:
+                    self.tables.display_loading_plan(plan_result)
                 
                 # 積載バリデーション
                 st.subheader("積載チェック")
@@ -82,6 +100,181 @@ class TransportPage:
         
         except Exception as e:
             st.error(f"積載計画エラー: {e}")
+    def _show_delivery_routes(self):
+        """複数納入先の配送ルート表示"""
+        st.header("🗺️ 配送ルート計画")
+        st.write("生産計画の1日分を納入先ごとにまとめ、全車両の立ち寄り順と荷降ろし順の積み付けを計算します。")
+        
+        snapshots = st.session_state.get("plan_snapshots", {})
+        if not snapshots:
+            st.info("生産計画ページで計画を計算すると、その計画の配送ルートを作成できます。")
+            return
+        
+        col1, col2, col3 = st.columns([3, 2, 1])
+        with col1:
+            label = st.selectbox("生産計画", list(reversed(list(snapshots))), key="route_plan")
+        plan_df = snapshots[label]
+        with col2:
+            dates = sorted(pd.to_datetime(plan_df['date']).dt.date.unique())
+            plan_date = st.selectbox("出荷日", dates, key="route_date")
+        with col3:
+            time_budget = st.number_input("計算時間(秒)", min_value=0.1, max_value=60.0, value=2.0, step=0.5,
+                                          key="route_time_budget")
+        
+        if not st.button("🗺️ ルート計算", type="primary"):
+            return
+        
+        with st.spinner("配送ルートを計算中..."):
+            items = self.service.loading_items_for_date(plan_df, plan_date)
+            result = self.service.plan_delivery_routes(items, time_budget_s=time_budget, ship_date=plan_date)
+        
+        if result.get("error"):
+            st.error(result["error"])
+        if not result["routes"]:
+            st.warning("作成できたルートがありません")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("便数", result["total_trips"])
+        with col2:
+            st.metric("総走行距離", f"{result['total_distance_km']:,.1f} km")
+        with col3:
+            st.metric("未割当の納入", len(result["unassigned"]) + len(result["unrouted_items"]))
+        
+        for i, route in enumerate(result["routes"], 1):
+            st.subheader(f"便 {i}: {route.truck.name}（{' → '.join(route.stops)}）")
+            st.write(f"走行 {route.distance_km:.1f} km / 最終納入先到着まで {route.duration_minutes:.0f} 分")
+            st.dataframe(pd.DataFrame({
+                "順番": range(1, len(route.stops) + 1),
+                "納入先": route.stops,
+                "到着(出発後・分)": [round(m) for m in route.arrival_minutes],
+            }), use_container_width=True)
+            if route.plan and route.plan.stacks:
+                st.write("**積み付け（荷降ろし順の遅いものから奥へ）**")
+                st.dataframe(pd.DataFrame([{
+                    "荷降ろし順": stack.sequence,
+                    "容器ID": stack.container_id,
+                    "段数": stack.tiers,
+                    "位置X(mm)": stack.x,
+                    "位置Y(mm)": stack.y,
+                } for stack in route.plan.stacks]), use_container_width=True)
+        
+        if result.get("dock_schedule"):
+            self.tables.display_dock_schedule(result["dock_schedule"])
+    
+    def _show_production_sequence(self):
+        """積込便に合わせた生産順序表示"""
+        st.header("⏱️ JIT 生産順序")
+        st.write("生産計画の1日分を、積込ドックの積込開始時刻から逆算してライン（工場）ごとに並べます。"
+                 "始業前に積み込む便の分は前稼働日に作ります。前後の出荷日の分が同じシフトに入る場合は、"
+                 "その時間を除いて並べます。")
+        
+        snapshots = st.session_state.get("plan_snapshots", {})
+        if not snapshots:
+            st.info("生産計画ページで計画を計算すると、その計画の生産順序を作成できます。")
+            return
+        
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            label = st.selectbox("生産計画", list(reversed(list(snapshots))), key="sequence_plan")
+        plan_df = snapshots[label]
+        with col2:
+            dates = sorted(pd.to_datetime(plan_df['date']).dt.date.unique())
+            plan_date = st.selectbox("出荷日", dates, key="sequence_date")
+        
+        if st.button("⏱️ 順序計算", type="primary"):
+            with st.spinner("生産順序を計算中..."):
+                st.session_state["production_sequence"] = self.service.sequence_production(plan_df, plan_date)
+        
+        result = st.session_state.get("production_sequence")
+        if not result:
+            return
+        if result["sequence"].empty:
+            st.warning("順序計画の対象となる積載がありません")
+            return
+        
+        summary = result["summary"]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("生産単位", int(summary["jobs"].sum()))
+        with col2:
+            st.metric("最大仮置き箱数", f"{summary['peak_staged_containers'].max():,.0f}")
+        with col3:
+            st.metric("遅れ", int(summary["late_jobs"].sum()))
+        with col4:
+            st.metric("稼働時間外", int(summary["overtime_jobs"].sum()))
+        if summary["overtime_jobs"].sum():
+            st.warning(f"終業までに作りきれない生産があります（最大 {summary['max_overtime_minutes'].max():,.0f}分超過）")
+        
+        sequence = result["sequence"].copy()
+        for column in ("start_minute", "end_minute", "due_minute"):
+            sequence[column] = sequence[column].map(format_minutes)
+        st.dataframe(
+            sequence,
+            column_config={
+                "line": "ライン",
+                "order": "順番",
+                "production_date": "生産日",
+                "production_day": None,
+                "product_id": "製品ID",
+                "truck_name": "便",
+                "containers": st.column_config.NumberColumn("箱数", format="%d"),
+                "start_minute": "開始",
+                "end_minute": "完成",
+                "due_minute": "期限",
+                "wait_minutes": st.column_config.NumberColumn("仮置き(分)", format="%.0f"),
+                "late_minutes": st.column_config.NumberColumn("遅れ(分)", format="%.0f"),
+                "overtime_minutes": st.column_config.NumberColumn("稼働時間外(分)", format="%.0f"),
+            },
+            use_container_width=True,
+        )
+    
+    def _show_container_demand(self):
+        """容器需要（必要箱数・流通箱数）表示"""
+        st.header("📈 容器需要予測")
+        st.write("生産計画から容器種別ごとの日別必要箱数と、返却までに流通している箱数を計算します。")
+        
+        snapshots = st.session_state.get("plan_snapshots", {})
+        if not snapshots:
+            st.info("生産計画ページで計画を計算すると、その計画の容器需要を確認できます。")
+            return
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            label = st.selectbox("生産計画", list(reversed(list(snapshots))), key="container_demand_plan")
+        with col2:
+            return_days = st.number_input("返却日数", min_value=0, max_value=30, value=3, key="container_return_days")
+        
+        try:
+            result = self.service.get_container_demand(snapshots[label], return_days=int(return_days))
+        except Exception as e:
+            st.error(f"容器需要計算エラー: {e}")
+            return
+        
+        if result["summary"].empty:
+            st.warning("容器が設定された製品の計画がありません")
+            return
+        
+        st.dataframe(
+            result["summary"],
+            column_config={
+                "container_name": "容器名",
+                "total_filled": st.column_config.NumberColumn("総充填箱数", format="%d"),
+                "peak_daily_filled": st.column_config.NumberColumn("最大日次充填", format="%d"),
+                "avg_daily_filled": st.column_config.NumberColumn("平均日次充填", format="%.1f"),
+                "peak_in_circulation": st.column_config.NumberColumn("最大流通箱数", format="%d"),
+                "peak_date": "ピーク日",
+            },
+            use_container_width=True,
+        )
+        
+        daily = result["daily"]
+        st.write("**流通箱数の推移**")
+        st.line_chart(daily.pivot_table(index="date", columns="container_name", values="in_circulation"))
+        st.write("**日別充填箱数**")
+        st.bar_chart(daily.pivot_table(index="date", columns="container_name", values="filled"))
+    
     def _show_container_management(self):
         """容器管理表示"""
         st.header("🧰 容器管理")
@@ -100,63 +293,35 @@ class TransportPage:
                 else:
                     st.error("容器登録に失敗しました")
 
-            # 容器一覧表示
+            # 容器一覧表示（サーバ側ページング）
             st.subheader("登録済み容器一覧")
-            containers = self.service.get_containers()
+            name_filter = st.text_input("容器名で絞り込み", key="container_filter")
+            stats = self.service.get_container_stats()
+            total = self.service.count_containers(name_filter)
+            offset, limit = TableComponents.paginator("containers", total)
+            containers = self.service.get_containers_page(offset, limit, name_filter)
 
             if containers:
-                for container in containers:
-                    with st.expander(f"📦 {container.name} (ID: {container.id})"):
-                        st.write(f"寸法: {container.width} × {container.depth} × {container.height} cm")
-                        st.write(f"体積: {(container.width * container.depth * container.height) / 1000000:.3f} m³")
-                        st.write(f"最大重量: {container.max_weight} kg")
-
-                        # --- 更新フォーム ---
-                        with st.form(f"edit_container_form_{container.id}"):
-                            st.write("✏️ 容器情報を編集")
-
-                            new_name = st.text_input("容器名", value=container.name)
-                            new_width = st.number_input("幅 (cm)", min_value=1, value=container.width)
-                            new_depth = st.number_input("奥行 (cm)", min_value=1, value=container.depth)
-                            new_height = st.number_input("高さ (cm)", min_value=1, value=container.height)
-                            new_weight = st.number_input("最大重量 (kg)", min_value=1, value=container.max_weight)
-
-                            submitted = st.form_submit_button("更新")
-                            if submitted:
-                                update_data = {
-                                    "name": new_name,
-                                    "width": new_width,
-                                    "depth": new_depth,
-                                    "height": new_height,
-                                    "max_weight": new_weight,
-                                }
-                                success = self.service.update_container(container.id, update_data)
-                                if success:
-                                    st.success(f"✅ 容器 '{container.name}' を更新しました")
-                                    st.rerun()
-                                else:
-                                    st.error("❌ 容器更新に失敗しました")
-
-                        # --- 削除ボタン ---
-                        if st.button("🗑️ 削除", key=f"delete_container_{container.id}"):
-                            success = self.service.delete_container(container.id)
-                            if success:
-                                st.success(f"容器 '{container.name}' を削除しました")
-                                st.rerun()
-                            else:
-                                st.error("容器削除に失敗しました")
+                containers_df = pd.DataFrame([{
+                    "id": c.id,
+                    "name": c.name,
+                    "width": c.width,
+                    "depth": c.depth,
+                    "height": c.height,
+                    "max_weight": c.max_weight,
+                } for c in containers])
+                container = TableComponents.select_row(containers_df, "containers", "name")
+                self._show_container_editor(container)
 
                 # 統計
                 st.subheader("容器統計")
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("登録容器数", len(containers))
+                    st.metric("登録容器数", stats["count"])
                 with col2:
-                    avg_volume = sum((c.width * c.depth * c.height) for c in containers) / len(containers) / 1000000
-                    st.metric("平均体積", f"{avg_volume:.2f} m³")
+                    st.metric("平均体積", f"{stats['avg_volume'] / 1000000:.2f} m³")
                 with col3:
-                    avg_weight = sum(c.max_weight for c in containers) / len(containers)
-                    st.metric("平均最大重量", f"{avg_weight:.1f} kg")
+                    st.metric("平均最大重量", f"{stats['avg_weight']:.1f} kg")
 
             else:
                 st.info("登録されている容器がありません")
@@ -166,6 +331,45 @@ class TransportPage:
     
      
 
+    def _show_container_editor(self, container):
+        """選択中の容器の編集・削除"""
+        st.write(f"体積: {(container['width'] * container['depth'] * container['height']) / 1000000:.3f} m³")
+
+        # --- 更新フォーム ---
+        with st.form("edit_container_form"):
+            st.write(f"✏️ 容器情報を編集: {container['name']}")
+
+            new_name = st.text_input("容器名", value=container['name'])
+            new_width = st.number_input("幅 (cm)", min_value=1, value=int(container['width']))
+            new_depth = st.number_input("奥行 (cm)", min_value=1, value=int(container['depth']))
+            new_height = st.number_input("高さ (cm)", min_value=1, value=int(container['height']))
+            new_weight = st.number_input("最大重量 (kg)", min_value=1, value=int(container['max_weight']))
+
+            submitted = st.form_submit_button("更新")
+            if submitted:
+                update_data = {
+                    "name": new_name,
+                    "width": new_width,
+                    "depth": new_depth,
+                    "height": new_height,
+                    "max_weight": new_weight,
+                }
+                success = self.service.update_container(int(container['id']), update_data)
+                if success:
+                    st.success(f"✅ 容器 '{container['name']}' を更新しました")
+                    st.rerun()
+                else:
+                    st.error("❌ 容器更新に失敗しました")
+
+        # --- 削除ボタン ---
+        if st.button("🗑️ 削除", key="delete_container"):
+            success = self.service.delete_container(int(container['id']))
+            if success:
+                st.success(f"容器 '{container['name']}' を削除しました")
+                st.rerun()
+            else:
+                st.error("容器削除に失敗しました")
+
     def _show_truck_management(self):
         """トラック管理表示"""
         st.header("🚛 トラック管理")
@@ -184,61 +388,16 @@ class TransportPage:
                 else:
                     st.error("トラック登録に失敗しました")
 
-            # トラック一覧表示
+            # トラック一覧表示（サーバ側ページング）
             st.subheader("登録済みトラック一覧")
-            trucks_df = self.service.get_trucks()
+            name_filter = st.text_input("トラック名で絞り込み", key="truck_filter")
+            total = self.service.count_trucks(name_filter)
+            offset, limit = TableComponents.paginator("trucks", total)
+            trucks_df = self.service.get_trucks_page(offset, limit, name_filter)
 
             if not trucks_df.empty:
-                for _, truck in trucks_df.iterrows():
-                    with st.expander(f"🛻 {truck['name']} (ID: {truck['id']})"):
-                        st.write(f"荷台寸法: {truck['width']} × {truck['depth']} × {truck['height']} mm")
-                        st.write(f"最大積載重量: {truck['max_weight']} kg")
-                        st.write(f"出発時刻: {truck['departure_time']}")
-                        st.write(f"到着時刻: {truck['arrival_time']} (+{truck['arrival_day_offset']}日)")
-                        st.write(f"デフォルト便: {'✅' if truck['default_use'] else '❌'}")
-
-                        # --- 更新フォーム ---
-                        with st.form(f"edit_truck_form_{truck['id']}"):
-                            st.write("✏️ トラック情報を編集")
-
-                            new_name = st.text_input("トラック名", value=truck['name'])
-                            new_width = st.number_input("荷台幅 (mm)", min_value=1, value=int(truck['width']))
-                            new_depth = st.number_input("荷台奥行 (mm)", min_value=1, value=int(truck['depth']))
-                            new_height = st.number_input("荷台高さ (mm)", min_value=1, value=int(truck['height']))
-                            new_weight = st.number_input("最大積載重量 (kg)", min_value=1, value=int(truck['max_weight']))
-                            new_dep = st.time_input("出発時刻", value=truck['departure_time'])
-                            new_arr = st.time_input("到着時刻", value=truck['arrival_time'])
-                            new_offset = st.number_input("到着日オフセット（日）", min_value=0, max_value=7, value=int(truck['arrival_day_offset']))
-                            new_default = st.checkbox("デフォルト便", value=bool(truck['default_use']))
-
-                            submitted = st.form_submit_button("更新")
-                            if submitted:
-                                update_data = {
-                                    "name": new_name,
-                                    "width": new_width,
-                                    "depth": new_depth,
-                                    "height": new_height,
-                                    "max_weight": new_weight,
-                                    "departure_time": new_dep,
-                                    "arrival_time": new_arr,
-                                    "arrival_day_offset": new_offset,
-                                    "default_use": new_default,
-                                }
-                                success = self.service.update_truck(truck['id'], update_data)
-                                if success:
-                                    st.success(f"✅ トラック '{truck['name']}' を更新しました")
-                                    st.rerun()
-                                else:
-                                    st.error("❌ トラック更新に失敗しました")
-
-                        # --- 削除ボタン ---
-                        if st.button("🗑️ 削除", key=f"delete_truck_{truck['id']}"):
-                            success = self.service.delete_truck(truck['id'])
-                            if success:
-                                st.success(f"トラック '{truck['name']}' を削除しました")
-                                st.rerun()
-                            else:
-                                st.error("トラック削除に失敗しました")
+                truck = TableComponents.select_row(trucks_df, "trucks", "name")
+                self._show_truck_editor(truck)
 
             else:
                 st.info("登録されているトラックがありません")
@@ -246,4 +405,49 @@ class TransportPage:
         except Exception as e:
             st.error(f"トラック管理エラー: {e}")
 
-          
+    def _show_truck_editor(self, truck):
+        """選択中のトラックの編集・削除"""
+        st.write(f"到着時刻: {truck['arrival_time']} (+{truck['arrival_day_offset']}日)")
+
+        # --- 更新フォーム ---
+        with st.form("edit_truck_form"):
+            st.write(f"✏️ トラック情報を編集: {truck['name']}")
+
+            new_name = st.text_input("トラック名", value=truck['name'])
+            new_width = st.number_input("荷台幅 (mm)", min_value=1, value=int(truck['width']))
+            new_depth = st.number_input("荷台奥行 (mm)", min_value=1, value=int(truck['depth']))
+            new_height = st.number_input("荷台高さ (mm)", min_value=1, value=int(truck['height']))
+            new_weight = st.number_input("最大積載重量 (kg)", min_value=1, value=int(truck['max_weight']))
+            new_dep = st.time_input("出発時刻", value=truck['departure_time'])
+            new_arr = st.time_input("到着時刻", value=truck['arrival_time'])
+            new_offset = st.number_input("到着日オフセット（日）", min_value=0, max_value=7, value=int(truck['arrival_day_offset']))
+            new_default = st.checkbox("デフォルト便", value=bool(truck['default_use']))
+
+            submitted = st.form_submit_button("更新")
+            if submitted:
+                update_data = {
+                    "name": new_name,
+                    "width": new_width,
+                    "depth": new_depth,
+                    "height": new_height,
+                    "max_weight": new_weight,
+                    "departure_time": new_dep,
+                    "arrival_time": new_arr,
+                    "arrival_day_offset": new_offset,
+                    "default_use": new_default,
+                }
+                success = self.service.update_truck(int(truck['id']), update_data)
+                if success:
+                    st.success(f"✅ トラック '{truck['name']}' を更新しました")
+                    st.rerun()
+                else:
+                    st.error("❌ トラック更新に失敗しました")
+
+        # --- 削除ボタン ---
+        if st.button("🗑️ 削除", key="delete_truck"):
+            success = self.service.delete_truck(int(truck['id']))
+            if success:
+                st.success(f"トラック '{truck['name']}' を削除しました")
+                st.rerun()
+            else:
+                st.error("トラック削除に失敗しました")